@@ -2,13 +2,30 @@ from __future__ import annotations
 
 import json
 from dataclasses import dataclass
+from multiprocessing import Pool, cpu_count
 from pathlib import Path
 from collections import Counter, defaultdict
-from typing import Any, Dict, Generator, List, Tuple, Optional
+from typing import Any, Dict, Generator, Iterator, List, Tuple, Optional
 
 import numpy as np
 import pandas as pd
 
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+
+# 전처리(preprocessing_utils.write_product_info_index)가 JSON 옆에 저장하는 상품 메타데이터 인덱스
+PRODUCT_INFO_INDEX_SUFFIX = ".product_info.jsonl"
+# 스트리밍 파싱 시 건너뛰는 무거운 키 (reviews + 전처리 인덱스와 같은 제외 접두사)
+STREAM_SKIP_KEY_PREFIXES = (
+    "product_vector",
+    "representative_",
+    "sentiment_analysis",
+    "product_tokens",
+)
+
 
 # ==============================
 # 기본 통계 산출 설정, 자료구조 정의
@@ -25,6 +42,12 @@ class BasicStatsConfig:
     - save_outputs: 결과 DF 저장 여부
     - output_dirname: 저장 폴더명(processed_root 하위)
     - save_format: 저장 포맷("parquet" or "csv")
+    - use_product_facts: 전처리 상품 집계 테이블 사용 여부
+      (True면 JSON 메타데이터 대신 수집 리뷰 기준 집계로 리뷰 수/별점 분포 산출)
+    - product_facts_dirname: 상품 집계 테이블 폴더(processed_root 하위)
+    - use_product_info_index: JSON 옆 상품 메타데이터 인덱스(*.product_info.jsonl) 우선 사용
+      (없으면 ijson 스트리밍으로 product_info만 파싱, ijson도 없으면 json.load)
+    - workers: 파일 병렬 처리 프로세스 수 (0이면 CPU 수, 1이면 순차 처리)
     """
 
     file_suffix: str = "auto"
@@ -39,6 +62,14 @@ class BasicStatsConfig:
     save_summary_json: bool = True
     summary_json_name: str = "basic_stats_summary.json"
 
+    # 상품 집계 테이블(preprocessing/product_facts.py) 옵션
+    use_product_facts: bool = False
+    product_facts_dirname: str = "product_facts/products"
+
+    # 메타데이터 전용 읽기 / 병렬 처리 옵션
+    use_product_info_index: bool = True
+    workers: int = 0
+
 
 def init_review_stat_counters() -> Dict[str, Any]:
     """
@@ -157,6 +188,96 @@ def iter_products_with_reviews(
         yield product_info, []
 
 
+# ==========================================================
+# 상품 메타데이터(product_info)만 읽기
+# ==========================================================
+
+
+def product_info_index_path(path: str | Path) -> Path:
+    """processed_X_with_text.json → processed_X_with_text.product_info.jsonl"""
+    p = Path(path)
+    return p.with_name(p.stem + PRODUCT_INFO_INDEX_SUFFIX)
+
+
+def iter_product_info_index(index_path: str | Path) -> Iterator[Dict[str, Any]]:
+    """상품 메타데이터 인덱스(JSON Lines)에서 product_info를 한 줄씩 반환"""
+    with open(index_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def _is_heavy_key(key: str) -> bool:
+    return key == "reviews" or key.startswith(STREAM_SKIP_KEY_PREFIXES)
+
+
+def iter_product_infos_streaming(path: str | Path) -> Iterator[Dict[str, Any]]:
+    """
+    ijson으로 data[*] 상품을 스트리밍 파싱해 product_info만 반환
+      - 현재 with_text 출력: data[*]가 평평한 product_info dict
+      - 감싼 형식: data[*] = {"product_info": {...}, "reviews": {...}}
+    리뷰/벡터 등 무거운 키는 객체로 만들지 않고 건너뜀
+    """
+    item_prefixes = ("data.item", "data.item.product_info")
+    builder = None
+    skip_prefix = None
+    with open(path, "rb") as f:
+        for prefix, event, value in ijson.parse(f):
+            if skip_prefix is not None:
+                if prefix == skip_prefix or prefix.startswith(skip_prefix + "."):
+                    continue
+                skip_prefix = None
+
+            if builder is None:
+                if prefix == "data.item" and event == "start_map":
+                    builder = ijson.common.ObjectBuilder()
+                    builder.event(event, value)
+                continue
+
+            if event == "map_key" and prefix in item_prefixes and _is_heavy_key(value):
+                skip_prefix = f"{prefix}.{value}"
+                continue
+
+            if prefix == "data.item" and event == "end_map":
+                item = builder.value
+                builder = None
+                info = item.get("product_info", item)
+                yield info if isinstance(info, dict) else {}
+                continue
+
+            builder.event(event, value)
+
+
+def read_product_infos(path: str | Path, cfg: BasicStatsConfig) -> Tuple[List[Dict[str, Any]], str]:
+    """
+    JSON 파일 1개의 product_info 목록 (가장 가벼운 방법 순서로 시도)
+      1) 메타데이터 인덱스(*.product_info.jsonl) - JSON보다 최신일 때만
+      2) ijson 스트리밍 파싱
+      3) json.load 전체 파싱
+
+    Returns:
+        (product_info 리스트, 사용한 방법: "index" / "stream" / "full")
+    """
+    p = Path(path)
+    index_path = product_info_index_path(p)
+    if (
+        cfg.use_product_info_index
+        and index_path.exists()
+        and index_path.stat().st_mtime >= p.stat().st_mtime
+    ):
+        return list(iter_product_info_index(index_path)), "index"
+
+    if ijson is not None:
+        infos = list(iter_product_infos_streaming(p))
+        # data가 상품 dict 리스트가 아닌 파일만 전체 파싱으로 처리
+        if infos:
+            return infos, "stream"
+
+    obj = load_review_json(p)
+    return [info for info, _ in iter_products_with_reviews(obj)], "full"
+
+
 # 상품과 리뷰의 기본 통계 계산
 # =========================
 
@@ -230,6 +351,96 @@ def update_basic_stat_counters(
     meta["total_reviews_collected"] += int(total_reviews)
 
 
+def load_product_facts_table(
+    processed_root: str | Path, cfg: BasicStatsConfig
+) -> Optional[pd.DataFrame]:
+    """
+    전처리 단계에서 저장한 상품 집계 테이블 로드 (category_file 파티션).
+    테이블이 없으면 None.
+    """
+    path = Path(processed_root) / cfg.product_facts_dirname
+    if not path.is_dir():
+        return None
+    facts = pd.read_parquet(path)
+    facts["category_file"] = facts["category_file"].astype(str)
+    return facts
+
+
+def update_counters_from_product_facts(
+    counters: Dict[str, Any],
+    facts: pd.DataFrame,
+    cfg: BasicStatsConfig,
+    meta: Counter,
+) -> None:
+    """
+    상품 집계 테이블로 기본 통계 누적 (리뷰/JSON 순회 없음)
+    - 카테고리: category_file
+    - 상품별 리뷰 수: 수집된 리뷰 수(review_count)
+    - 별점 분포: score_1 ~ score_5 합계
+    """
+    score_columns = {
+        s: f"score_{s}" for s in cfg.valid_scores if f"score_{s}" in facts.columns
+    }
+
+    for category, pids in facts.groupby("category_file")["product_id"]:
+        counters["category_products"][category].update(pids.astype(str))
+
+    for pid, cnt in zip(facts["product_id"].astype(str), facts["review_count"]):
+        counters["product_review_cnt"][pid] += int(cnt)
+
+    category_scores = facts.groupby("category_file")[list(score_columns.values())].sum()
+    for category, row in category_scores.iterrows():
+        for s, column in score_columns.items():
+            cnt = int(row[column])
+            counters["score_cnt"][s] += cnt
+            counters["category_score_cnt"][(category, s)] += cnt
+
+    meta["total_products_seen"] += len(facts)
+    meta["total_reviews_collected"] += int(facts["review_count"].sum())
+
+
+def count_file_stats(args: Tuple[str, BasicStatsConfig]) -> Tuple[Dict[str, Any], Counter]:
+    """
+    파일 1개의 기본 통계 카운터 계산 (병렬 처리 워커)
+
+    Returns:
+        (counters, meta): 파일 단위 카운터 - merge_stat_counters로 합산
+    """
+    path, cfg = args
+    counters = init_review_stat_counters()
+    meta = Counter()
+
+    try:
+        product_infos, source = read_product_infos(path, cfg)
+    except Exception:
+        meta["file_read_error"] += 1
+        return counters, meta
+
+    meta[f"read_{source}"] += 1
+    for product_info in product_infos:
+        update_basic_stat_counters(counters, product_info, [], cfg, meta)
+    return counters, meta
+
+
+def merge_stat_counters(
+    counters: Dict[str, Any], other: Dict[str, Any], meta: Counter, other_meta: Counter
+) -> None:
+    """파일 단위 카운터를 전체 카운터에 합산 (순차 처리와 같은 결과)"""
+    for category, pids in other["category_products"].items():
+        counters["category_products"][category].update(pids)
+    for pid, cnt in other["product_review_cnt"].items():
+        counters["product_review_cnt"][pid] += cnt
+    counters["score_cnt"].update(other["score_cnt"])
+    for key, cnt in other["category_score_cnt"].items():
+        counters["category_score_cnt"][key] += cnt
+    meta.update(other_meta)
+
+
+def resolve_workers(cfg: BasicStatsConfig, n_files: int) -> int:
+    workers = cfg.workers if cfg.workers > 0 else (cpu_count() or 1)
+    return max(1, min(workers, n_files))
+
+
 # =======================================
 # 누적된 통계 결과 표로 정리, 파생 테이블 생성
 # =======================================
@@ -473,7 +684,7 @@ def run_basic_review_stats(
     """
     main에서 호출하는 "기본 통계량 산출" 엔트리 함수.
     - processed_root 아래 suffix 파일들을 수집
-    - JSON 로드 -> 상품 단위 순회 -> 카운터 누적
+    - 파일별 product_info만 읽기(인덱스/스트리밍) -> 카운터 계산 (파일 단위 병렬) -> 합산
     - 최종 DF 변환
     - 옵션이면 저장
     """
@@ -487,20 +698,37 @@ def run_basic_review_stats(
     meta["missing_rating_distribution"] += 0
     # total_reviews와 rating_distribution 합이 다른 상품 수
     meta["review_cnt_mismatch"] += 0
+    # 파일별로 product_info를 읽은 방법 (index: 메타데이터 인덱스, stream: ijson, full: json.load)
+    meta["read_index"] += 0
+    meta["read_stream"] += 0
+    meta["read_full"] += 0
+
+    # 상품 집계 테이블 사용 시 JSON 로드 생략
+    facts = None
+    if cfg.use_product_facts:
+        facts = load_product_facts_table(processed_root, cfg)
+        if facts is None:
+            print("[경고] 상품 집계 테이블이 없어 JSON 메타데이터로 계산합니다.")
 
     # resolve_input_files 사용 (AUTO 지원)
-    files = resolve_input_files(processed_root, cfg)
+    files = resolve_input_files(processed_root, cfg) if facts is None else []
     meta["n_files"] = len(files)
 
-    for fp in files:
-        try:
-            obj = load_review_json(fp)
-        except Exception:
-            meta["file_read_error"] += 1
-            continue
-
-        for product_info, reviews_list in iter_products_with_reviews(obj):
-            update_basic_stat_counters(counters, product_info, reviews_list, cfg, meta)
+    if facts is not None:
+        update_counters_from_product_facts(counters, facts, cfg, meta)
+
+    # 파일 순서대로 합산 → 병렬/순차 결과 동일
+    tasks = [(str(fp), cfg) for fp in files]
+    workers = resolve_workers(cfg, len(tasks))
+    if workers > 1:
+        with Pool(workers) as pool:
+            file_results = pool.imap(count_file_stats, tasks)
+            for file_counters, file_meta in file_results:
+                merge_stat_counters(counters, file_counters, meta, file_meta)
+    else:
+        for task in tasks:
+            file_counters, file_meta = count_file_stats(task)
+            merge_stat_counters(counters, file_counters, meta, file_meta)
 
     tables = build_basic_stat_tables(counters, cfg)
     result: Dict[str, Any] = {"meta": dict(meta), **tables}
@@ -0,0 +1,479 @@
+"""
+EDA 공용 데이터 로더 (processed JSON 1회 스캔 + Parquet 캐시)
+
+- reviews_eda.py / vs_test.py 가 각자 JSON 전체를 두 번씩 읽던 로드를 한 곳으로 모음
+- JSON 파일은 한 번만 열어서 상품 행 / 카테고리 합계 / 텍스트 없는 리뷰를 동시에 수집
+  (컬럼별 리스트에 모은 뒤 타입을 지정해 한 번에 DataFrame 생성)
+- 날짜는 리뷰마다 pd.to_datetime 을 부르지 않고 컬럼 전체를 한 번에 변환
+- 텍스트 리뷰는 Parquet 데이터셋에서 필요한 컬럼만 읽음 (벡터 컬럼 제외)
+- 결과 프레임은 입력 파일 mtime/크기를 키로 Parquet 캐시에 저장
+  → 입력이 그대로면 다음 실행은 캐시만 읽음 (JSON 쪽 / Parquet 쪽 입력을 따로 확인)
+
+사용 예:
+    from eda_data import load_eda_data
+
+    data = load_eda_data()
+    df_product = data["products"]          # 상품 정보 (JSON)
+    df_total_rating = data["category_totals"]  # 파일별 전체 평점 분포
+    df_review_all = data["reviews"]        # 텍스트 리뷰 + 텍스트 없는 리뷰 (메타데이터만)
+    df_review = data["text_reviews"]       # 텍스트 리뷰 (full_text, tokens 포함)
+
+캐시 구조:
+    data/processed_data/eda_cache/
+        _metadata.json          # 입력 파일 목록 (경로 → [mtime_ns, size]) + 생성 시각
+        products.parquet
+        category_totals.parquet
+        json_reviews.parquet
+        text_reviews.parquet
+"""
+
+from __future__ import annotations
+
+import ast
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+DATA_DIR = os.path.join("data", "processed_data")
+REVIEW_DATASET_PATH = os.path.join(DATA_DIR, "integrated_reviews_detail")
+EDA_CACHE_DIR = os.path.join(DATA_DIR, "eda_cache")
+EDA_CACHE_VERSION = 1
+
+JSON_PATTERNS = ("*_with_text.json", "*_without_text.json")
+REVIEW_PART_FILE = "part-0.parquet"
+REVIEW_PARTITION_COLUMN = "category_file"
+RATING_KEYS = ("5", "4", "3", "2", "1")
+
+# 캐시 프레임 → 입력 그룹 ("json": processed JSON, "parquet": 리뷰 데이터셋)
+CACHE_FRAMES = {
+    "products": "json",
+    "category_totals": "json",
+    "json_reviews": "json",
+    "text_reviews": "parquet",
+}
+
+# 텍스트 리뷰에서 읽을 컬럼 (word2vec/bert 벡터는 EDA에서 쓰지 않으므로 제외)
+TEXT_REVIEW_COLUMNS = [
+    "product_id",
+    "review_id",
+    "full_text",
+    "score",
+    "label",
+    "tokens",
+    "char_length",
+    "token_count",
+    "date",
+    "has_image",
+    "helpful_count",
+]
+
+# 통합 리뷰 프레임 컬럼 (reviews_eda.py 의 df_review_all 과 동일)
+REVIEW_ALL_COLUMNS = [
+    "product_id",
+    "review_id",
+    "score",
+    "review_date",
+    "label",
+    "has_image",
+    "helpful_count",
+    "source",
+]
+
+
+# ==============================
+# 입력 파일 / 캐시 키
+# ==============================
+
+
+def find_processed_json_files(data_dir: str | Path = DATA_DIR) -> List[Path]:
+    """data_dir 아래 processed_*_with_text.json / *_without_text.json 전체"""
+    root = Path(data_dir)
+    files = []
+    for pattern in JSON_PATTERNS:
+        files.extend(root.rglob(pattern))
+    return sorted(files)
+
+
+def find_review_part_files(dataset_path: str | Path = REVIEW_DATASET_PATH) -> List[Path]:
+    """리뷰 데이터셋의 카테고리 파티션 파일 전체"""
+    root = Path(dataset_path)
+    if not root.is_dir():
+        return []
+    return sorted(root.glob(f"{REVIEW_PARTITION_COLUMN}=*/{REVIEW_PART_FILE}"))
+
+
+def _file_signature(paths: List[Path]) -> Dict[str, List[int]]:
+    """경로 → [mtime_ns, size] (캐시 유효성 판단용)"""
+    signature = {}
+    for path in paths:
+        stat = path.stat()
+        signature[str(path)] = [stat.st_mtime_ns, stat.st_size]
+    return signature
+
+
+def _cache_file(cache_dir: str | Path, frame: str) -> Path:
+    return Path(cache_dir) / f"{frame}.parquet"
+
+
+def _load_cache_metadata(cache_dir: str | Path) -> Dict[str, Any]:
+    path = Path(cache_dir) / "_metadata.json"
+    if not path.exists():
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            metadata = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    if metadata.get("version") != EDA_CACHE_VERSION:
+        return {}
+    return metadata
+
+
+def _save_cache_metadata(cache_dir: str | Path, metadata: Dict[str, Any]) -> None:
+    path = Path(cache_dir) / "_metadata.json"
+    tmp_path = path.with_suffix(".json.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(metadata, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _write_frame(df: pd.DataFrame, path: Path) -> None:
+    tmp_path = path.with_suffix(".parquet.tmp")
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp_path, compression="snappy")
+    os.replace(tmp_path, path)
+
+
+# ==============================
+# JSON 1회 스캔
+# ==============================
+
+
+def _rating_counts(distribution: Optional[Dict[str, Any]]) -> List[int]:
+    distribution = distribution or {}
+    return [int(distribution.get(key, 0) or 0) for key in RATING_KEYS]
+
+
+def scan_processed_json(json_files: List[Path]) -> Dict[str, pd.DataFrame]:
+    """
+    processed JSON 파일을 한 번씩만 읽어 상품 / 카테고리 합계 / 텍스트 없는 리뷰 프레임 생성
+
+    Args:
+        json_files: find_processed_json_files() 결과
+
+    Returns:
+        dict: {"products", "category_totals", "json_reviews"} DataFrame
+    """
+    product_cols: Dict[str, list] = {
+        key: []
+        for key in (
+            "source_file", "file_type", "product_id", "original_product_id",
+            "category_file", "product_name", "product_name_clean", "brand",
+            "category_path", "category_normal", "price", "total_reviews", "skin_type",
+        )
+    }
+    product_ratings: List[List[int]] = []
+
+    total_cols: Dict[str, list] = {
+        key: []
+        for key in (
+            "source_file", "file_type", "search_name", "total_product",
+            "total_collected_reviews", "total_text_reviews",
+        )
+    }
+    total_ratings: List[List[int]] = []
+
+    review_cols: Dict[str, list] = {
+        key: [] for key in ("product_id", "review_id", "score", "date", "has_image", "helpful_count")
+    }
+
+    for path in json_files:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"[경고] JSON 로드 실패 ({path}): {e}")
+            continue
+
+        file_type = "with_text" if path.name.endswith("_with_text.json") else "without_text"
+
+        if raw.get("total_rating_distribution"):
+            total_cols["source_file"].append(path.name)
+            total_cols["file_type"].append(file_type)
+            total_cols["search_name"].append(raw.get("search_name"))
+            total_cols["total_product"].append(raw.get("total_product"))
+            total_cols["total_collected_reviews"].append(raw.get("total_collected_reviews"))
+            total_cols["total_text_reviews"].append(raw.get("total_text_reviews"))
+            total_ratings.append(_rating_counts(raw["total_rating_distribution"]))
+
+        for item in raw.get("data", []):
+            p_info = item.get("product_info", item)
+            product_id = p_info.get("product_id")
+
+            product_cols["source_file"].append(path.name)
+            product_cols["file_type"].append(file_type)
+            product_cols["product_id"].append(product_id)
+            product_cols["original_product_id"].append(p_info.get("original_product_id"))
+            product_cols["category_file"].append(p_info.get("category_file"))
+            product_cols["product_name"].append(p_info.get("product_name"))
+            product_cols["product_name_clean"].append(p_info.get("product_name_clean"))
+            product_cols["brand"].append(p_info.get("brand"))
+            product_cols["category_path"].append(p_info.get("category_path"))
+            product_cols["category_normal"].append(
+                p_info.get("category_normal") or p_info.get("category")
+            )
+            product_cols["price"].append(p_info.get("price"))
+            product_cols["total_reviews"].append(p_info.get("total_reviews", 0))
+            product_cols["skin_type"].append(p_info.get("skin_type"))
+            product_ratings.append(_rating_counts(p_info.get("rating_distribution")))
+
+            # 텍스트 없는 리뷰 (without_text 파일에만 있음)
+            reviews = item.get("reviews") or {}
+            for r in reviews.get("data", []):
+                review_cols["product_id"].append(product_id)
+                review_cols["review_id"].append(r.get("id"))
+                review_cols["score"].append(r.get("score"))
+                review_cols["date"].append(r.get("date"))
+                review_cols["has_image"].append(r.get("has_image"))
+                review_cols["helpful_count"].append(r.get("helpful_count"))
+
+    rating_columns = [f"rating_{key}" for key in RATING_KEYS]
+
+    products = pd.DataFrame(
+        {
+            "source_file": pd.array(product_cols["source_file"], dtype="string"),
+            "file_type": pd.array(product_cols["file_type"], dtype="string"),
+            "product_id": pd.array(product_cols["product_id"], dtype="string"),
+            "original_product_id": pd.to_numeric(
+                pd.Series(product_cols["original_product_id"], dtype="object"), errors="coerce"
+            ).astype("Int64"),
+            "category_file": pd.array(product_cols["category_file"], dtype="string"),
+            "product_name": pd.array(product_cols["product_name"], dtype="string"),
+            "product_name_clean": pd.array(product_cols["product_name_clean"], dtype="string"),
+            "brand": pd.array(product_cols["brand"], dtype="string"),
+            "category_path": pd.array(product_cols["category_path"], dtype="string"),
+            "category_normal": pd.array(product_cols["category_normal"], dtype="string"),
+            "price": pd.to_numeric(
+                pd.Series(product_cols["price"], dtype="object"), errors="coerce"
+            ).astype("float64"),
+            "total_reviews": pd.to_numeric(
+                pd.Series(product_cols["total_reviews"], dtype="object"), errors="coerce"
+            ).fillna(0).astype("int64"),
+            "skin_type": pd.array(product_cols["skin_type"], dtype="string"),
+        }
+    )
+    products[rating_columns] = np.asarray(product_ratings, dtype="int64").reshape(-1, len(RATING_KEYS))
+
+    category_totals = pd.DataFrame(
+        {
+            "source_file": pd.array(total_cols["source_file"], dtype="string"),
+            "file_type": pd.array(total_cols["file_type"], dtype="string"),
+            "search_name": pd.array(total_cols["search_name"], dtype="string"),
+            "total_product": pd.to_numeric(
+                pd.Series(total_cols["total_product"], dtype="object"), errors="coerce"
+            ).astype("Int64"),
+            "total_collected_reviews": pd.to_numeric(
+                pd.Series(total_cols["total_collected_reviews"], dtype="object"), errors="coerce"
+            ).astype("Int64"),
+            "total_text_reviews": pd.to_numeric(
+                pd.Series(total_cols["total_text_reviews"], dtype="object"), errors="coerce"
+            ).astype("Int64"),
+        }
+    )
+    category_totals[rating_columns] = np.asarray(total_ratings, dtype="int64").reshape(
+        -1, len(RATING_KEYS)
+    )
+
+    json_reviews = pd.DataFrame(
+        {
+            "product_id": pd.array(review_cols["product_id"], dtype="string"),
+            "review_id": pd.array(
+                [None if v is None else str(v) for v in review_cols["review_id"]], dtype="string"
+            ),
+            "score": pd.to_numeric(
+                pd.Series(review_cols["score"], dtype="object"), errors="coerce"
+            ).astype("Int64"),
+            # 날짜는 컬럼 단위로 한 번에 변환
+            "review_date": pd.to_datetime(
+                pd.Series(review_cols["date"], dtype="object"), errors="coerce"
+            ),
+            "has_image": pd.Series(review_cols["has_image"], dtype="object")
+            .fillna(False)
+            .astype(bool)
+            .astype("int64"),
+            "helpful_count": pd.to_numeric(
+                pd.Series(review_cols["helpful_count"], dtype="object"), errors="coerce"
+            ).fillna(0).astype("int64"),
+        }
+    )
+
+    return {
+        "products": products,
+        "category_totals": category_totals,
+        "json_reviews": json_reviews,
+    }
+
+
+# ==============================
+# 텍스트 리뷰 (Parquet 데이터셋)
+# ==============================
+
+
+def _parse_tokens(value):
+    """tokens 컬럼 정규화 (list / ndarray / 문자열 "['a', 'b']" → list)"""
+    if isinstance(value, list):
+        return value
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, str):
+        try:
+            parsed = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            return []
+        return list(parsed) if isinstance(parsed, (list, tuple)) else []
+    return []
+
+
+def read_text_reviews(dataset_path: str | Path = REVIEW_DATASET_PATH) -> pd.DataFrame:
+    """
+    리뷰 데이터셋에서 TEXT_REVIEW_COLUMNS + category_file 만 읽어 타입 정리
+
+    Returns:
+        DataFrame: 텍스트 리뷰 (date는 datetime, 문자열로 저장된 tokens는 리스트로 파싱)
+    """
+    part_files = find_review_part_files(dataset_path)
+    if not part_files:
+        return pd.DataFrame(columns=TEXT_REVIEW_COLUMNS + [REVIEW_PARTITION_COLUMN])
+
+    names = set(pq.read_schema(part_files[0]).names)
+    columns = [c for c in TEXT_REVIEW_COLUMNS if c in names]
+    df = pq.read_table(dataset_path, columns=columns + [REVIEW_PARTITION_COLUMN], partitioning="hive").to_pandas()
+    for column in TEXT_REVIEW_COLUMNS:
+        if column not in df:
+            df[column] = None
+
+    df[REVIEW_PARTITION_COLUMN] = df[REVIEW_PARTITION_COLUMN].astype(str)
+    df["review_id"] = df["review_id"].astype("string")
+    df["score"] = pd.to_numeric(df["score"], errors="coerce").astype("Int64")
+    df["label"] = pd.to_numeric(df["label"], errors="coerce").astype("Int64")
+    df["has_image"] = df["has_image"].fillna(False).astype(bool).astype("int64")
+    df["helpful_count"] = pd.to_numeric(df["helpful_count"], errors="coerce").fillna(0).astype("int64")
+    df["char_length"] = pd.to_numeric(df["char_length"], errors="coerce").fillna(0).astype("int64")
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+
+    # 이전 버전 데이터셋은 tokens가 문자열로 저장되어 있음 → 문자열일 때만 파싱
+    tokens = df["tokens"]
+    if tokens.map(lambda v: isinstance(v, str)).any() or tokens.isna().any():
+        df["tokens"] = tokens.map(_parse_tokens)
+    return df
+
+
+# ==============================
+# 캐시 로드
+# ==============================
+
+
+def _build_review_all(json_reviews: pd.DataFrame, text_reviews: pd.DataFrame) -> pd.DataFrame:
+    """텍스트 리뷰 + 텍스트 없는 리뷰 → 리뷰 단위 통합 프레임 (REVIEW_ALL_COLUMNS)"""
+    parquet_part = pd.DataFrame(
+        {
+            "product_id": text_reviews["product_id"].astype("string"),
+            "review_id": text_reviews["review_id"].astype("string"),
+            "score": text_reviews["score"].astype("Int64"),
+            "review_date": text_reviews["date"],
+            "label": text_reviews["label"].astype("Int64"),
+            "has_image": text_reviews["has_image"],
+            "helpful_count": text_reviews["helpful_count"],
+            "source": "parquet",
+        }
+    )
+    json_part = json_reviews.assign(label=pd.array([pd.NA] * len(json_reviews), dtype="Int64"), source="json")
+    return pd.concat(
+        [parquet_part[REVIEW_ALL_COLUMNS], json_part[REVIEW_ALL_COLUMNS]],
+        ignore_index=True,
+    )
+
+
+def load_eda_data(
+    data_dir: str | Path = DATA_DIR,
+    dataset_path: str | Path = REVIEW_DATASET_PATH,
+    cache_dir: Optional[str | Path] = EDA_CACHE_DIR,
+    refresh: bool = False,
+) -> Dict[str, pd.DataFrame]:
+    """
+    EDA용 상품 / 리뷰 프레임 로드 (입력이 바뀐 쪽만 다시 계산)
+
+    Args:
+        data_dir: processed JSON 루트
+        dataset_path: 리뷰 Parquet 데이터셋 디렉토리
+        cache_dir: 캐시 디렉토리 (None이면 캐시 사용 안 함)
+        refresh: True면 캐시를 무시하고 다시 계산
+
+    Returns:
+        dict: {
+            "products": 상품 정보 (rating_1 ~ rating_5 포함),
+            "category_totals": JSON 파일별 전체 평점 분포,
+            "json_reviews": 텍스트 없는 리뷰,
+            "text_reviews": 텍스트 리뷰 (full_text, tokens 포함, 벡터 제외),
+            "reviews": 텍스트 리뷰 + 텍스트 없는 리뷰 통합 (REVIEW_ALL_COLUMNS),
+        }
+    """
+    start = time.perf_counter()
+    signatures = {
+        "json": _file_signature(find_processed_json_files(data_dir)),
+        "parquet": _file_signature(find_review_part_files(dataset_path)),
+    }
+
+    metadata = {} if (cache_dir is None or refresh) else _load_cache_metadata(cache_dir)
+    cached_inputs = metadata.get("inputs", {})
+    frames: Dict[str, pd.DataFrame] = {}
+    rebuilt = []
+
+    for group in ("json", "parquet"):
+        group_frames = [frame for frame, g in CACHE_FRAMES.items() if g == group]
+        valid = (
+            cache_dir is not None
+            and cached_inputs.get(group) == signatures[group]
+            and all(_cache_file(cache_dir, frame).exists() for frame in group_frames)
+        )
+        if valid:
+            for frame in group_frames:
+                frames[frame] = pd.read_parquet(_cache_file(cache_dir, frame))
+            continue
+
+        if group == "json":
+            frames.update(scan_processed_json([Path(p) for p in signatures["json"]]))
+        else:
+            frames["text_reviews"] = read_text_reviews(dataset_path)
+        rebuilt.extend(group_frames)
+
+    if cache_dir is not None and rebuilt:
+        os.makedirs(cache_dir, exist_ok=True)
+        for frame in rebuilt:
+            _write_frame(frames[frame], _cache_file(cache_dir, frame))
+        _save_cache_metadata(
+            cache_dir,
+            {
+                "version": EDA_CACHE_VERSION,
+                "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "inputs": signatures,
+                "rows": {frame: len(df) for frame, df in frames.items()},
+            },
+        )
+
+    frames["reviews"] = _build_review_all(frames["json_reviews"], frames["text_reviews"])
+
+    elapsed = time.perf_counter() - start
+    source = "다시 계산: " + ", ".join(rebuilt) if rebuilt else "캐시"
+    print(
+        f"EDA 데이터 로드 ({source}) - 상품 {len(frames['products']):,}개, "
+        f"리뷰 {len(frames['reviews']):,}개, {elapsed:.1f}초"
+    )
+    return frames
@@ -0,0 +1,575 @@
+"""
+EDA 차트 리포트 생성기 (headless 일괄 PNG/HTML 출력)
+
+- reviews_eda.py / vs_test.py 의 차트를 plt.show() 없이 PNG 파일로 저장하고 index.html 로 묶음
+- 리뷰 전체를 그리던 차트는 작은 요약 테이블로 대체
+    * 리뷰 길이 × helpful_count 산점도 → 로그 구간 2차원 히스토그램
+    * 평점별 리뷰 길이 violin → 평점별 층화 표본 (SAMPLE_PER_SCORE개)
+    * 평점별 helpful_count box → 평점별 사분위/수염 통계 (전체 리뷰 기준 정확한 값)
+    * 워드클라우드 → 상위 단어 빈도표
+- 차트별 요약 테이블 해시를 _manifest.json 에 기록 → 요약 테이블이 바뀐 차트만 다시 그림
+- 다시 그릴 차트는 프로세스 풀에서 병렬 렌더링
+
+실행:
+    python src/EDA/report_charts.py              # 바뀐 차트만
+    python src/EDA/report_charts.py --force      # 전체 다시 그리기
+
+출력 구조:
+    data/processed_data/eda_outputs/charts/
+        _manifest.json      # 차트 → {hash, file, rendered_at}
+        index.html
+        <차트 이름>.png
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import html
+import json
+import os
+import platform
+import time
+from multiprocessing import Pool, cpu_count
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import seaborn as sns
+
+try:
+    from wordcloud import WordCloud
+except ImportError:
+    WordCloud = None
+
+from eda_data import DATA_DIR, REVIEW_DATASET_PATH, load_eda_data
+
+# 운영체제별 한글 폰트 설정
+if platform.system() == "Windows":
+    plt.rc("font", family="Malgun Gothic")
+    plt.rcParams["axes.unicode_minus"] = False
+    FONT_PATH = r"C:\WINDOWS\FONTS\MALGUNSL.TTF"
+elif platform.system() == "Darwin":  # macOS
+    plt.rc("font", family="AppleGothic")
+    plt.rcParams["axes.unicode_minus"] = False
+    FONT_PATH = "/System/Library/Fonts/Supplemental/AppleGothic.ttf"
+else:  # Linux
+    plt.rc("font", family="NanumGothic")
+    plt.rcParams["axes.unicode_minus"] = False
+    FONT_PATH = "/usr/share/fonts/truetype/nanum/NanumGothic.ttf"
+
+REPORT_DIR = os.path.join(DATA_DIR, "eda_outputs", "charts")
+MANIFEST_FILE = "_manifest.json"
+CHART_DPI = 120
+
+SCORES = (1, 2, 3, 4, 5)
+LENGTH_HIST_MAX = 2000  # 리뷰 길이 히스토그램 상한 (reviews_eda.py 의 xlim)
+LENGTH_HIST_BINS = 50
+HIST2D_BINS = 40  # 로그 구간 수 (축마다)
+SAMPLE_PER_SCORE = 2000  # violin 용 평점별 표본 크기
+SAMPLE_SEED = 42
+TOP_PRODUCTS = 10
+WORDCLOUD_MAX_WORDS = 100
+
+
+# ==============================
+# 요약 테이블 (차트 입력)
+# ==============================
+
+
+def summarize_score_distribution(data: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """JSON 파일별 전체 평점 분포 합계 → score, count"""
+    totals = data["category_totals"]
+    return pd.DataFrame(
+        {
+            "score": list(SCORES),
+            "count": [int(totals[f"rating_{s}"].sum()) for s in SCORES],
+        }
+    )
+
+
+def summarize_review_length(data: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """텍스트 리뷰 길이 히스토그램 (0 ~ LENGTH_HIST_MAX)"""
+    lengths = data["text_reviews"]["char_length"].to_numpy()
+    counts, edges = np.histogram(
+        lengths, bins=LENGTH_HIST_BINS, range=(0, LENGTH_HIST_MAX)
+    )
+    return pd.DataFrame({"left": edges[:-1], "right": edges[1:], "count": counts})
+
+
+def _log_edges(max_value: float) -> np.ndarray:
+    # 0을 포함하도록 값 + 1 기준 로그 구간
+    return np.logspace(0, np.log10(max(max_value, 1) + 2), HIST2D_BINS + 1)
+
+
+def summarize_length_helpful(data: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """리뷰 길이 × helpful_count 2차원 히스토그램 (값 + 1 의 로그 구간, 0이 아닌 칸만)"""
+    text = data["text_reviews"]
+    x = text["char_length"].to_numpy(dtype=float) + 1
+    y = text["helpful_count"].to_numpy(dtype=float) + 1
+    x_edges = _log_edges(x.max() if len(x) else 1)
+    y_edges = _log_edges(y.max() if len(y) else 1)
+    counts, _, _ = np.histogram2d(x, y, bins=[x_edges, y_edges])
+    xi, yi = np.nonzero(counts)
+    return pd.DataFrame(
+        {
+            "x_left": x_edges[xi],
+            "x_right": x_edges[xi + 1],
+            "y_left": y_edges[yi],
+            "y_right": y_edges[yi + 1],
+            "count": counts[xi, yi].astype("int64"),
+        }
+    )
+
+
+def summarize_score_length(data: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """평점별 리뷰 길이 층화 표본 (평점마다 최대 SAMPLE_PER_SCORE개, 고정 seed)"""
+    text = data["text_reviews"][["score", "char_length"]].dropna(subset=["score"])
+    text = text[text["score"].isin(SCORES)]
+    # 고정 seed로 섞은 뒤 평점별 앞에서 SAMPLE_PER_SCORE개
+    sample = (
+        text.sample(frac=1.0, random_state=SAMPLE_SEED)
+        .groupby("score")
+        .head(SAMPLE_PER_SCORE)
+        .astype({"score": "int64", "char_length": "int64"})
+    )
+    return sample.sort_values(["score", "char_length"]).reset_index(drop=True)
+
+
+def summarize_score_helpful(data: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """평점별 helpful_count box plot 통계 (사분위 + 1.5 IQR 수염, 전체 리뷰 기준)"""
+    text = data["text_reviews"][["score", "helpful_count"]].dropna(subset=["score"])
+    rows = []
+    for score in SCORES:
+        values = np.sort(text.loc[text["score"] == score, "helpful_count"].to_numpy())
+        if len(values) == 0:
+            continue
+        q1, med, q3 = np.percentile(values, [25, 50, 75])
+        iqr = q3 - q1
+        inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+        rows.append(
+            {
+                "score": score,
+                "count": len(values),
+                "whislo": float(inside.min()),
+                "q1": float(q1),
+                "med": float(med),
+                "q3": float(q3),
+                "whishi": float(inside.max()),
+                "mean": float(values.mean()),
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+def summarize_product_score_helpful(data: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """상품별 평균 평점 & 평균 helpful_count (텍스트 리뷰 + 텍스트 없는 리뷰)"""
+    reviews = data["reviews"]
+    return (
+        reviews.groupby("product_id")
+        .agg(
+            mean_score=("score", "mean"),
+            mean_helpful=("helpful_count", "mean"),
+            review_count=("score", "count"),
+        )
+        .reset_index()
+        .astype({"product_id": str, "mean_score": "float64", "mean_helpful": "float64"})
+    )
+
+
+def _product_names(data: Dict[str, pd.DataFrame]) -> pd.Series:
+    """product_id → 상품명 30자 (정제된 상품명 우선)"""
+    products = data["products"].drop_duplicates("product_id")
+    names = products["product_name_clean"].fillna(products["product_name"]).fillna(products["product_id"])
+    return pd.Series(names.str.slice(0, 30).to_numpy(dtype=object), index=products["product_id"].astype(str))
+
+
+def summarize_top_avg_rating(data: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """상품 메타데이터 평점 분포 기준 평균 평점 TOP 10"""
+    products = data["products"].drop_duplicates("product_id")
+    counts = products[[f"rating_{s}" for s in SCORES]].to_numpy(dtype=float)
+    totals = counts.sum(axis=1)
+    avg = np.divide(counts @ np.array(SCORES, dtype=float), totals, out=np.full(len(totals), np.nan), where=totals > 0)
+    names = _product_names(data)
+    table = pd.DataFrame(
+        {
+            "product_id": products["product_id"].astype(str).to_numpy(),
+            "avg_rating": avg,
+            "rating_count": totals.astype("int64"),
+        }
+    ).dropna(subset=["avg_rating"])
+    table["product_name"] = table["product_id"].map(names)
+    return (
+        table.sort_values(["avg_rating", "rating_count"], ascending=False)
+        .head(TOP_PRODUCTS)
+        .reset_index(drop=True)
+    )
+
+
+def summarize_rating_heatmap(data: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """리뷰 많은 상품 TOP 10 × 평점 리뷰 수"""
+    reviews = data["reviews"].dropna(subset=["score"])
+    pivot = (
+        reviews.groupby([reviews["product_id"].astype(str), "score"])
+        .size()
+        .unstack(fill_value=0)
+        .reindex(columns=list(SCORES), fill_value=0)
+    )
+    pivot = pivot.loc[pivot.sum(axis=1).sort_values(ascending=False).head(TOP_PRODUCTS).index]
+    names = _product_names(data)
+    pivot.index = [names.get(pid, pid) for pid in pivot.index]
+    pivot.columns = [str(s) for s in SCORES]
+    return pivot.rename_axis("product_name").reset_index()
+
+
+def summarize_monthly_reviews(data: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """월별 리뷰 수 (리뷰 수 기반 판매량 추이)"""
+    dates = data["reviews"]["review_date"].dropna()
+    if dates.empty:
+        return pd.DataFrame({"month": pd.Series(dtype="datetime64[ns]"), "review_count": pd.Series(dtype="int64")})
+    monthly = dates.to_frame("review_date").set_index("review_date").resample("ME").size()
+    return monthly.rename_axis("month").reset_index(name="review_count")
+
+
+def _token_frequencies(data: Dict[str, pd.DataFrame], label: int) -> pd.DataFrame:
+    text = data["text_reviews"]
+    tokens = text.loc[text["label"] == label, "tokens"].explode().dropna()
+    counts = tokens.astype(str).value_counts().head(WORDCLOUD_MAX_WORDS)
+    return counts.rename_axis("word").reset_index(name="count")
+
+
+def summarize_positive_words(data: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    return _token_frequencies(data, 1)
+
+
+def summarize_negative_words(data: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    return _token_frequencies(data, 0)
+
+
+# ==============================
+# 렌더러 (요약 테이블 → PNG)
+# ==============================
+
+
+def render_score_distribution(df: pd.DataFrame, ax) -> None:
+    ax.barh([f"{s}점" for s in df["score"]], df["count"], color=sns.color_palette("YlOrRd", len(df)))
+    ax.set_title("전체 상품 평점 분포", weight="bold")
+    ax.set_xlabel("리뷰 수")
+    ax.grid(axis="x", alpha=0.3)
+
+
+def render_review_length(df: pd.DataFrame, ax) -> None:
+    ax.bar(df["left"], df["count"], width=df["right"] - df["left"], align="edge", color="pink")
+    ax.set_title("리뷰 길이 분포", weight="bold")
+    ax.set_xlim(0, LENGTH_HIST_MAX)
+    ax.set_xlabel("리뷰 길이")
+    ax.set_ylabel("리뷰 수")
+
+
+def render_length_helpful(df: pd.DataFrame, ax) -> None:
+    if df.empty:
+        ax.text(0.5, 0.5, "데이터 없음", ha="center", va="center", transform=ax.transAxes)
+    else:
+        x_edges = np.union1d(df["x_left"], df["x_right"])
+        y_edges = np.union1d(df["y_left"], df["y_right"])
+        grid = np.full((len(y_edges) - 1, len(x_edges) - 1), np.nan)
+        grid[np.searchsorted(y_edges, df["y_left"]), np.searchsorted(x_edges, df["x_left"])] = df["count"]
+        mesh = ax.pcolormesh(x_edges, y_edges, grid, cmap="Greens", norm=matplotlib.colors.LogNorm())
+        ax.figure.colorbar(mesh, ax=ax, label="리뷰 수")
+        ax.set_xscale("log")
+        ax.set_yscale("log")
+    ax.set_title("리뷰 길이 & Helpful_count", weight="bold")
+    ax.set_xlabel("리뷰 길이 + 1")
+    ax.set_ylabel("Helpful_count + 1")
+
+
+def render_score_length(df: pd.DataFrame, ax) -> None:
+    sns.violinplot(x="score", y="char_length", data=df, hue="score", palette="Set2", legend=False, ax=ax)
+    ax.set_title(f"평점별 리뷰 길이 (평점별 표본 최대 {SAMPLE_PER_SCORE:,}개)", weight="bold")
+    ax.set_xlabel("평점")
+    ax.set_ylabel("리뷰 길이")
+    ax.set_ylim(0, 1500)
+
+
+def render_score_helpful(df: pd.DataFrame, ax) -> None:
+    stats = [
+        {
+            "label": str(row.score),
+            "whislo": row.whislo,
+            "q1": row.q1,
+            "med": row.med,
+            "q3": row.q3,
+            "whishi": row.whishi,
+            "mean": row.mean,
+        }
+        for row in df.itertuples()
+    ]
+    if stats:
+        boxes = ax.bxp(stats, showfliers=False, showmeans=True, patch_artist=True)
+        for patch, color in zip(boxes["boxes"], sns.color_palette("Pastel1", len(stats))):
+            patch.set_facecolor(color)
+    ax.set_yscale("symlog")
+    ax.set_title("평점별 helpful_count", weight="bold")
+    ax.set_xlabel("평점")
+    ax.set_ylabel("Helpful_count")
+
+
+def render_product_score_helpful(df: pd.DataFrame, ax) -> None:
+    ax.scatter(df["mean_score"], df["mean_helpful"], s=60, alpha=0.7, color="skyblue", edgecolor="blue")
+    ax.set_title("상품 평균 평점 & Helpful_count", weight="bold")
+    ax.set_xlabel("상품 평균 평점")
+    ax.set_ylabel("Helpful_count")
+
+
+def render_top_avg_rating(df: pd.DataFrame, ax) -> None:
+    ax.barh(df["product_name"].fillna(df["product_id"]), df["avg_rating"], color="slateblue")
+    ax.set_title(f"TOP {TOP_PRODUCTS} 상품 평균 평점", weight="bold")
+    if len(df):
+        ax.set_xlim(max(0, df["avg_rating"].min() - 0.1), 5)
+    ax.invert_yaxis()
+
+
+def render_rating_heatmap(df: pd.DataFrame, ax) -> None:
+    pivot = df.set_index("product_name")
+    if pivot.empty:
+        ax.text(0.5, 0.5, "데이터 없음", ha="center", va="center", transform=ax.transAxes)
+    else:
+        sns.heatmap(
+            pivot,
+            cmap="YlOrRd",
+            annot=True,
+            fmt=".0f",
+            annot_kws={"size": 8},
+            linewidths=0.5,
+            linecolor="white",
+            ax=ax,
+        )
+    ax.set_title("상품별 평점 분포 히트맵", weight="bold")
+    ax.set_xlabel("평점")
+    ax.set_ylabel("상품명")
+
+
+def render_monthly_reviews(df: pd.DataFrame, ax) -> None:
+    if df.empty:
+        ax.text(0.5, 0.5, "날짜 데이터 없음", ha="center", va="center", transform=ax.transAxes)
+    else:
+        ax.plot(df["month"], df["review_count"], linewidth=2, color="salmon")
+    ax.set_title("월별 평균 판매량 추이 (리뷰 수 기반)", weight="bold")
+    ax.set_xlabel("월")
+    ax.set_ylabel("리뷰 수")
+
+
+def _render_wordcloud(df: pd.DataFrame, ax, title: str, colormap: str) -> None:
+    if df.empty:
+        ax.text(0.5, 0.5, "데이터 없음", ha="center", va="center", transform=ax.transAxes)
+    else:
+        cloud = WordCloud(
+            font_path=FONT_PATH if os.path.exists(FONT_PATH) else None,
+            background_color="white",
+            width=800,
+            height=600,
+            max_words=WORDCLOUD_MAX_WORDS,
+            colormap=colormap,
+        ).generate_from_frequencies(dict(zip(df["word"], df["count"])))
+        ax.imshow(cloud)
+    ax.set_title(title)
+    ax.axis("off")
+
+
+def render_positive_words(df: pd.DataFrame, ax) -> None:
+    _render_wordcloud(df, ax, "긍정 리뷰 워드클라우드", "OrRd")
+
+
+def render_negative_words(df: pd.DataFrame, ax) -> None:
+    _render_wordcloud(df, ax, "부정 리뷰 워드클라우드", "cool")
+
+
+# 차트 이름 → (제목, 요약 함수, 렌더 함수, figsize)
+CHARTS: Dict[str, Tuple[str, Callable, Callable, Tuple[float, float]]] = {
+    "score_distribution": ("전체 평점 분포", summarize_score_distribution, render_score_distribution, (6, 4)),
+    "review_length": ("리뷰 길이 분포", summarize_review_length, render_review_length, (7, 4)),
+    "length_helpful": ("리뷰 길이 & Helpful_count", summarize_length_helpful, render_length_helpful, (7, 5)),
+    "score_length": ("평점별 리뷰 길이", summarize_score_length, render_score_length, (7, 5)),
+    "score_helpful": ("평점별 helpful_count", summarize_score_helpful, render_score_helpful, (7, 5)),
+    "product_score_helpful": ("상품 평균 평점 & Helpful_count", summarize_product_score_helpful, render_product_score_helpful, (7, 5)),
+    "top_avg_rating": ("평균 평점 TOP 상품", summarize_top_avg_rating, render_top_avg_rating, (8, 5)),
+    "rating_heatmap": ("상품별 평점 분포", summarize_rating_heatmap, render_rating_heatmap, (10, 6)),
+    "monthly_reviews": ("월별 리뷰 수", summarize_monthly_reviews, render_monthly_reviews, (12, 4)),
+    "positive_words": ("긍정 리뷰 워드클라우드", summarize_positive_words, render_positive_words, (8, 6)),
+    "negative_words": ("부정 리뷰 워드클라우드", summarize_negative_words, render_negative_words, (8, 6)),
+}
+WORDCLOUD_CHARTS = ("positive_words", "negative_words")
+
+
+# ==============================
+# 변경 감지 / 렌더링
+# ==============================
+
+
+def table_hash(df: pd.DataFrame) -> str:
+    """요약 테이블 내용 해시 (컬럼명 + 값)"""
+    digest = hashlib.sha1("|".join(map(str, df.columns)).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _load_manifest(report_dir: str | Path) -> Dict[str, Any]:
+    path = Path(report_dir) / MANIFEST_FILE
+    if not path.exists():
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f).get("charts", {})
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def _save_manifest(report_dir: str | Path, charts: Dict[str, Any]) -> None:
+    path = Path(report_dir) / MANIFEST_FILE
+    tmp_path = path.with_suffix(".json.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"charts": charts}, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def render_chart(args: Tuple[str, pd.DataFrame, str]) -> Tuple[str, float]:
+    """
+    차트 1개 렌더링 (프로세스 풀 워커)
+
+    Args:
+        args: (차트 이름, 요약 테이블, 출력 PNG 경로)
+
+    Returns:
+        (차트 이름, 소요 시간 초)
+    """
+    name, df, out_path = args
+    start = time.perf_counter()
+    _, _, render, figsize = CHARTS[name]
+    fig, ax = plt.subplots(figsize=figsize)
+    try:
+        render(df, ax)
+        fig.tight_layout()
+        tmp_path = out_path + ".tmp.png"
+        fig.savefig(tmp_path, dpi=CHART_DPI)
+        os.replace(tmp_path, out_path)
+    finally:
+        plt.close(fig)
+    return name, time.perf_counter() - start
+
+
+def write_report_html(report_dir: str | Path, manifest: Dict[str, Any]) -> str:
+    """차트 PNG를 묶은 index.html 저장"""
+    sections = []
+    for name, (title, _, _, _) in CHARTS.items():
+        entry = manifest.get(name)
+        if not entry:
+            continue
+        sections.append(
+            f'<section><h2>{html.escape(title)}</h2>'
+            f'<img src="{html.escape(entry["file"])}" alt="{html.escape(title)}">'
+            f'<p class="meta">{html.escape(name)} · {html.escape(entry["rendered_at"])}</p></section>'
+        )
+    page = (
+        "<!DOCTYPE html>\n<html lang=\"ko\">\n<head>\n<meta charset=\"utf-8\">\n"
+        "<title>리뷰 EDA 리포트</title>\n"
+        "<style>body{font-family:sans-serif;margin:24px}section{margin-bottom:32px}"
+        "img{max-width:100%}.meta{color:#888;font-size:12px}</style>\n"
+        "</head>\n<body>\n<h1>리뷰 EDA 리포트</h1>\n"
+        + "\n".join(sections)
+        + "\n</body>\n</html>\n"
+    )
+    path = Path(report_dir) / "index.html"
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(page)
+    return str(path)
+
+
+def build_chart_report(
+    data_dir: str | Path = DATA_DIR,
+    dataset_path: str | Path = REVIEW_DATASET_PATH,
+    report_dir: str | Path = REPORT_DIR,
+    charts: Optional[List[str]] = None,
+    workers: int = 0,
+    force: bool = False,
+) -> Dict[str, Any]:
+    """
+    EDA 차트 리포트 생성 (요약 테이블이 바뀐 차트만 다시 렌더링)
+
+    Args:
+        data_dir: processed JSON 루트
+        dataset_path: 리뷰 Parquet 데이터셋 디렉토리
+        report_dir: PNG / index.html 출력 디렉토리
+        charts: 그릴 차트 이름 목록 (None이면 CHARTS 전체)
+        workers: 렌더링 프로세스 수 (0이면 CPU 수)
+        force: True면 변경 여부와 관계없이 전부 다시 렌더링
+
+    Returns:
+        dict: {"rendered": [차트], "skipped": [차트], "html": index.html 경로}
+    """
+    names = list(CHARTS) if charts is None else [c for c in charts if c in CHARTS]
+    if WordCloud is None:
+        skipped_wc = [c for c in names if c in WORDCLOUD_CHARTS]
+        if skipped_wc:
+            print(f"[경고] wordcloud가 설치되어 있지 않아 건너뜁니다: {', '.join(skipped_wc)}")
+        names = [c for c in names if c not in WORDCLOUD_CHARTS]
+
+    data = load_eda_data(data_dir, dataset_path)
+    os.makedirs(report_dir, exist_ok=True)
+    manifest = _load_manifest(report_dir)
+
+    tasks = []
+    hashes = {}
+    skipped = []
+    for name in names:
+        table = CHARTS[name][1](data)
+        hashes[name] = table_hash(table)
+        file_name = f"{name}.png"
+        entry = manifest.get(name, {})
+        up_to_date = (
+            not force
+            and entry.get("hash") == hashes[name]
+            and (Path(report_dir) / file_name).exists()
+        )
+        if up_to_date:
+            skipped.append(name)
+        else:
+            tasks.append((name, table, str(Path(report_dir) / file_name)))
+
+    rendered = []
+    if tasks:
+        n_workers = max(1, min(workers if workers > 0 else (cpu_count() or 1), len(tasks)))
+        if n_workers > 1:
+            with Pool(n_workers) as pool:
+                results = pool.map(render_chart, tasks)
+        else:
+            results = [render_chart(task) for task in tasks]
+
+        rendered_at = time.strftime("%Y-%m-%d %H:%M:%S")
+        for name, seconds in results:
+            manifest[name] = {"hash": hashes[name], "file": f"{name}.png", "rendered_at": rendered_at}
+            rendered.append(name)
+            print(f"  - {name}: {seconds:.2f}초")
+        _save_manifest(report_dir, manifest)
+
+    html_path = write_report_html(report_dir, manifest)
+    print(f"✓ 차트 리포트: {html_path} (렌더링 {len(rendered)}개, 변경 없음 {len(skipped)}개)")
+    return {"rendered": rendered, "skipped": skipped, "html": html_path}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="EDA 차트 리포트 생성 (headless)")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--dataset", default=REVIEW_DATASET_PATH)
+    parser.add_argument("--out", default=REPORT_DIR)
+    parser.add_argument("--charts", nargs="*", default=None, help=f"차트 이름 ({', '.join(CHARTS)})")
+    parser.add_argument("--workers", type=int, default=0)
+    parser.add_argument("--force", action="store_true")
+    args = parser.parse_args()
+
+    build_chart_report(args.data_dir, args.dataset, args.out, args.charts, args.workers, args.force)
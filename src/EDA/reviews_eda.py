@@ -1,7 +1,5 @@
-import ast
 import re
 import os
-import json
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
@@ -12,7 +10,8 @@ import seaborn as sns
 import random
 import matplotlib.gridspec as gridspec
 import platform
-from pathlib import Path
+
+from eda_data import load_eda_data
 
 if platform.system() == "Windows":
     plt.rc("font", family="Malgun Gothic")
@@ -33,69 +32,46 @@ else:  # Linux
     FONT_PATH = "/usr/share/fonts/truetype/nanum/NanumGothic.ttf"
 
 DATA_DIR = os.path.join("data", "processed_data")
-PARQUET_PATH = os.path.join(
-    "data", "processed_data", "integrated_reviews_detail.parquet"
-)
-
+PARQUET_PATH = os.path.join("data", "processed_data", "integrated_reviews_detail")
 
-# 재귀적으로 모든 JSON 파일 읽기
-json_files = [str(p) for p in Path(DATA_DIR).rglob("*.json")]
-
-print(f"총 JSON 파일 개수: {len(json_files)}")
-for jf in json_files[:5]:  # 처음 5개 파일 경로 출력
-    print(f"  - {jf}")
 
+# JSON은 한 번만 스캔하고, 결과는 입력 mtime 기준 Parquet 캐시로 재사용 (eda_data.py)
+eda_data = load_eda_data(DATA_DIR, PARQUET_PATH)
 
 # 상품 데이터
-product_rows = []
-total_rating_rows = []
-
-for path in json_files:
-    with open(path, "r", encoding="utf-8") as f:
-        raw = json.load(f)
-
-    total_rating_dist = raw.get("total_rating_distribution")
-    if not total_rating_dist:
-        continue
-
-    total_rating_rows.append(
-        {
-            "search_name": raw.get("search_name"),
-            "total_product": raw.get("total_product"),
-            "total_collected_reviews": raw.get("total_collected_reviews"),
-            "rating_5": total_rating_dist.get("5", 0),
-            "rating_4": total_rating_dist.get("4", 0),
-            "rating_3": total_rating_dist.get("3", 0),
-            "rating_2": total_rating_dist.get("2", 0),
-            "rating_1": total_rating_dist.get("1", 0),
-        }
-    )
-
-    for item in raw.get("data", []):
-        if "product_info" in item:
-            p_info = item.get("product_info", {})
-        else:
-            p_info = item
-
-        product_rows.append(
-            {
-                "product_id": p_info.get("product_id"),
-                "product_name": p_info.get("product_name_clean")
-                or p_info.get("product_name"),
-                "brand": p_info.get("brand"),
-                "category": p_info.get("category_normal") or p_info.get("category"),
-                "total_reviews": p_info.get("total_reviews", 0),
-                # 상품별 평점 분포
-                "rating_5": p_info.get("rating_distribution", {}).get("5", 0),
-                "rating_4": p_info.get("rating_distribution", {}).get("4", 0),
-                "rating_3": p_info.get("rating_distribution", {}).get("3", 0),
-                "rating_2": p_info.get("rating_distribution", {}).get("2", 0),
-                "rating_1": p_info.get("rating_distribution", {}).get("1", 0),
-            }
-        )
-
-df_product = pd.DataFrame(product_rows).drop_duplicates(subset="product_id")
-df_total_rating = pd.DataFrame(total_rating_rows)
+df_product = (
+    eda_data["products"]
+    .assign(
+        product_name=lambda d: d["product_name_clean"].fillna(d["product_name"]),
+        category=lambda d: d["category_normal"],
+    )[
+        [
+            "product_id",
+            "product_name",
+            "brand",
+            "category",
+            "total_reviews",
+            "rating_5",
+            "rating_4",
+            "rating_3",
+            "rating_2",
+            "rating_1",
+        ]
+    ]
+    .drop_duplicates(subset="product_id")
+)
+df_total_rating = eda_data["category_totals"][
+    [
+        "search_name",
+        "total_product",
+        "total_collected_reviews",
+        "rating_5",
+        "rating_4",
+        "rating_3",
+        "rating_2",
+        "rating_1",
+    ]
+].reset_index(drop=True)
 
 print("\n===== json 데이터 컬럼 =====")
 print(df_product.columns)
@@ -105,16 +81,8 @@ print("\n===== 전체 평점 분포 데이터프레임 =====")
 print(df_total_rating)
 
 
-# parquet 텍스트 리뷰
-df_review = pd.read_parquet(PARQUET_PATH)
-
-df_review["has_image"] = df_review["has_image"].fillna(0).astype(int)
-df_review["helpful_count"] = df_review["helpful_count"].fillna(0).astype(int)
-df_review["review_date"] = pd.to_datetime(df_review["date"], errors="coerce")
-df_review["label"] = df_review["label"].astype("Int64")
-df_review["tokens"] = df_review["tokens"].apply(
-    lambda x: ast.literal_eval(x) if isinstance(x, str) else x
-)
+# parquet 텍스트 리뷰 (벡터 컬럼 제외, 날짜/토큰 변환 완료)
+df_review = eda_data["text_reviews"].rename(columns={"date": "review_date"})
 df_review["source"] = "parquet"
 
 print("\n===== 텍스트 리뷰 데이터프레임 =====")
@@ -122,51 +90,8 @@ print(df_review)
 print((df_review).info())
 
 
-# JSON 텍스트 없는 리뷰 추출
-json_review_rows = []
-
-for path in json_files:
-    with open(path, "r", encoding="utf-8") as f:
-        raw = json.load(f)
-
-    for item in raw.get("data", []):
-        if "product_info" not in item:
-            continue
-
-        product_id = item["product_info"].get("product_id")
-
-        for r in item.get("reviews", {}).get("data", []):
-            json_review_rows.append(
-                {
-                    "product_id": product_id,
-                    "review_id": r.get("id"),
-                    "score": r.get("score"),
-                    "review_date": pd.to_datetime(r.get("date"), errors="coerce"),
-                    "label": pd.NA,
-                    "has_image": 0,
-                    "helpful_count": 0,
-                    "source": "json",
-                }
-            )
-
-df_review_json = pd.DataFrame(json_review_rows)
-
-
-# 리뷰 단위 통합 데이터프레임
-df_review_parquet = df_review[
-    [
-        "product_id",
-        "review_id",
-        "score",
-        "review_date",
-        "label",
-        "has_image",
-        "helpful_count",
-        "source",
-    ]
-]
-
-df_review_all = pd.concat([df_review_parquet, df_review_json], ignore_index=True)
+# 리뷰 단위 통합 데이터프레임 (텍스트 리뷰 + JSON 텍스트 없는 리뷰)
+df_review_all = eda_data["reviews"]
 
 print("\n===== 통합 리뷰 데이터 =====")
 print(df_review_all.info())
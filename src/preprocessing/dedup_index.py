@@ -0,0 +1,250 @@
+"""
+전역 리뷰 중복 제거 인덱스 (상품/카테고리 간 중복 리뷰 탐지)
+
+- 리뷰 지문: 정규화된 (날짜, 닉네임, 전체 텍스트)의 64비트 해시 → 텍스트 원문은 저장하지 않음
+- SQLite 파일에 지문 → 소유 상품(owner)/카테고리 파일(source)을 영구 저장 (Phase 1 워커 간 공유)
+- 같은 지문은 먼저 등록한 상품이 소유 (first-claim-wins)
+  → 나중에 처리되는 파일은 이미 등록된 지문의 리뷰를 항상 제외하므로 출력에는 한 상품만 남음
+  → 이미 출력이 있는 파일을 다시 처리하지 않아도 결과가 바뀌지 않음 (소유권이 나중 처리로 넘어가지 않음)
+  → 출력에는 항상 한 사본만 남지만, 어느 사본이 남는지는 결정적이지 않음:
+    처음부터 실행하면 카테고리 간 중복 리뷰는 Phase 1 워커(imap_unordered) 중
+    먼저 등록한 파일이 가지므로 같은 입력이라도 실행마다 달라질 수 있음
+    (한 번 정해진 소유권은 이후 증분 실행에서 유지)
+- 등록은 최종 출력에 남는 상품만: 중복 제거 후 리뷰 수가 min_reviews 미만이 된 상품은
+  지문을 등록하지 않음 (출력되지 않는 상품이 리뷰를 가져가 모든 출력에서 사라지지 않도록)
+- 카테고리 파일을 다시 처리하면 그 파일이 소유했던 지문을 지우고 같은 트랜잭션에서 다시 등록
+  → 다른 파일이 가져갈 틈이 없으므로 소유권 유지
+- 파일 처리가 등록 이후 실패하면 그 파일의 지문을 해제 (release_fingerprints)
+- 한 파일 안에서 같은 지문이 여러 상품에 있으면 파일 내 상품 순서상 앞의 상품이 소유
+
+저장 구조:
+    data/dedup_index.sqlite3
+        fingerprints(fp INTEGER PRIMARY KEY, owner TEXT, source TEXT)
+"""
+
+import os
+import sqlite3
+import hashlib
+
+DEDUP_INDEX_PATH = "./data/dedup_index.sqlite3"
+
+# 여러 워커가 동시에 쓰므로 잠금 대기 시간을 넉넉히 설정 (초)
+DEDUP_INDEX_TIMEOUT = 60.0
+
+_FIELD_SEPARATOR = "\x1f"
+
+
+def review_fingerprint(review):
+    """
+    리뷰 지문 (정규화된 날짜 + 닉네임 + 전체 텍스트의 64비트 해시, SQLite INTEGER 범위)
+
+    - preprocess_format 이후의 값(ISO 날짜, 정규화 텍스트) 기준
+    """
+    key = _FIELD_SEPARATOR.join(
+        str(review.get(field) or "") for field in ("date", "nickname", "full_text")
+    )
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def open_dedup_index(path=DEDUP_INDEX_PATH):
+    """중복 제거 인덱스 연결 (없으면 생성, WAL 모드)"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=DEDUP_INDEX_TIMEOUT, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS fingerprints ("
+        "fp INTEGER PRIMARY KEY, owner TEXT NOT NULL, source TEXT NOT NULL)"
+    )
+    return conn
+
+
+def _lookup_owners(conn, fps):
+    """지문별 현재 소유자 조회 {지문: (owner, source)} (임시 테이블 조인)"""
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS claimed (fp INTEGER PRIMARY KEY)")
+    conn.execute("DELETE FROM claimed")
+    conn.executemany("INSERT OR IGNORE INTO claimed (fp) VALUES (?)", ((fp,) for fp in fps))
+    rows = conn.execute(
+        "SELECT f.fp, f.owner, f.source FROM fingerprints f JOIN claimed c ON f.fp = c.fp"
+    ).fetchall()
+    return {fp: (owner, src) for fp, owner, src in rows}
+
+
+def _claim_in_transaction(conn, source, claims):
+    """claim_fingerprints 본문 (호출자가 BEGIN IMMEDIATE ~ COMMIT으로 감쌈)"""
+    conn.execute("DELETE FROM fingerprints WHERE source = ?", (source,))
+    conn.executemany(
+        "INSERT INTO fingerprints (fp, owner, source) VALUES (?, ?, ?) "
+        "ON CONFLICT(fp) DO NOTHING",
+        ((fp, owner, source) for fp, owner in claims),
+    )
+    return _lookup_owners(conn, [fp for fp, _ in claims])
+
+
+def claim_fingerprints(conn, source, claims):
+    """
+    카테고리 파일 하나의 지문을 등록하고 지문별 소유자 조회
+
+    - 이미 다른 상품이 등록한 지문은 그대로 둠 (first-claim-wins)
+
+    Args:
+        conn: open_dedup_index() 연결
+        source: 카테고리 파일 이름 (이 파일이 이전에 등록한 지문은 먼저 제거)
+        claims: [(지문, owner 상품 ID), ...] - 같은 지문은 앞의 항목이 우선
+
+    Returns:
+        dict: {지문: (owner, source)}
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        winners = _claim_in_transaction(conn, source, claims)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return winners
+
+
+def release_fingerprints(source, index_path=DEDUP_INDEX_PATH):
+    """
+    카테고리 파일이 등록한 지문 해제 (등록 이후 파일 처리가 실패했을 때)
+
+    Returns:
+        int: 해제한 지문 수 (인덱스가 없으면 0)
+    """
+    if not os.path.exists(index_path):
+        return 0
+    conn = open_dedup_index(index_path)
+    try:
+        return conn.execute(
+            "DELETE FROM fingerprints WHERE source = ?", (source,)
+        ).rowcount
+    finally:
+        conn.close()
+
+
+def init_dedup_stats():
+    """중복 제거 통계 (워커별 부분 통계를 merge_dedup_stats로 합산)"""
+    return {
+        "reviews_checked": 0,
+        "duplicates": 0,
+        "cross_product": 0,
+        "cross_category": 0,
+        "products_emptied": 0,
+        "products_below_min": 0,
+    }
+
+
+def merge_dedup_stats(stats, other):
+    """워커 부분 통계를 누적 통계에 합산"""
+    for key, value in (other or {}).items():
+        stats[key] = stats.get(key, 0) + value
+    return stats
+
+
+def drop_duplicate_reviews(products, source, index_path=DEDUP_INDEX_PATH, min_reviews=0):
+    """
+    전역 인덱스 기준으로 다른 상품이 소유한 중복 리뷰 제거 (토큰화/임베딩 전에 호출)
+
+    - 최종 출력에 남는 상품의 지문만 등록 (한 트랜잭션)
+        1) 이 파일의 이전 등록을 지우고 다른 카테고리 파일이 소유한 지문 조회
+        2) 파일 내 상품 순서대로, 다른 파일/앞 상품이 가져가지 않은 리뷰 수가
+           min_reviews 이상인 상품만 남기고 그 지문을 등록
+      → 리뷰 수 미달로 빠지는 상품은 지문을 갖지 않으므로 뒤 상품이나 이후 파일이 가져갈 수 있음
+
+    Args:
+        products: [(owner 상품 ID, 리뷰 리스트), ...] - 리뷰 리스트는 직접 수정
+                  (리뷰 수 미달로 빠지는 상품은 빈 리스트)
+        source: 카테고리 파일 이름
+        index_path: SQLite 인덱스 경로
+        min_reviews: 상품 최소 리뷰 수
+
+    Returns:
+        dict: 중복 제거 통계 (init_dedup_stats 형식)
+    """
+    stats = init_dedup_stats()
+    fingerprints = [[review_fingerprint(r) for r in reviews] for _, reviews in products]
+
+    conn = open_dedup_index(index_path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM fingerprints WHERE source = ?", (source,))
+            winners = _lookup_owners(conn, [fp for fps in fingerprints for fp in fps])
+
+            survivors = set()
+            for i, ((owner, reviews), fps) in enumerate(zip(products, fingerprints)):
+                available = [
+                    fp for fp in fps if winners.get(fp, (owner, source))[0] == owner
+                ]
+                if not reviews or len(available) < min_reviews:
+                    continue
+                survivors.add(i)
+                for fp in available:
+                    winners[fp] = (owner, source)
+
+            conn.executemany(
+                "INSERT INTO fingerprints (fp, owner, source) VALUES (?, ?, ?) "
+                "ON CONFLICT(fp) DO NOTHING",
+                (
+                    (fp, owner, src)
+                    for fp, (owner, src) in winners.items()
+                    if src == source
+                ),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.close()
+
+    for i, ((owner, reviews), fps) in enumerate(zip(products, fingerprints)):
+        kept = []
+        for review, fp in zip(reviews, fps):
+            winner_owner, winner_source = winners.get(fp, (owner, source))
+            if winner_owner == owner:
+                kept.append(review)
+                continue
+            stats["duplicates"] += 1
+            if winner_source == source:
+                stats["cross_product"] += 1
+            else:
+                stats["cross_category"] += 1
+        stats["reviews_checked"] += len(reviews)
+        if reviews and not kept:
+            stats["products_emptied"] += 1
+        elif reviews and i not in survivors:
+            stats["products_below_min"] += 1
+        reviews[:] = kept if i in survivors else []
+
+    return stats
+
+
+def prune_dedup_index(active_sources, index_path=DEDUP_INDEX_PATH):
+    """
+    현재 입력에 없는 카테고리 파일이 소유한 지문 제거
+
+    Returns:
+        int: 제거한 지문 수 (인덱스가 없으면 0)
+    """
+    if not os.path.exists(index_path):
+        return 0
+    conn = open_dedup_index(index_path)
+    try:
+        sources = [
+            row[0] for row in conn.execute("SELECT DISTINCT source FROM fingerprints")
+        ]
+        active_sources = set(active_sources)
+        stale = [s for s in sources if s not in active_sources]
+        removed = 0
+        for source in stale:
+            removed += conn.execute(
+                "DELETE FROM fingerprints WHERE source = ?", (source,)
+            ).rowcount
+    finally:
+        conn.close()
+    return removed
@@ -6,17 +6,46 @@ import json
 import os
 import glob
 import time
+import unicodedata
 from datetime import datetime
-import pandas as pd
+import pyarrow.parquet as pq
 from multiprocessing import Pool, cpu_count
 from tqdm import tqdm
 from preprocessing_phases import (
     preprocess_and_tokenize_file,
     train_global_word2vec,
+    fit_global_idf,
     vectorize_file,
     MAX_WORKERS,
 )
-from sentiment_analysis import analyze_skin_type_frequency
+from preprocessing_utils import get_keyed_vectors_path
+from dedup_index import (
+    DEDUP_INDEX_PATH,
+    init_dedup_stats,
+    merge_dedup_stats,
+    prune_dedup_index,
+)
+from tfidf_store import TFIDF_STORE_DIR
+from product_recommender import build_neighbors_table, PRODUCT_NEIGHBORS_PATH
+from review_ann_index import build_review_ann_index, REVIEW_ANN_DIR
+from product_facts import update_product_facts, PRODUCT_FACTS_DIR
+from review_timeseries import update_review_timeseries, REVIEW_TIMESERIES_DIR
+from review_forecast import run_batch_forecast, FORECAST_MODELS, FORECAST_PATH
+from review_surge import run_surge_detection, SURGE_ALERTS_PATH
+from parquet_store import (
+    build_products_table,
+    write_review_partition,
+    update_review_index,
+)
+from sentiment_analysis import (
+    init_sentiment_stats,
+    merge_sentiment_stats,
+    sentiment_stats_summary,
+    init_skin_type_counts,
+    merge_skin_type_counts,
+    skin_type_counts_to_top,
+    skin_type_counts_error_bound,
+)
 
 # 임시 토큰 저장 디렉토리
 TEMP_TOKENS_DIR = "./data/temp_tokens"
@@ -30,6 +59,20 @@ BERT_MODEL_NAME = "klue/bert-base"  # BERT 모델 이름
 
 # ========== 리뷰 필터링 설정 ==========
 MIN_REVIEWS_PER_PRODUCT = 30  # 이 개수 이하의 리뷰를 가진 상품 제외
+# 상품/카테고리 간 중복 리뷰 제거 (False면 상품 내 중복만 제거)
+USE_GLOBAL_DEDUP = True
+
+# ========== 리뷰 Parquet 저장 설정 ==========
+# 상품 단위 조회가 필요한 행만 읽도록 row group을 작게 유지 (카테고리 파티션마다 별도 파일)
+REVIEW_ROW_GROUP_SIZE = 10_000
+# 전역 피부타입 단어 빈도: 기본은 워커의 정확한 Counter를 그대로 병합 후 마지막에 상위 N개 추출
+# 메모리가 부족할 때만 Space-Saving 스케치 크기(유지 단어 수 상한)를 지정 → 빈도가 근사값이 되며
+# 과대 추정 상한을 메타데이터(skin_type_word_frequency_error_bound)에 함께 기록
+SKIN_TYPE_SKETCH_CAPACITY = None
+
+# ========== 리뷰 수 예측 설정 ==========
+# 파이프라인 마지막에 상품별 일 리뷰 수 예측 + 백테스트 실행 (시계열 큐브 기준)
+RUN_REVIEW_FORECAST = True
 
 
 def main():
@@ -46,7 +89,8 @@ def main():
     PRE_DATA_DIR = "./data/pre_data"
     PROCESSED_DATA_DIR = "./data/processed_data"
     PRODUCT_PARQUET = "./data/processed_data/integrated_products_vector.parquet"
-    REVIEW_PARQUET = "./data/processed_data/integrated_reviews_detail.parquet"
+    # 리뷰 상세는 category_file 기준 Hive 파티션 데이터셋 (디렉토리)
+    REVIEW_DATASET_DIR = "./data/processed_data/integrated_reviews_detail"
 
     print("\n" + "=" * 60)
     print(f"{'최적화된 전처리 파이프라인 시작':^60}")
@@ -74,6 +118,19 @@ def main():
     # 임시 디렉토리 생성
     os.makedirs(TEMP_TOKENS_DIR, exist_ok=True)
 
+    # 전역 중복 제거 인덱스: 입력에서 사라진 카테고리 파일의 지문 정리
+    dedup_index_path = DEDUP_INDEX_PATH if USE_GLOBAL_DEDUP else None
+    if dedup_index_path:
+        active_sources = set()
+        for input_path in json_files:
+            base_name = os.path.splitext(os.path.basename(input_path))[0]
+            if base_name.startswith("result_"):
+                base_name = base_name[7:]
+            active_sources.add(unicodedata.normalize("NFC", base_name))
+        pruned = prune_dedup_index(active_sources, dedup_index_path)
+        if pruned:
+            print(f"중복 제거 인덱스 정리: {pruned:,}개 지문 삭제\n")
+
     # 병렬로 전처리 + 토큰화 실행
     args_list = [
         (
@@ -82,12 +139,14 @@ def main():
             PROCESSED_DATA_DIR,
             TEMP_TOKENS_DIR,
             MIN_REVIEWS_PER_PRODUCT,
+            dedup_index_path,
         )
         for input_path in json_files
     ]
 
     skipped_count = 0
     phase1_results = []
+    dedup_stats = init_dedup_stats()
 
     with Pool(MAX_WORKERS) as pool:
         for result in tqdm(
@@ -101,6 +160,7 @@ def main():
                 tqdm.write(f"  [건너뜀] {result['file']}")
             elif result["status"] == "success":
                 phase1_results.append(result)
+                merge_dedup_stats(dedup_stats, result.get("dedup"))
                 tqdm.write(
                     f"  [완료] {result['file']} - 토큰: {result['token_count']:,}개"
                 )
@@ -112,22 +172,40 @@ def main():
     phase1_time = time.time() - phase1_start
     print(f"\nPhase 1 완료 - 소요 시간: {phase1_time:.2f}초")
     print(f"  처리 완료: {len(phase1_results)}개")
-    print(f"  건너뜀: {skipped_count}개\n")
+    print(f"  건너뜀: {skipped_count}개")
+    if dedup_index_path:
+        print(
+            f"  중복 리뷰 제외: {dedup_stats['duplicates']:,}개 / "
+            f"{dedup_stats['reviews_checked']:,}개 "
+            f"(상품 간 {dedup_stats['cross_product']:,}, "
+            f"카테고리 간 {dedup_stats['cross_category']:,}, "
+            f"중복 상품 {dedup_stats['products_emptied']:,}개, "
+            f"최소 리뷰 수 미달 상품 {dedup_stats['products_below_min']:,}개)"
+        )
+    print()
 
     # ========== Phase 2: 벡터화 모델 준비 ==========
     phase2_start = time.time()
     w2v_model = None
+    w2v_version = None
+    w2v_kv_path = None
     bert_vectorizer = None
+    vector_dims = {}  # Parquet 벡터 컬럼 차원 (fixed_size_list<float32>[dim])
 
     if VECTORIZER_TYPE in ["word2vec", "both"]:
         print("\n" + "=" * 60)
         print("Phase 2-1: Word2Vec 모델 학습")
         print("=" * 60)
-        w2v_model = train_global_word2vec(TEMP_TOKENS_DIR)
+        w2v_model, w2v_version = train_global_word2vec(TEMP_TOKENS_DIR)
         if not w2v_model:
             print("[오류] Word2Vec 모델 학습 실패")
             if VECTORIZER_TYPE == "word2vec":
                 return
+        else:
+            # Phase 3 워커에는 모델 객체 대신 저장된 벡터 경로 전달 (mmap 공유)
+            w2v_kv_path = get_keyed_vectors_path(w2v_version)
+            vector_dims["word2vec"] = w2v_model.wv.vector_size
+            del w2v_model
 
     if VECTORIZER_TYPE in ["bert", "both"]:
         print("\n" + "=" * 60)
@@ -136,6 +214,22 @@ def main():
         from bert_vectorizer import get_bert_vectorizer
 
         bert_vectorizer = get_bert_vectorizer(BERT_MODEL_NAME)
+        vector_dims["bert"] = bert_vectorizer.get_vector_size()
+
+    # corpus IDF 학습 (리뷰 TF-IDF → 감성 키워드 점수/상품 TF-IDF 유사도에서 공유)
+    print("\n" + "=" * 60)
+    print("Phase 2-3: TF-IDF IDF 학습")
+    print("=" * 60)
+    idf_version = fit_global_idf(TEMP_TOKENS_DIR, TFIDF_STORE_DIR)
+
+    # 상품 벡터 차원 (상품 벡터 = 리뷰 벡터 평균)
+    if VECTORIZER_TYPE == "both":
+        vector_dims["product_vector_word2vec"] = vector_dims.get("word2vec")
+        vector_dims["product_vector_bert"] = vector_dims.get("bert")
+    else:
+        vector_dims["product_vector"] = vector_dims.get(
+            "word2vec" if VECTORIZER_TYPE == "word2vec" else "bert"
+        )
 
     phase2_time = time.time() - phase2_start
     print(f"\nPhase 2 완료 - 소요 시간: {phase2_time:.2f}초\n")
@@ -153,15 +247,32 @@ def main():
             result["base_name"],
             TEMP_TOKENS_DIR,
             result["output_dir"],
-            w2v_model,
+            w2v_kv_path,
+            TFIDF_STORE_DIR if idf_version else None,
             bert_vectorizer,
             VECTORIZER_TYPE,
+            vector_dims,
         )
         for result in phase1_results
     ]
 
     all_products = []
-    all_reviews = []
+
+    # 리뷰 상세는 메모리에 모으지 않고 워커가 끝나는 대로 카테고리 파티션에 저장
+    review_count = 0
+    review_index_entries = {}  # 카테고리 → product_id 인덱스 항목
+
+    # 전역 감성/피부타입 분석은 map-reduce
+    # (워커가 파일 단위 부분 통계/카운터 계산 → 메인 프로세스는 병합만 수행)
+    overall_stats = init_sentiment_stats()
+    skin_type_counts = init_skin_type_counts(SKIN_TYPE_SKETCH_CAPACITY)
+    global_merge_time = 0.0
+    os.makedirs(REVIEW_DATASET_DIR, exist_ok=True)
+    # 파티션별 벡터 생성 모델 (ANN 인덱스는 이 정보가 일치하는 파티션만 사용)
+    review_vector_models = {
+        "word2vec": {"model_version": w2v_version},
+        "bert": {"model_name": BERT_MODEL_NAME},
+    }
 
     with Pool(MAX_WORKERS) as pool:
         for result in tqdm(
@@ -172,7 +283,26 @@ def main():
         ):
             if result["status"] == "success":
                 all_products.extend(result["product_summaries"])
-                all_reviews.extend(result["review_details"])
+
+                review_table = result["review_table"]
+                if review_table.num_rows > 0:
+                    # category_file=<카테고리> 파티션 교체 (product_id 정렬, 통계/페이지 인덱스)
+                    _, index_entries = write_review_partition(
+                        review_table,
+                        REVIEW_DATASET_DIR,
+                        result["file"],
+                        REVIEW_ROW_GROUP_SIZE,
+                        review_vector_models,
+                    )
+                    review_index_entries[result["file"]] = index_entries
+                    review_count += review_table.num_rows
+
+                # 전역 분석 reduce: 워커가 파일 단위로 집계한 부분 통계/카운터 병합
+                merge_start = time.time()
+                merge_sentiment_stats(overall_stats, result["sentiment_stats"])
+                merge_skin_type_counts(skin_type_counts, result["skin_type_counts"])
+                global_merge_time += time.time() - merge_start
+
                 tqdm.write(f"  [완료] {result['file']}")
             else:
                 tqdm.write(
@@ -204,6 +334,9 @@ def main():
                 except:
                     pass
 
+    # 리뷰 상품 인덱스 갱신 (다시 쓴 파티션 항목만 교체)
+    indexed_products = update_review_index(REVIEW_DATASET_DIR, review_index_entries)
+
     phase3_time = time.time() - phase3_start
     print(f"\nPhase 3 완료 - 소요 시간: {phase3_time:.2f}초\n")
 
@@ -213,60 +346,58 @@ def main():
     print("=" * 60)
 
     # 전역 감성 분석 (피부타입별 단어 빈도, 전체 감성 키워드)
-    # Phase 3에서 수집된 all_reviews를 직접 활용 (파일 재로딩 불필요)
-    print(f"전역 분석 대상 리뷰 수: {len(all_reviews):,}개")
+    # Phase 3에서 병합한 상품 → 카테고리 → 전역 통계만 사용 (리뷰 목록/파일 재로딩 불필요)
+    global_start = time.time()
+    print(f"전역 분석 대상 리뷰 수: {overall_stats['review_count']:,}개")
 
     # 피부타입별 단어 빈도
-    skin_type_freq = analyze_skin_type_frequency(all_reviews, top_n=20)
+    skin_type_freq = skin_type_counts_to_top(skin_type_counts, top_n=20)
     skin_type_freq_formatted = {
         skin: [{"word": w, "count": c} for w, c in words]
         for skin, words in skin_type_freq.items()
     }
+    skin_type_error_bound = None
+    if SKIN_TYPE_SKETCH_CAPACITY is not None:
+        skin_type_error_bound = skin_type_counts_error_bound(skin_type_counts)
+        print(
+            f"[경고] 피부타입 단어 빈도는 Space-Saving 스케치 근사값 "
+            f"(capacity={SKIN_TYPE_SKETCH_CAPACITY}, 과대 추정 상한 {skin_type_error_bound})"
+        )
 
     # 전체 감성 키워드
-    from sentiment_analysis import sentiment_tfidf_diff
-
-    pos_overall, neg_overall = sentiment_tfidf_diff(
-        all_reviews, top_n=30, min_doc_freq=20
-    )
-    pos_count = sum(1 for r in all_reviews if r.get("label") == 1)
-    neg_count = sum(1 for r in all_reviews if r.get("label") == 0)
-    tokens_count = sum(
-        1 for r in all_reviews if r.get("tokens") and isinstance(r.get("tokens"), list)
-    )
-
-    overall_sentiment = {
-        "positive_special": pos_overall,
-        "negative_special": neg_overall,
-        "review_count": len(all_reviews),
-        "pos_count": pos_count,
-        "neg_count": neg_count,
-        "tfidf_notna_count": tokens_count,
-    }
+    overall_sentiment = sentiment_stats_summary(overall_stats, top_n=30, min_doc_freq=20)
+    global_time = global_merge_time + (time.time() - global_start)
 
     print(f"✓ 피부타입별 단어 빈도: {len(skin_type_freq_formatted)}개 타입")
-    print(f"✓ 전체 긍정 키워드: {len(pos_overall)}개")
-    print(f"✓ 전체 부정 키워드: {len(neg_overall)}개")
-    print(f"  - 긍정 리뷰: {pos_count:,}개")
-    print(f"  - 부정 리뷰: {neg_count:,}개")
+    print(f"✓ 전체 긍정 키워드: {len(overall_sentiment['positive_special'])}개")
+    print(f"✓ 전체 부정 키워드: {len(overall_sentiment['negative_special'])}개")
+    print(f"  - 긍정 리뷰: {overall_sentiment['pos_count']:,}개")
+    print(f"  - 부정 리뷰: {overall_sentiment['neg_count']:,}개")
+    print(
+        f"✓ 전역 분석 소요 시간: {global_time:.2f}초 "
+        f"(부분 통계 병합 {global_merge_time:.2f}초, 워커 {MAX_WORKERS}개 map)\n"
+    )
 
     # 1. 상품 Parquet (벡터 + 전역 분석 결과)
     if all_products:
-        df_products = pd.DataFrame(all_products)
-
         # 메타데이터에 전역 분석 추가
         metadata = {
+            "word2vec_model_version": w2v_version,
+            "idf_version": idf_version,
+            "dedup_stats": dedup_stats,
             "skin_type_word_frequency": skin_type_freq_formatted,
+            "skin_type_word_frequency_error_bound": skin_type_error_bound,
             "overall_sentiment_special_words": overall_sentiment,
         }
 
-        # Parquet 저장 시 메타데이터 포함
-        df_products.to_parquet(
-            PRODUCT_PARQUET,
-            engine="pyarrow",
-            compression="snappy",
-            index=False,
-        )
+        # Parquet 저장 시 메타데이터 포함 (Word2Vec 모델 버전 ID 기록)
+        # 벡터 컬럼은 fixed_size_list<float32>[dim]으로 저장
+        product_table = build_products_table(all_products, vector_dims)
+        schema_metadata = dict(product_table.schema.metadata or {})
+        if w2v_version:
+            schema_metadata[b"word2vec_model_version"] = w2v_version.encode("utf-8")
+        product_table = product_table.replace_schema_metadata(schema_metadata)
+        pq.write_table(product_table, PRODUCT_PARQUET, compression="snappy")
 
         # 메타데이터를 별도 JSON으로 저장
         meta_path = PRODUCT_PARQUET.replace(".parquet", "_metadata.json")
@@ -275,21 +406,94 @@ def main():
 
         product_size_mb = os.path.getsize(PRODUCT_PARQUET) / 1024 / 1024
         print(f"✓ 상품 Parquet 저장: {PRODUCT_PARQUET}")
-        print(f"  - 상품 수: {len(df_products):,}개")
+        print(f"  - 상품 수: {product_table.num_rows:,}개")
         print(f"  - 파일 크기: {product_size_mb:.2f} MB")
+        print(f"  - Word2Vec 모델 버전: {w2v_version}")
         print(f"  - 메타데이터 저장: {meta_path}\n")
 
-    # 2. 리뷰 상세 Parquet (토큰, 벡터 포함)
-    if all_reviews:
-        df_reviews = pd.DataFrame(all_reviews)
-        df_reviews.to_parquet(
-            REVIEW_PARQUET, engine="pyarrow", compression="snappy", index=False
+        # 상품 벡터 기반 유사 상품 이웃 테이블 (콘텐츠 기반 추천)
+        neighbors_table = build_neighbors_table(PRODUCT_PARQUET, PRODUCT_NEIGHBORS_PATH)
+        if neighbors_table is not None:
+            print(f"✓ 유사 상품 이웃 테이블 저장: {PRODUCT_NEIGHBORS_PATH}")
+            print(f"  - 이웃 수: {neighbors_table.num_rows:,}개\n")
+
+    # 2. 리뷰 상세 Parquet (토큰, 벡터 포함) - Phase 3에서 카테고리 파티션별 저장 완료
+    if review_count > 0:
+        partition_files = glob.glob(os.path.join(REVIEW_DATASET_DIR, "*", "*.parquet"))
+        review_size_mb = sum(os.path.getsize(p) for p in partition_files) / 1024 / 1024
+        print(f"✓ 리뷰 Parquet 데이터셋 저장: {REVIEW_DATASET_DIR}")
+        print(f"  - 리뷰 수 (이번 실행): {review_count:,}개")
+        print(f"  - 파티션 파일: {len(partition_files)}개")
+        print(f"  - 전체 크기: {review_size_mb:.2f} MB")
+        print(f"  - 상품 인덱스: {indexed_products:,}개 상품")
+
+    # 3. 리뷰 ANN 인덱스 (리뷰 단위 시맨틱 검색, 리뷰 데이터셋 옆에 저장)
+    if os.path.exists(REVIEW_DATASET_DIR):
+        for vector_column, model_info in review_vector_models.items():
+            if vector_column not in vector_dims or not vector_dims[vector_column]:
+                continue
+            ann_meta = build_review_ann_index(
+                vector_column, REVIEW_DATASET_DIR, REVIEW_ANN_DIR, model_info=model_info
+            )
+            if ann_meta:
+                print(f"✓ 리뷰 ANN 인덱스 저장: {REVIEW_ANN_DIR}/{vector_column}")
+                print(
+                    f"  - 방식: {ann_meta['backend']} | 리뷰 수: {ann_meta['n']:,}개 | "
+                    f"생성 시간: {ann_meta['build_seconds']:.1f}초"
+                )
+                if ann_meta["skipped_partitions"]:
+                    print(f"  - 모델 불일치로 제외한 파티션: {len(ann_meta['skipped_partitions'])}개")
+
+    # 4. 상품 집계 테이블 (대시보드/EDA용, 다시 쓴 카테고리 파티션만 갱신)
+    if os.path.exists(REVIEW_DATASET_DIR):
+        facts_summary = update_product_facts(
+            review_index_entries.keys(), REVIEW_DATASET_DIR, PRODUCT_FACTS_DIR, PRODUCT_PARQUET
+        )
+        print(f"✓ 상품 집계 테이블 갱신: {PRODUCT_FACTS_DIR}")
+        print(
+            f"  - 갱신 카테고리: {len(facts_summary['updated'])}개 "
+            f"(상품 {facts_summary['products']:,}개) | "
+            f"제거 카테고리: {len(facts_summary['removed'])}개"
         )
 
-        review_size_mb = os.path.getsize(REVIEW_PARQUET) / 1024 / 1024
-        print(f"✓ 리뷰 Parquet 저장: {REVIEW_PARQUET}")
-        print(f"  - 리뷰 수: {len(df_reviews):,}개")
-        print(f"  - 파일 크기: {review_size_mb:.2f} MB")
+    # 5. 리뷰 일별 시계열 큐브 (상품 × 일 평점별 리뷰 수, 다시 쓴 카테고리 행만 갱신)
+    if os.path.exists(REVIEW_DATASET_DIR):
+        ts_summary = update_review_timeseries(
+            review_index_entries.keys(), REVIEW_DATASET_DIR, REVIEW_TIMESERIES_DIR
+        )
+        if ts_summary:
+            print(f"✓ 리뷰 시계열 큐브 갱신: {REVIEW_TIMESERIES_DIR}")
+            print(
+                f"  - 상품 {ts_summary['products']:,}개 × {ts_summary['n_days']:,}일 "
+                f"({ts_summary['start_date']}~) | 갱신 카테고리: {len(ts_summary['updated'])}개"
+            )
+
+    # 6. 상품별 일 리뷰 수 예측 (시계열 큐브 → 예측 테이블, 백테스트 오차 포함)
+    if RUN_REVIEW_FORECAST and os.path.exists(REVIEW_TIMESERIES_DIR):
+        forecast_meta = run_batch_forecast(
+            FORECAST_MODELS, ts_dir=REVIEW_TIMESERIES_DIR, output_path=FORECAST_PATH
+        )
+        if forecast_meta:
+            print(f"✓ 리뷰 수 예측 저장: {FORECAST_PATH}")
+            print(
+                f"  - 상품 {forecast_meta['n_products']:,}개 × {forecast_meta['horizon']}일 | "
+                f"모델: {', '.join(forecast_meta['models'])} | "
+                f"소요 시간: {forecast_meta['wall_seconds']:.1f}초"
+            )
+            for model, metrics in (forecast_meta["backtest"] or {}).items():
+                print(f"  - 백테스트 {model}: MAE {metrics['mae']:.3f} | WAPE {metrics['wape']:.3f}")
+
+    # 7. 부정 리뷰 급증 탐지 (새 리뷰만 링 버퍼에 반영 → 최근 1개월 급증 경고)
+    if os.path.exists(REVIEW_DATASET_DIR):
+        surge = run_surge_detection(review_index_entries.keys(), REVIEW_DATASET_DIR)
+        print(f"✓ 부정 리뷰 급증 탐지: {SURGE_ALERTS_PATH}")
+        print(f"  - 새로 반영한 리뷰: {surge['ingested']:,}개 | 경고: {len(surge['alerts'])}건")
+        for alert in surge["alerts"][:5]:
+            keywords = ", ".join(k["word"] for k in alert["keywords"][:5])
+            print(
+                f"  [경고] {alert['key']} ({alert['level']}): 최근 부정 {alert['recent_negative']}건 "
+                f"(기대 {alert['expected_negative']:.1f}건, z={alert['z']:.1f}) - {keywords}"
+            )
 
     # ========== 임시 파일 정리 ==========
     print(f"\n임시 토큰 파일 정리 중...")
@@ -316,6 +520,10 @@ def main():
     print(
         f"{'Phase 1: ' + f'{phase1_time:.1f}초 | Phase 2: {phase2_time:.1f}초 | Phase 3: {phase3_time:.1f}초':^60}"
     )
+    print(f"{'전역 분석: ' + f'{global_time:.1f}초':^60}")
+    if dedup_index_path:
+        dedup_line = f"중복 리뷰 제외: {dedup_stats['duplicates']:,}개"
+        print(f"{dedup_line:^60}")
     print("=" * 60 + "\n")
 
 
@@ -0,0 +1,374 @@
+"""
+Parquet 저장 유틸리티 (리뷰/상품 테이블 스키마 및 벡터 컬럼 변환)
+"""
+
+import os
+import json
+import shutil
+import unicodedata
+from urllib.parse import quote, unquote
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# 리뷰 상세 테이블의 스칼라 컬럼 스키마 (벡터 컬럼은 차원에 따라 별도 생성)
+REVIEW_FIELDS = [
+    ("product_id", pa.string()),
+    ("review_id", pa.int64()),
+    ("full_text", pa.string()),
+    ("score", pa.int64()),
+    ("label", pa.int64()),
+    ("tokens", pa.list_(pa.string())),
+    ("char_length", pa.int64()),
+    ("token_count", pa.int64()),
+    ("date", pa.string()),
+    ("nickname", pa.string()),
+    ("has_image", pa.bool_()),
+    ("helpful_count", pa.int64()),
+]
+
+REVIEW_VECTOR_COLUMNS = ["word2vec", "bert"]
+
+# 파티션 파일 스키마 메타데이터: 벡터 컬럼별 생성 모델 정보
+# (예: {"word2vec": {"model_version": ...}, "bert": {"model_name": ...}})
+# 재처리하지 않은 카테고리 파티션에는 이전 모델 벡터가 남아 있으므로 파티션 단위로 기록
+REVIEW_VECTOR_MODELS_KEY = b"vector_models"
+
+# 리뷰 데이터셋 Hive 파티션 컬럼 (category_file=<카테고리>/part-0.parquet)
+REVIEW_PARTITION_COLUMN = "category_file"
+REVIEW_PART_FILE = "part-0.parquet"
+
+# product_id → (파일, row group, row group 내 행 범위) 사이드카 인덱스
+REVIEW_INDEX_FILE = "_product_index.parquet"
+REVIEW_INDEX_SCHEMA = pa.schema(
+    [
+        ("product_id", pa.string()),
+        ("file", pa.string()),
+        ("row_group", pa.int32()),
+        ("row_start", pa.int64()),
+        ("row_count", pa.int64()),
+    ]
+)
+
+PRODUCT_VECTOR_COLUMNS = [
+    "product_vector",
+    "product_vector_word2vec",
+    "product_vector_bert",
+]
+
+
+def vector_type(dim):
+    """벡터 컬럼 타입: fixed_size_list<float32>[dim]"""
+    return pa.list_(pa.float32(), dim)
+
+
+def _is_missing_vector(vec):
+    """None, NaN(누락 컬럼), 빈 리스트는 null 벡터로 취급"""
+    return vec is None or not hasattr(vec, "__len__") or len(vec) == 0
+
+
+def _infer_vector_dim(vectors):
+    """첫 번째 유효 벡터의 차원 (없으면 None)"""
+    for vec in vectors:
+        if not _is_missing_vector(vec):
+            return len(vec)
+    return None
+
+
+def vectors_to_arrow(vectors, dim=None):
+    """
+    벡터 리스트를 fixed_size_list<float32>[dim] Arrow 배열로 변환
+
+    Args:
+        vectors: numpy 배열/리스트의 리스트 (None 또는 빈 리스트는 null)
+        dim: 벡터 차원 (None이면 첫 번째 유효 벡터에서 추론)
+
+    Returns:
+        pa.FixedSizeListArray (유효 벡터가 하나도 없고 dim도 없으면 null 배열)
+    """
+    n = len(vectors)
+    if dim is None:
+        dim = _infer_vector_dim(vectors)
+    if dim is None:
+        return pa.nulls(n)
+
+    # (n, dim) float32 버퍼에 한 번에 채운 뒤 평탄화 → 행마다 리스트를 만들지 않음
+    matrix = np.zeros((n, dim), dtype=np.float32)
+    mask = np.zeros(n, dtype=bool)
+    for i, vec in enumerate(vectors):
+        if _is_missing_vector(vec):
+            mask[i] = True
+        else:
+            matrix[i] = vec
+
+    values = pa.array(matrix.reshape(-1))
+    return pa.FixedSizeListArray.from_arrays(
+        values, type=vector_type(dim), mask=pa.array(mask) if mask.any() else None
+    )
+
+
+def vector_column_to_numpy(column):
+    """
+    fixed_size_list<float32>[dim] 컬럼을 (n, dim) numpy 행렬로 변환
+
+    - 단일 청크 + null 없음이면 Arrow 버퍼를 그대로 보는 zero-copy 뷰 반환
+    - null 벡터가 있으면 해당 행은 NaN으로 채운 복사본 반환
+    """
+    if isinstance(column, pa.ChunkedArray):
+        column = column.chunk(0) if column.num_chunks == 1 else column.combine_chunks()
+
+    dim = column.type.list_size
+    values = column.values.slice(column.offset * dim, len(column) * dim)
+    try:
+        flat = values.to_numpy(zero_copy_only=True)
+    except pa.ArrowInvalid:
+        flat = values.to_numpy(zero_copy_only=False)
+
+    matrix = flat.reshape(-1, dim)
+    if column.null_count:
+        matrix = matrix.astype(np.float32, copy=True)
+        matrix[column.is_null().to_numpy(zero_copy_only=False)] = np.nan
+    return matrix
+
+
+def build_reviews_table(review_details, vector_dims=None):
+    """
+    리뷰 상세 dict 리스트를 Arrow 테이블로 변환 (컬럼 단위 생성)
+
+    Args:
+        review_details: vectorize_file이 생성한 리뷰 dict 리스트
+        vector_dims: {"word2vec": 100, "bert": 768} 형태의 벡터 차원 (없으면 추론)
+
+    Returns:
+        pa.Table: 스칼라 컬럼 + fixed_size_list<float32> 벡터 컬럼
+                  (이번 실행에서 만들지 않은 벡터 컬럼은 null 타입으로 쓰지 않고 제외
+                   → VECTORIZER_TYPE을 바꿔도 파티션 간 컬럼 타입이 충돌하지 않음)
+    """
+    vector_dims = vector_dims or {}
+
+    arrays = []
+    fields = []
+    for name, dtype in REVIEW_FIELDS:
+        arrays.append(pa.array([r.get(name) for r in review_details], type=dtype))
+        fields.append(pa.field(name, dtype))
+
+    for name in REVIEW_VECTOR_COLUMNS:
+        vectors = [r.get(name) for r in review_details]
+        arr = vectors_to_arrow(vectors, vector_dims.get(name))
+        if pa.types.is_null(arr.type):
+            continue
+        arrays.append(arr)
+        fields.append(pa.field(name, arr.type))
+
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+
+def build_products_table(product_summaries, vector_dims=None):
+    """
+    상품 요약 dict 리스트를 Arrow 테이블로 변환
+    - 일반 컬럼은 pandas 추론 그대로 사용 (중첩 dict → struct)
+    - 상품 벡터 컬럼만 fixed_size_list<float32>[dim]으로 변환
+
+    Returns:
+        pa.Table
+    """
+    vector_dims = vector_dims or {}
+    df = pd.DataFrame(product_summaries)
+    columns = list(df.columns)
+    vector_cols = [c for c in columns if c in PRODUCT_VECTOR_COLUMNS]
+
+    table = pa.Table.from_pandas(df.drop(columns=vector_cols), preserve_index=False)
+    for name in vector_cols:
+        arr = vectors_to_arrow(df[name].tolist(), vector_dims.get(name))
+        # 원래 컬럼 순서 유지 (앞쪽 컬럼부터 삽입하므로 원래 인덱스가 그대로 유효)
+        table = table.add_column(columns.index(name), name, arr)
+
+    return table
+
+
+# =========================
+# 리뷰 데이터셋 (카테고리 파티션) 저장
+# =========================
+
+
+def review_partition_dir(dataset_dir, category):
+    """
+    카테고리 파티션 디렉토리 경로 (category_file=<카테고리>)
+
+    - 카테고리명은 NFC 정규화 후 URI 인코딩 (pyarrow hive 파티션 디코딩과 동일 규칙)
+      → macOS(NFD 파일명)에서도 파티션 값이 NFC로 복원됨
+    """
+    category = unicodedata.normalize("NFC", str(category))
+    return os.path.join(
+        dataset_dir, f"{REVIEW_PARTITION_COLUMN}={quote(category, safe='')}"
+    )
+
+
+def list_review_partitions(dataset_dir):
+    """
+    Hive 파티션 디렉토리 이름에서 카테고리 목록 복원
+
+    Returns:
+        dict: {카테고리(NFC): 파티션 디렉토리 경로} - 디렉토리가 없으면 빈 dict
+    """
+    if not os.path.isdir(dataset_dir):
+        return {}
+    prefix = f"{REVIEW_PARTITION_COLUMN}="
+    partitions = {}
+    for name in os.listdir(dataset_dir):
+        path = os.path.join(dataset_dir, name)
+        if name.startswith(prefix) and os.path.isdir(path):
+            category = unicodedata.normalize("NFC", unquote(name[len(prefix) :]))
+            partitions[category] = path
+    return partitions
+
+
+def _product_row_groups(product_ids, row_group_size):
+    """
+    정렬된 product_id 배열을 상품 경계에 맞춘 row group 구간으로 분할
+
+    - 한 상품의 리뷰는 항상 하나의 row group에 포함 (상품이 row_group_size보다 크면 단독 row group)
+
+    Returns:
+        list: [(row group 시작 행, 끝 행, [(product_id, 시작 행, 끝 행), ...]), ...]
+    """
+    n = len(product_ids)
+    if n == 0:
+        return []
+    starts = np.flatnonzero(np.r_[True, product_ids[1:] != product_ids[:-1]])
+    ends = np.r_[starts[1:], n]
+
+    groups = []
+    products = []
+    group_start = 0
+    for start, end in zip(starts, ends):
+        if products and end - group_start > row_group_size:
+            groups.append((group_start, start, products))
+            products = []
+            group_start = start
+        products.append((product_ids[start], int(start), int(end)))
+    groups.append((group_start, n, products))
+    return groups
+
+
+def write_review_partition(
+    review_table, dataset_dir, category, row_group_size, vector_models=None
+):
+    """
+    한 카테고리의 리뷰 테이블을 Hive 파티션 파일로 저장 (기존 파티션은 교체)
+
+    - product_id 기준 정렬 → row group 통계(min/max)로 상품 단위 조회 시 pruning
+    - row group을 상품 경계에 맞춰 분할 → 한 상품은 row group 하나만 읽으면 됨
+    - 컬럼 통계 + 페이지 인덱스 기록
+    - vector_models: {벡터 컬럼: 모델 정보} - 파일에 있는 벡터 컬럼만 스키마 메타데이터에 기록
+
+    Returns:
+        tuple: (저장된 파일 경로, 상품 인덱스 항목 리스트)
+            인덱스 항목: {"product_id", "file", "row_group", "row_start", "row_count"}
+            (file은 dataset_dir 기준 상대 경로)
+    """
+    partition_dir = review_partition_dir(dataset_dir, category)
+    if os.path.exists(partition_dir):
+        shutil.rmtree(partition_dir)
+    os.makedirs(partition_dir, exist_ok=True)
+
+    # 파티션 값은 경로에 있으므로 파일에는 저장하지 않음
+    if REVIEW_PARTITION_COLUMN in review_table.column_names:
+        review_table = review_table.drop_columns([REVIEW_PARTITION_COLUMN])
+    review_table = review_table.sort_by("product_id")
+    if vector_models:
+        produced = {
+            column: info
+            for column, info in vector_models.items()
+            if column in review_table.column_names
+        }
+        review_table = review_table.replace_schema_metadata(
+            {
+                **(review_table.schema.metadata or {}),
+                REVIEW_VECTOR_MODELS_KEY: json.dumps(produced).encode("utf-8"),
+            }
+        )
+
+    path = os.path.join(partition_dir, REVIEW_PART_FILE)
+    rel_path = os.path.relpath(path, dataset_dir).replace(os.sep, "/")
+    product_ids = np.asarray(
+        review_table.column("product_id").to_pylist(), dtype=object
+    )
+
+    index_entries = []
+    with pq.ParquetWriter(
+        path,
+        review_table.schema,
+        compression="snappy",
+        write_statistics=True,
+        write_page_index=True,
+    ) as writer:
+        groups = _product_row_groups(product_ids, row_group_size)
+        for row_group, (group_start, group_end, products) in enumerate(groups):
+            chunk = review_table.slice(group_start, group_end - group_start)
+            writer.write_table(chunk, row_group_size=chunk.num_rows)
+            for product_id, start, end in products:
+                index_entries.append(
+                    {
+                        "product_id": product_id,
+                        "file": rel_path,
+                        "row_group": row_group,
+                        "row_start": start - group_start,
+                        "row_count": end - start,
+                    }
+                )
+
+    return path, index_entries
+
+
+def read_partition_vector_models(schema):
+    """파티션 파일 스키마 메타데이터의 벡터 모델 정보 (기록이 없으면 빈 dict)"""
+    raw = (schema.metadata or {}).get(REVIEW_VECTOR_MODELS_KEY)
+    if not raw:
+        return {}
+    try:
+        return json.loads(raw.decode("utf-8"))
+    except ValueError:
+        return {}
+
+
+def update_review_index(dataset_dir, index_entries_by_category):
+    """
+    리뷰 데이터셋의 product_id 사이드카 인덱스 갱신 (_product_index.parquet)
+
+    - 이번 실행에서 다시 쓴 카테고리 파티션의 항목만 교체
+    - 파일이 사라진 파티션의 항목은 제거
+    - "_" 접두사 파일이라 pyarrow dataset 탐색에서는 제외됨
+
+    Args:
+        dataset_dir: 리뷰 데이터셋 디렉토리
+        index_entries_by_category: {카테고리: write_review_partition이 반환한 인덱스 항목}
+
+    Returns:
+        int: 인덱스 전체 상품 수
+    """
+    index_path = os.path.join(dataset_dir, REVIEW_INDEX_FILE)
+    rewritten_files = {
+        os.path.relpath(
+            os.path.join(review_partition_dir(dataset_dir, category), REVIEW_PART_FILE),
+            dataset_dir,
+        ).replace(os.sep, "/")
+        for category in index_entries_by_category
+    }
+
+    entries = []
+    if os.path.exists(index_path):
+        for entry in pq.read_table(index_path).to_pylist():
+            if entry["file"] in rewritten_files:
+                continue
+            if not os.path.exists(os.path.join(dataset_dir, entry["file"])):
+                continue
+            entries.append(entry)
+    for category_entries in index_entries_by_category.values():
+        entries.extend(category_entries)
+
+    entries.sort(key=lambda e: e["product_id"] or "")
+    index_table = pa.Table.from_pylist(entries, schema=REVIEW_INDEX_SCHEMA)
+    pq.write_table(index_table, index_path, compression="snappy")
+    return index_table.num_rows
@@ -1,21 +1,108 @@
 import json
 import re
 import os
+import copy
+import glob
+import time
 import unicodedata
 from datetime import datetime
+from functools import lru_cache
+from dedup_index import review_fingerprint
+
+# normalize_text 정규식 (모듈 로드 시 한 번만 컴파일)
+_DISALLOWED_CHARS_RE = re.compile(r"[^가-힣a-zA-Z0-9\s.,!?~❤️]")
+_REPEATED_JAMO_RE = re.compile(r"([ㄱ-ㅎㅏ-ㅣ])\1+")
+_REPEATED_JAMO_PAIR_RE = re.compile(r"([ㄱ-ㅎㅏ-ㅣ]{2})\1+")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# 날짜 파싱 캐시 크기 (리뷰 날짜/수집 시각 문자열 단위)
+DATE_PARSE_CACHE_SIZE = 65536
 
 
 def normalize_text(text):
     if not text:
         return text
     text = unicodedata.normalize("NFC", text)
-    text = re.sub(r"[^가-힣a-zA-Z0-9\s.,!?~❤️]", "", text)
-    text = re.sub(r"([ㄱ-ㅎㅏ-ㅣ])\1+", r"\1\1", text)
-    text = re.sub(r"([ㄱ-ㅎㅏ-ㅣ]{2})\1+", r"\1\1", text)
-    text = re.sub(r"\s+", " ", text)
+    text = _DISALLOWED_CHARS_RE.sub("", text)
+    text = _REPEATED_JAMO_RE.sub(r"\1\1", text)
+    text = _REPEATED_JAMO_PAIR_RE.sub(r"\1\1", text)
+    text = _WHITESPACE_RE.sub(" ", text)
     return text.strip()
 
 
+@lru_cache(maxsize=DATE_PARSE_CACHE_SIZE)
+def _format_datetime(value, in_format, out_format):
+    """날짜 문자열을 in_format으로 파싱해 out_format으로 변환 (실패하면 원본 그대로)"""
+    try:
+        return datetime.strptime(value, in_format).strftime(out_format)
+    except (TypeError, ValueError):
+        return value
+
+
+def normalize_review(review):
+    """
+    리뷰 1건의 날짜/숫자/텍스트 정규화 (review를 직접 수정)
+
+    - title/content를 한 번씩만 정규화하고, full_text가 "title content"이면
+      정규화 결과를 이어 붙여 만듦 (같은 텍스트를 두 번 정규화하지 않음)
+      → 구분자가 공백이라 정규화 규칙이 경계를 넘지 않으므로 결과는 동일
+    - 날짜 파싱은 문자열 단위 캐시 (같은 날짜/시각은 한 번만 strptime)
+    """
+    # 날짜 변환: 2025.12.12. → 2025-12-12
+    review["date"] = _format_datetime(
+        review.get("date", "").strip("."), "%Y.%m.%d", "%Y-%m-%d"
+    )
+    # collected_at 변환: 2025.12.20 03:32:03 → 2025-12-20 03:32:03
+    review["collected_at"] = _format_datetime(
+        review.get("collected_at", ""), "%Y.%m.%d %H:%M:%S", "%Y-%m-%d %H:%M:%S"
+    )
+
+    review["score"] = int(review.get("score", 0))
+    review["id"] = int(review.get("id", 0))
+    review["helpful_count"] = int(review.get("helpful_count", 0))
+
+    # 텍스트 정규화 (이모지 제거 및 자모음 반복 축소)
+    title = review.get("title", "")
+    content = review.get("content", "")
+    full_text = review.get("full_text", "")
+    review["title"] = normalize_text(title)
+    review["content"] = normalize_text(content)
+    if (
+        isinstance(title, str)
+        and isinstance(content, str)
+        and full_text == f"{title} {content}"
+    ):
+        review["full_text"] = " ".join(
+            part for part in (review["title"], review["content"]) if part
+        )
+    else:
+        review["full_text"] = normalize_text(full_text)
+    return review
+
+
+def _legacy_normalize_review(review):
+    """벤치마크 비교용: 기존 방식 (필드별 normalize_text + 매번 strptime)"""
+    date_str = review.get("date", "").strip(".")
+    try:
+        review["date"] = datetime.strptime(date_str, "%Y.%m.%d").strftime("%Y-%m-%d")
+    except (TypeError, ValueError):
+        review["date"] = date_str
+    collected_str = review.get("collected_at", "")
+    try:
+        review["collected_at"] = datetime.strptime(
+            collected_str, "%Y.%m.%d %H:%M:%S"
+        ).strftime("%Y-%m-%d %H:%M:%S")
+    except (TypeError, ValueError):
+        review["collected_at"] = collected_str
+    review["score"] = int(review.get("score", 0))
+    review["id"] = int(review.get("id", 0))
+    review["helpful_count"] = int(review.get("helpful_count", 0))
+    review["title"] = normalize_text(review.get("title", ""))
+    review["content"] = normalize_text(review.get("content", ""))
+    review["full_text"] = normalize_text(review.get("full_text", ""))
+    return review
+
+
 def preprocess_format(input_filename):
     if not os.path.exists(input_filename):
         print(f"파일을 찾을 수 없습니다: {input_filename}")
@@ -24,10 +111,15 @@ def preprocess_format(input_filename):
     with open(input_filename, "r", encoding="utf-8") as f:
         json_data = json.load(f)
 
+    return preprocess_format_data(json_data)
+
+
+def preprocess_format_data(json_data):
+    """이미 로드된 JSON dict를 그대로 전처리 (임시 파일 저장/재로드 없이 사용)"""
     cleaned_products = []
 
     for product in json_data.get("data", []):
-        seen_reviews = set()  # 상품별로 (날짜, 닉네임, 내용) 중복 체크용
+        seen_reviews = set()  # 상품별로 (날짜, 닉네임, 내용) 64비트 지문 중복 체크용
 
         # 1. 상품 정보 변환
         info = product.get("product_info", {})
@@ -62,50 +154,12 @@ def preprocess_format(input_filename):
         cleaned_reviews = []
 
         for review in original_reviews:
-            # 날짜 변환 (datetime 객체 변환 후 덮어씌움)
-            date_str = review.get("date", "").strip(".")
-            try:
-                # 2025.12.12. 형태 파싱
-                dt_obj = datetime.strptime(date_str, "%Y.%m.%d")
-                review["date"] = dt_obj.strftime(
-                    "%Y-%m-%d"
-                )  # ISO 형식 문자열로 덮어씌움
-            except:
-                review["date"] = date_str
-
-            # collected_at 변환 (시분초 포함, datetime 형식으로 덮어씌움)
-            collected_str = review.get("collected_at", "")
-            try:
-                # 2025.12.20 03:32:03 형태 파싱
-                dt_obj = datetime.strptime(collected_str, "%Y.%m.%d %H:%M:%S")
-                review["collected_at"] = dt_obj.strftime(
-                    "%Y-%m-%d %H:%M:%S"
-                )  # ISO 형식으로 덮어씌움
-            except:
-                review["collected_at"] = collected_str
-
-            # 별점 정수형 변환
-            review["score"] = int(review.get("score", 0))
-
-            # id 정수형 변환
-            review["id"] = int(review.get("id", 0))
-
-            # helpful_count 정수형 변환
-            review["helpful_count"] = int(review.get("helpful_count", 0))
-
-            # 텍스트 정규화 (이모지 제거 및 자모음 반복 축소)
-            review["title"] = normalize_text(review.get("title", ""))
-            review["content"] = normalize_text(review.get("content", ""))
-            review["full_text"] = normalize_text(review.get("full_text", ""))
+            normalize_review(review)
 
             # 중복 검사 (날짜, 닉네임, 전체 텍스트 기준)
-            review_fingerprint = (
-                review.get("date"),
-                review.get("nickname"),
-                review.get("full_text"),
-            )
-            if review_fingerprint not in seen_reviews:
-                seen_reviews.add(review_fingerprint)
+            fingerprint = review_fingerprint(review)
+            if fingerprint not in seen_reviews:
+                seen_reviews.add(fingerprint)
                 cleaned_reviews.append(review)
 
         # 업데이트된 리뷰 리스트 저장
@@ -145,6 +199,69 @@ def preprocess_format(input_filename):
     return json_data
 
 
+def benchmark_preprocess_format(pre_data_dir="./data/pre_data", repeat=3):
+    """
+    카테고리(파일)별 리뷰 정규화 처리량 벤치마크 (리뷰/초)
+
+    - legacy: 필드별 normalize_text 3회 + 리뷰마다 strptime 2회 (기존 방식)
+    - bulk: normalize_review (title/content 1회 정규화 + full_text 재사용, 날짜 캐시)
+
+    Returns:
+        dict: {카테고리: {"reviews", "legacy_per_sec", "bulk_per_sec"}}
+    """
+    results = {}
+    for path in sorted(
+        glob.glob(os.path.join(pre_data_dir, "**", "*.json"), recursive=True)
+    ):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"[경고] 파일 로드 실패: {path} ({e})")
+            continue
+
+        reviews = [
+            r
+            for p in data.get("data", [])
+            for r in (p.get("reviews") or {}).get("data", [])
+        ]
+        if not reviews:
+            continue
+
+        timings = {}
+        outputs = {}
+        for mode, fn in (("legacy", _legacy_normalize_review), ("bulk", normalize_review)):
+            _format_datetime.cache_clear()
+            elapsed = 0.0
+            for _ in range(repeat):
+                batch = copy.deepcopy(reviews)
+                t0 = time.perf_counter()
+                for review in batch:
+                    fn(review)
+                elapsed += time.perf_counter() - t0
+            timings[mode] = len(reviews) * repeat / elapsed if elapsed > 0 else 0.0
+            outputs[mode] = batch
+
+        if outputs["legacy"] != outputs["bulk"]:
+            print(f"[경고] 정규화 결과가 다릅니다: {path}")
+
+        category = os.path.splitext(os.path.basename(path))[0]
+        results[category] = {
+            "reviews": len(reviews),
+            "legacy_per_sec": timings["legacy"],
+            "bulk_per_sec": timings["bulk"],
+        }
+        print(
+            f"{category}: 리뷰 {len(reviews):,}개 | "
+            f"legacy {timings['legacy']:,.0f}/s → bulk {timings['bulk']:,.0f}/s "
+            f"(x{timings['bulk'] / max(timings['legacy'], 1e-9):.2f})"
+        )
+
+    if not results:
+        print(f"[오류] 리뷰가 있는 JSON 파일을 찾을 수 없습니다: {pre_data_dir}")
+    return results
+
+
 if __name__ == "__main__":
     # main.py 실행 후 생성된 파일명을 여기에 입력하세요
     target_file = "result_오일.json"
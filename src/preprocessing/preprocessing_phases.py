@@ -14,20 +14,45 @@ from collections import Counter
 import numpy as np
 from gensim.models import Word2Vec
 from multiprocessing import cpu_count
-from preprocess_format import preprocess_format
+from preprocess_format import preprocess_format_data
 from brand_standardizer import brand_standardizer
 from drop_missing_val_splitter import drop_missing_val_splitter
-from skintype import classify_product
+from skintype import classify_products
+from dedup_index import drop_duplicate_reviews, init_dedup_stats, release_fingerprints
 from sentiment_analysis import (
     analyze_skin_type_frequency,
-    analyze_category_sentiment,
-    analyze_product_sentiment,
+    init_sentiment_stats,
+    merge_sentiment_stats,
+    init_skin_type_counts,
+    update_skin_type_counts,
+    term_frequency_matrix,
+    update_sentiment_stats_from_csr,
+    sentiment_stats_summary,
 )
 from preprocessing_utils import (
     load_stopwords,
     get_tokens,
     cosine_similarity,
     TokenIterator,
+    compute_corpus_hash,
+    save_word2vec_model,
+    make_word2vec_version,
+    find_saved_word2vec,
+    load_word2vec_model,
+    load_keyed_vectors,
+    write_product_info_index,
+)
+from parquet_store import build_reviews_table
+from tfidf_store import (
+    fit_idf,
+    save_idf,
+    load_idf,
+    transform_tfidf,
+    save_review_tfidf,
+    load_review_tfidf,
+    list_tfidf_categories,
+    stored_document_frequency,
+    reweight_review_tfidf,
 )
 
 # gensim 내부 경고 억제
@@ -48,6 +73,14 @@ def suppress_stderr():
 
 MAX_WORKERS = max(1, cpu_count() - 1)
 
+# Word2Vec 학습 파라미터 (모델 버전 ID 계산에도 사용)
+W2V_PARAMS = {
+    "vector_size": 100,
+    "window": 5,
+    "min_count": 3,
+    "sg": 1,  # Skip-gram
+}
+
 
 def preprocess_and_tokenize_file(args):
     """
@@ -55,11 +88,20 @@ def preprocess_and_tokenize_file(args):
     - 포맷 전처리, 브랜드 표준화, 결측치 제거, 토큰화를 한 번에 수행
     - 토큰 결과를 임시 파일로 저장
     - 리뷰 개수가 최소 개수 미만인 상품 제외
+    - 전역 중복 제거 인덱스로 다른 상품/카테고리에 이미 있는 리뷰 제외 (토큰화 전)
     """
-    input_path, pre_data_dir, processed_data_dir, temp_tokens_dir, min_reviews = args
+    (
+        input_path,
+        pre_data_dir,
+        processed_data_dir,
+        temp_tokens_dir,
+        min_reviews,
+        dedup_index_path,
+    ) = args
 
     file_name = os.path.basename(input_path)
     stopwords = load_stopwords()
+    dedup_source = None  # 중복 제거 인덱스에 지문을 등록한 카테고리 (실패 시 해제)
 
     try:
         # 상대 경로 계산
@@ -87,15 +129,8 @@ def preprocess_and_tokenize_file(args):
         with open(input_path, "r", encoding="utf-8") as f:
             data = json.load(f)
 
-        # 2. 포맷 전처리
-        temp_file = f"temp_{os.getpid()}_{base_name}.json"
-        with open(temp_file, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-
-        data = preprocess_format(temp_file)
-
-        if os.path.exists(temp_file):
-            os.remove(temp_file)
+        # 2. 포맷 전처리 (로드한 dict를 그대로 사용 - 임시 파일 왕복 없음)
+        data = preprocess_format_data(data)
 
         # 3. 브랜드 표준화
         data = brand_standardizer(data)
@@ -116,6 +151,33 @@ def preprocess_and_tokenize_file(args):
             if review_count >= min_reviews:
                 filtered_without_text.append(product)
 
+        # 4-2. 전역 중복 리뷰 제거 (옵션별 상품 URL/카테고리 간 같은 리뷰는 한 상품만 유지)
+        dedup_stats = init_dedup_stats()
+        if dedup_index_path:
+            category = unicodedata.normalize("NFC", str(base_name))
+            owned_reviews = []
+            for product in filtered_with_text:
+                p_info = product.get("product_info", {})
+                original_id = p_info.get("product_id", p_info.get("id", ""))
+                owner = unicodedata.normalize("NFC", f"{category}_with_{original_id}")
+                owned_reviews.append((owner, product.get("reviews", {}).get("data", [])))
+            dedup_source = category
+            dedup_stats = drop_duplicate_reviews(
+                owned_reviews, category, dedup_index_path, min_reviews
+            )
+
+            # 중복 제거 후 리뷰 수가 최소 개수 미만인 상품은 제외
+            # (인덱스에서도 등록이 빠져 있음, 모든 리뷰가 다른 상품 소유인 옵션 중복 상품 포함)
+            deduped_with_text = []
+            for product in filtered_with_text:
+                reviews = product.get("reviews", {})
+                if len(reviews.get("data") or []) < min_reviews:
+                    continue
+                reviews["total_count"] = len(reviews["data"])
+                reviews["text_count"] = sum(1 for r in reviews["data"] if r.get("content"))
+                deduped_with_text.append(product)
+            filtered_with_text = deduped_with_text
+
         # 필터링된 결과로 교체
         with_text["data"] = filtered_with_text
         without_text["data"] = filtered_without_text
@@ -128,7 +190,7 @@ def preprocess_and_tokenize_file(args):
                 "reason": f"모든 상품의 리뷰가 {min_reviews}개 미만",
             }
 
-        # 4-2. without_text의 product_id 수정 (카테고리_without_원본ID)
+        # 4-3. without_text의 product_id 수정 (카테고리_without_원본ID)
         for product in without_text.get("data", []):
             p_info = product.get("product_info", {})
             original_id = p_info.get("product_id", p_info.get("id", ""))
@@ -144,6 +206,9 @@ def preprocess_and_tokenize_file(args):
         all_tokens = []  # Word2Vec 학습용
         tokenized_data = []  # 나중에 벡터화에 사용할 토큰 저장
 
+        # skin_type: 카테고리 전체를 컴파일된 키워드 매처 하나로 일괄 분류
+        skin_results = classify_products(with_text.get("data", []))
+
         for product_idx, product in enumerate(with_text.get("data", [])):
             p_info = product.get("product_info", {})
 
@@ -160,7 +225,7 @@ def preprocess_and_tokenize_file(args):
             p_info["category_file"] = category
 
             # skin_type 추가
-            skin_result = classify_product(product)
+            skin_result = skin_results[product_idx]
             p_info["skin_type"] = skin_result.get("skin_type", "미분류")
 
             product_tokens = {
@@ -226,15 +291,27 @@ def preprocess_and_tokenize_file(args):
             "token_count": len(all_tokens),
             "output_dir": output_dir,
             "base_name": base_name,
+            "dedup": dedup_stats,
         }
 
     except Exception as e:
+        # 출력 없이 끝난 파일이 리뷰 소유권을 계속 갖지 않도록 등록한 지문 해제
+        if dedup_source is not None:
+            try:
+                release_fingerprints(dedup_source, dedup_index_path)
+            except Exception as release_error:
+                print(f"[경고] 중복 제거 지문 해제 실패: {file_name} ({release_error})")
         return {"status": "error", "file": file_name, "error": str(e)}
 
 
 def train_global_word2vec(temp_tokens_dir):
     """
     Phase 2: Iterator 방식으로 Word2Vec 모델 학습 (메모리 효율적)
+    - 학습된 모델은 data/models/<버전 ID>/ 에 저장 (버전 = 학습 파라미터 + corpus 해시)
+    - 같은 버전이 이미 저장돼 있으면 재학습하지 않고 로드 (재실행 시 벡터가 바뀌지 않음)
+
+    Returns:
+        tuple: (모델, 모델 버전 ID) - 실패 시 (None, None)
     """
     print("\n" + "=" * 60)
     print("전역 Word2Vec 모델 학습 시작 (Iterator 방식)")
@@ -249,40 +326,122 @@ def train_global_word2vec(temp_tokens_dir):
 
     if not token_files:
         print("[경고] 토큰 파일이 없습니다. Word2Vec 학습을 건너뜁니다.")
-        return None
+        return None, None
+
+    corpus_hash = compute_corpus_hash(token_iterator.token_files)
+    version = make_word2vec_version(W2V_PARAMS, corpus_hash)
+    if find_saved_word2vec(version):
+        model = load_word2vec_model(version)
+        if model is not None:
+            print(f"같은 corpus로 학습된 Word2Vec 모델 재사용 (버전: {version})")
+            return model, version
 
     # Word2Vec 모델 학습 (Skip-gram, Iterator 방식) - stderr 억제
     with suppress_stderr():
         model = Word2Vec(
             sentences=token_iterator,
-            vector_size=100,
-            window=5,
-            min_count=3,
             workers=MAX_WORKERS,
-            sg=1,  # Skip-gram
+            **W2V_PARAMS,
         )
 
     print(f"Word2Vec 모델 학습 완료 (어휘 크기: {len(model.wv):,})")
-    return model
+
+    # 모델 저장 (학습에 사용된 토큰 파일 기준 corpus 해시)
+    version = save_word2vec_model(model, W2V_PARAMS, corpus_hash)
+    print(f"Word2Vec 모델 저장 완료 (버전: {version})")
+
+    return model, version
+
+
+def fit_global_idf(temp_tokens_dir, store_dir):
+    """
+    Phase 2: corpus IDF 학습 (실행당 1회, 전체 corpus 기준)
+    - 이번 실행 토큰 파일 + 재처리하지 않은 카테고리의 저장된 TF-IDF 행렬(문서 빈도) 사용
+    - TF-IDF 저장소(idf.parquet)에 저장 → Phase 3 워커가 로드해 리뷰 TF-IDF 변환
+    - 재처리하지 않은 카테고리 행렬은 새 IDF로 재가중 → 모든 카테고리가 같은 IDF 버전 유지
+
+    Returns:
+        str: IDF 버전 ID (토큰 파일이 없으면 None)
+    """
+    token_files = glob.glob(os.path.join(temp_tokens_dir, "*_tokens.pkl"))
+    if not token_files:
+        print("[경고] 토큰 파일이 없습니다. IDF 학습을 건너뜁니다.")
+        return None
+
+    # 이번 실행에서 다시 변환할 카테고리 (저장된 행렬은 Phase 3에서 교체됨)
+    reprocessed = {
+        unicodedata.normalize("NFC", os.path.basename(f)[: -len("_tokens.pkl")])
+        for f in token_files
+    }
+    old_idf = load_idf(store_dir)
+    kept_categories = []
+    if old_idf is not None:
+        for category in list_tfidf_categories(store_dir):
+            if unicodedata.normalize("NFC", category) in reprocessed:
+                continue
+            matrix = load_review_tfidf(category, store_dir)
+            if matrix is None:
+                continue
+            if matrix["meta"]["idf_version"] != old_idf["version"]:
+                print(f"[경고] IDF 버전을 알 수 없는 TF-IDF 행렬이라 제외합니다: {category}")
+                continue
+            kept_categories.append(category)
+
+    base_doc_freq, base_n_docs = (
+        stored_document_frequency(kept_categories, old_idf, store_dir)
+        if kept_categories
+        else (None, 0)
+    )
+    corpus_hash = compute_corpus_hash(token_files)
+    if kept_categories:
+        # 재처리하지 않은 카테고리 구성/버전도 IDF 버전에 반영
+        corpus_hash += json.dumps([old_idf["version"], sorted(kept_categories)])
+
+    idf_model = fit_idf(token_files, corpus_hash, base_doc_freq, base_n_docs)
+    save_idf(idf_model, store_dir)
+    print(
+        f"IDF 학습 완료 (어휘 크기: {len(idf_model['words']):,}, "
+        f"문서 수: {idf_model['n_docs']:,}, 버전: {idf_model['version']})"
+    )
+
+    reweighted = 0
+    for category in kept_categories:
+        if reweight_review_tfidf(category, old_idf, idf_model, store_dir):
+            reweighted += 1
+        else:
+            print(f"[경고] TF-IDF 행렬 재가중 실패: {category}")
+    if kept_categories:
+        print(f"재처리하지 않은 카테고리 TF-IDF 재가중: {reweighted}/{len(kept_categories)}개")
+    return idf_model["version"]
 
 
 def vectorize_file(args):
     """
     Phase 3: 저장된 토큰을 재사용하여 벡터화 + 대표 리뷰 선정 (병렬 실행)
     - JSON: 상품 요약 정보만 저장 (대표 벡터 포함)
-    - 리뷰 상세 정보는 반환하여 Parquet로 통합 저장
+    - 리뷰 상세 정보는 Arrow 테이블로 반환 → 메인 프로세스가 Parquet에 스트리밍 저장
+    - 리뷰 TF-IDF(corpus IDF)는 파일 단위로 한 번 변환해 저장소에 CSR로 저장
+    - 감성 통계는 그 TF-IDF로 상품별 한 번만 집계 → 카테고리 통계로 병합해 반환
+    - 피부타입별 단어 빈도도 파일 단위 부분 카운터로 반환 (메인 프로세스에서 병합)
     - vectorizer_type에 따라 word2vec, bert, 또는 둘 다 생성
+    - Word2Vec은 모델 객체 대신 저장된 KeyedVectors 경로를 받아 mmap 로드
     """
     (
         base_name,
         temp_tokens_dir,
         output_dir,
-        w2v_model,
+        w2v_kv_path,
+        tfidf_store_dir,
         bert_vectorizer,
         vectorizer_type,
+        vector_dims,
     ) = args
 
     try:
+        # 저장된 Word2Vec 벡터를 mmap으로 로드 (워커 간 한 사본 공유)
+        w2v_kv = load_keyed_vectors(kv_path=w2v_kv_path) if w2v_kv_path else None
+        idf_model = load_idf(tfidf_store_dir) if tfidf_store_dir else None
+
         # 저장된 토큰화 데이터 로드
         tokenized_file = os.path.join(temp_tokens_dir, f"{base_name}_tokenized.pkl")
         with open(tokenized_file, "rb") as f:
@@ -295,12 +454,16 @@ def vectorize_file(args):
         # 상품 요약 정보 & 리뷰 상세 정보 수집
         product_summaries = []
         review_details = []
+        product_row_ranges = []  # 상품별 review_details 행 범위
+        category_stats = init_sentiment_stats()  # 상품 → 카테고리 감성 통계
+        skin_type_counts = init_skin_type_counts()  # 파일 단위 피부타입 단어 빈도
 
         for product_idx, product in enumerate(with_text.get("data", [])):
             review_vectors_w2v = []  # Word2Vec 벡터 리스트
             review_vectors_bert = []  # BERT 벡터 리스트
             product_tokens = tokenized_data[product_idx]
             product_info = product.get("product_info", {})
+            product_row_start = len(review_details)
 
             for review_idx, review in enumerate(
                 product.get("reviews", {}).get("data", [])
@@ -336,16 +499,15 @@ def vectorize_file(args):
                 }
 
                 # Word2Vec 벡터 생성
-                if vectorizer_type in ["word2vec", "both"] and w2v_model:
-                    word_vectors = [
-                        w2v_model.wv[w] for w in tokens if w in w2v_model.wv
-                    ]
+                if vectorizer_type in ["word2vec", "both"] and w2v_kv is not None:
+                    word_vectors = [w2v_kv[w] for w in tokens if w in w2v_kv]
                     if word_vectors:
                         w2v_vec = np.mean(word_vectors, axis=0)
                     else:
-                        w2v_vec = np.zeros(100)
+                        w2v_vec = np.zeros(w2v_kv.vector_size)
 
-                    review_detail["word2vec"] = w2v_vec.tolist()
+                    # Parquet fixed_size_list<float32> 컬럼으로 저장 (리스트 변환 없음)
+                    review_detail["word2vec"] = w2v_vec.astype(np.float32)
                     review_vectors_w2v.append(
                         {
                             "vector": w2v_vec,
@@ -359,7 +521,7 @@ def vectorize_file(args):
                 # BERT 벡터 생성
                 if vectorizer_type in ["bert", "both"] and bert_vectorizer:
                     bert_vec = bert_vectorizer.encode(full_text)
-                    review_detail["bert"] = bert_vec.tolist()
+                    review_detail["bert"] = np.asarray(bert_vec, dtype=np.float32)
 
                     review_vectors_bert.append(
                         {
@@ -455,17 +617,55 @@ def vectorize_file(args):
                     product_info["representative_review_id"] = None
                     product_info["representative_similarity"] = 0.0
 
-            # 상품별 감성 키워드 분석
-            sentiment_result = analyze_product_sentiment(
-                product, top_n=30, min_doc_freq=5
+            update_skin_type_counts(
+                skin_type_counts, product.get("reviews", {}).get("data", [])
             )
-            product_info["sentiment_analysis"] = sentiment_result
 
             product_summaries.append(product_info)
+            product_row_ranges.append((product_row_start, len(review_details)))
+
+        # 리뷰 TF-IDF: 파일 전체를 한 번만 변환해 저장하고 감성 통계에도 재사용
+        token_lists = [r["tokens"] for r in review_details]
+        labels = np.array(
+            [-1 if r["label"] is None else r["label"] for r in review_details],
+            dtype=np.int8,
+        )
+        if idf_model is not None:
+            indptr, indices, weights = transform_tfidf(token_lists, idf_model)
+            words = idf_model["words"]
+            save_review_tfidf(
+                base_name,
+                (indptr, indices, weights),
+                [r["product_id"] for r in review_details],
+                [r["review_id"] for r in review_details],
+                idf_model,
+                tfidf_store_dir,
+            )
+        else:
+            # IDF가 없으면 TF만 사용 (기존 방식)
+            indptr, indices, weights, words = term_frequency_matrix(token_lists)
+        token_counts = np.array([len(t) for t in token_lists], dtype=np.int64)
+
+        # 상품별 감성 키워드 분석 (상품 부분 통계는 카테고리 통계에 병합)
+        for product_info, (start, end) in zip(product_summaries, product_row_ranges):
+            lo, hi = indptr[start], indptr[end]
+            product_stats = update_sentiment_stats_from_csr(
+                init_sentiment_stats(),
+                indptr[start : end + 1] - lo,
+                indices[lo:hi],
+                weights[lo:hi],
+                labels[start:end],
+                words,
+                token_counts=token_counts[start:end],
+            )
+            product_info["sentiment_analysis"] = sentiment_stats_summary(
+                product_stats, top_n=30, min_doc_freq=5
+            )
+            merge_sentiment_stats(category_stats, product_stats)
 
-        # 카테고리별 감성 키워드 분석
-        category_sentiment = analyze_category_sentiment(
-            with_text.get("data", []), top_n=30, min_doc_freq=20
+        # 카테고리별 감성 키워드 분석 (상품 부분 통계 병합 결과, 리뷰 재집계 없음)
+        category_sentiment = sentiment_stats_summary(
+            category_stats, top_n=30, min_doc_freq=20
         )
 
         # 결과 저장
@@ -496,11 +696,20 @@ def vectorize_file(args):
         with open(processed_without_text, "w", encoding="utf-8") as f:
             json.dump(without_text, f, ensure_ascii=False, indent=2)
 
+        # 상품 메타데이터 인덱스 (기본 통계 EDA가 JSON 전체 대신 읽음)
+        write_product_info_index(processed_with_text, product_summaries)
+        write_product_info_index(processed_without_text, without_text.get("data", []))
+
+        # 리뷰 상세는 워커에서 Arrow 테이블로 변환 (dict 리스트 대신 컬럼 버퍼로 전달)
+        review_table = build_reviews_table(review_details, vector_dims)
+
         return {
             "status": "success",
             "file": base_name,
             "product_summaries": product_summaries,
-            "review_details": review_details,
+            "review_table": review_table,
+            "sentiment_stats": category_stats,
+            "skin_type_counts": dict(skin_type_counts),
         }
 
     except Exception as e:
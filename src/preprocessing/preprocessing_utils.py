@@ -4,12 +4,24 @@
 
 import os
 import re
+import json
 import glob
+import time
 import pickle
+import hashlib
+import threading
 import unicodedata
+from collections import OrderedDict
+from datetime import datetime
+from functools import lru_cache
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from gensim.models import Word2Vec, KeyedVectors
 from konlpy.tag import Okt
+from parquet_store import REVIEW_INDEX_FILE, vector_column_to_numpy
 
 # 형태소 분석기 초기화
 okt = Okt()
@@ -79,10 +91,159 @@ class TokenIterator:
                 continue
 
 
+# =========================
+# Word2Vec 모델 저장/로딩 함수
+# =========================
+
+MODEL_DIR = "./data/models"
+LATEST_W2V_FILE = "latest_word2vec.json"
+W2V_MODEL_FILE = "word2vec.model"
+W2V_KV_FILE = "word2vec.kv"
+
+# 프로세스별 KeyedVectors 캐시 (같은 워커에서 여러 파일을 처리할 때 재로딩 방지)
+_keyed_vectors_cache = {}
+
+
+def compute_corpus_hash(token_files):
+    """토큰 파일들의 내용으로 corpus 해시 계산 (파일 순서와 무관)"""
+    hasher = hashlib.sha256()
+    for token_file in sorted(token_files, key=os.path.basename):
+        hasher.update(os.path.basename(token_file).encode("utf-8"))
+        with open(token_file, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def make_word2vec_version(params, corpus_hash):
+    """학습 파라미터 + corpus 해시로 모델 버전 ID 생성"""
+    payload = json.dumps(params, sort_keys=True) + corpus_hash
+    return "w2v-" + hashlib.sha256(payload.encode("utf-8")).hexdigest()[:12]
+
+
+def save_word2vec_model(model, params, corpus_hash, model_dir=MODEL_DIR):
+    """
+    Word2Vec 모델과 KeyedVectors를 버전 디렉토리에 저장
+
+    - 모든 numpy 배열을 별도 .npy로 분리 저장 (sep_limit=0) → mmap 로딩 가능
+    - latest_word2vec.json에 최신 버전 기록
+
+    Returns:
+        str: 모델 버전 ID
+    """
+    version = make_word2vec_version(params, corpus_hash)
+    version_dir = os.path.join(model_dir, version)
+    os.makedirs(version_dir, exist_ok=True)
+
+    model.save(os.path.join(version_dir, W2V_MODEL_FILE), sep_limit=0)
+    model.wv.save(os.path.join(version_dir, W2V_KV_FILE), sep_limit=0)
+
+    meta = {
+        "version": version,
+        "params": params,
+        "corpus_hash": corpus_hash,
+        "vocab_size": len(model.wv),
+        "vector_size": model.wv.vector_size,
+        "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    with open(os.path.join(version_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    with open(os.path.join(model_dir, LATEST_W2V_FILE), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+
+    return version
+
+
+def find_saved_word2vec(version, model_dir=MODEL_DIR):
+    """
+    같은 버전(학습 파라미터 + corpus 해시)으로 저장된 모델이 있으면 최신 버전으로 지정
+
+    - Word2Vec 학습은 워커 수에 따라 비결정적이므로 같은 corpus는 재학습하지 않고 재사용
+      (같은 버전 ID에 다른 벡터를 덮어쓰지 않음)
+
+    Returns:
+        bool: 저장된 모델 사용 여부
+    """
+    version_dir = os.path.join(model_dir, version)
+    meta_path = os.path.join(version_dir, "meta.json")
+    if not all(
+        os.path.exists(path)
+        for path in (
+            meta_path,
+            os.path.join(version_dir, W2V_MODEL_FILE),
+            os.path.join(version_dir, W2V_KV_FILE),
+        )
+    ):
+        return False
+
+    with open(meta_path, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    with open(os.path.join(model_dir, LATEST_W2V_FILE), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    return True
+
+
+def resolve_word2vec_version(version=None, model_dir=MODEL_DIR):
+    """버전 ID가 없으면 latest_word2vec.json의 최신 버전 반환"""
+    if version:
+        return version
+    latest_path = os.path.join(model_dir, LATEST_W2V_FILE)
+    with open(latest_path, "r", encoding="utf-8") as f:
+        return json.load(f)["version"]
+
+
+def get_keyed_vectors_path(version=None, model_dir=MODEL_DIR):
+    """버전에 해당하는 KeyedVectors 파일 경로"""
+    version = resolve_word2vec_version(version, model_dir)
+    return os.path.join(model_dir, version, W2V_KV_FILE)
+
+
+def load_keyed_vectors(version=None, model_dir=MODEL_DIR, kv_path=None):
+    """
+    저장된 KeyedVectors를 mmap='r'로 로드 (여러 프로세스가 한 벡터 사본을 공유)
+
+    Args:
+        version: 모델 버전 ID (None이면 최신 버전)
+        model_dir: 모델 저장 디렉토리
+        kv_path: KeyedVectors 파일 경로 (지정 시 version 무시)
+
+    Returns:
+        KeyedVectors 또는 None
+    """
+    try:
+        if kv_path is None:
+            kv_path = get_keyed_vectors_path(version, model_dir)
+        if kv_path not in _keyed_vectors_cache:
+            _keyed_vectors_cache[kv_path] = KeyedVectors.load(kv_path, mmap="r")
+        return _keyed_vectors_cache[kv_path]
+    except FileNotFoundError:
+        print(f"[오류] Word2Vec 모델을 찾을 수 없습니다: {kv_path or model_dir}")
+        return None
+
+
+def load_word2vec_model(version=None, model_dir=MODEL_DIR):
+    """
+    저장된 전체 Word2Vec 모델을 mmap='r'로 로드 (추가 학습 없이 조회용)
+
+    Returns:
+        Word2Vec 또는 None
+    """
+    try:
+        version = resolve_word2vec_version(version, model_dir)
+        model_path = os.path.join(model_dir, version, W2V_MODEL_FILE)
+        return Word2Vec.load(model_path, mmap="r")
+    except FileNotFoundError:
+        print(f"[오류] Word2Vec 모델을 찾을 수 없습니다: {model_dir}")
+        return None
+
+
 # =========================
 # Parquet 파일 로딩 함수
 # =========================
 
+# 리뷰 상세 데이터셋 (category_file=<카테고리> Hive 파티션 디렉토리)
+REVIEW_DATASET_PATH = "./data/processed_data/integrated_reviews_detail"
+
 
 def load_products_parquet(
     parquet_path="./data/processed_data/integrated_products_vector.parquet",
@@ -107,32 +268,216 @@ def load_products_parquet(
         return None
 
 
+def get_word2vec_version_from_parquet(
+    parquet_path="./data/processed_data/integrated_products_vector.parquet",
+):
+    """
+    상품 Parquet 메타데이터에 기록된 Word2Vec 모델 버전 ID 조회
+
+    Returns:
+        str: 모델 버전 ID (기록이 없으면 None)
+    """
+    try:
+        metadata = pq.read_schema(parquet_path).metadata or {}
+        version = metadata.get(b"word2vec_model_version")
+        return version.decode("utf-8") if version else None
+    except FileNotFoundError:
+        print(f"[오류] 파일을 찾을 수 없습니다: {parquet_path}")
+        return None
+
+
+# processed JSON 옆에 두는 상품 메타데이터 인덱스 (JSON Lines, 한 줄 = product_info 1개)
+# → 기본 통계 EDA가 리뷰/벡터가 들어있는 JSON 전체를 파싱하지 않고 상품 정보만 읽음
+PRODUCT_INFO_INDEX_SUFFIX = ".product_info.jsonl"
+# 인덱스에서 제외할 무거운 필드 (벡터, 감성 키워드, 토큰)
+PRODUCT_INFO_INDEX_EXCLUDE = (
+    "product_vector",
+    "representative_",
+    "sentiment_analysis",
+    "product_tokens",
+)
+
+
+def product_info_index_path(json_path):
+    """processed_X_with_text.json → processed_X_with_text.product_info.jsonl"""
+    base, _ = os.path.splitext(json_path)
+    return base + PRODUCT_INFO_INDEX_SUFFIX
+
+
+def write_product_info_index(json_path, data_items):
+    """
+    processed JSON의 data[*].product_info 를 메타데이터 인덱스(JSON Lines)로 저장
+
+    Args:
+        json_path: 방금 저장한 processed JSON 경로
+        data_items: JSON의 "data" 리스트 ({"product_info": {...}, ...} 또는 product_info 자체)
+    """
+    index_path = product_info_index_path(json_path)
+    tmp_path = index_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for item in data_items:
+            product_info = item.get("product_info") or item
+            row = {
+                k: v
+                for k, v in product_info.items()
+                if not k.startswith(PRODUCT_INFO_INDEX_EXCLUDE)
+            }
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+    os.replace(tmp_path, index_path)
+    return index_path
+
+
+def category_from_product_id(product_id):
+    """
+    고유 product_id에서 카테고리(파티션 값) 추출
+
+    예: "선스틱_with_1" → "선스틱", "선스틱_without_3" → "선스틱" (형식이 다르면 None)
+    """
+    for sep in ("_with_", "_without_"):
+        if sep in product_id:
+            return product_id.rsplit(sep, 1)[0]
+    return None
+
+
+def _dataset_cache_key(path):
+    # 파티션이 교체되면 데이터셋 루트 디렉토리의 mtime이 바뀜 → 파일 목록 재탐색
+    return (os.path.abspath(path), os.path.getmtime(path))
+
+
+_dataset_cache = {}
+
+
+def open_parquet_dataset(path):
+    """
+    Parquet 파일/Hive 파티션 디렉토리를 pyarrow Dataset으로 열기 (파일 목록 탐색 결과 캐시)
+
+    - 디렉토리면 모든 파티션 파일의 스키마를 합친 스키마로 열기
+      (첫 파일 스키마만 쓰면 실행마다 VECTORIZER_TYPE이 달라 벡터 컬럼이 없거나
+       이전 버전에서 null 타입으로 저장된 파티션이 섞일 때 읽기 실패)
+    """
+    key = _dataset_cache_key(path)
+    if key not in _dataset_cache:
+        dataset = ds.dataset(path, format="parquet", partitioning="hive")
+        if os.path.isdir(path):
+            schemas = [dataset.schema] + [
+                fragment.physical_schema for fragment in dataset.get_fragments()
+            ]
+            schema = pa.unify_schemas(schemas)
+            if not schema.equals(dataset.schema):
+                dataset = ds.dataset(
+                    path, schema=schema, format="parquet", partitioning="hive"
+                )
+        _dataset_cache[key] = dataset
+    return _dataset_cache[key]
+
+
+def product_filter(product_ids, dataset=None):
+    """
+    product_id 필터 식 생성
+    - product_id 행 그룹 통계(min/max)로 row group pruning
+    - 카테고리 파티션 컬럼이 있으면 category_file 조건을 더해 파티션 pruning
+    """
+    product_ids = [unicodedata.normalize("NFC", str(pid)) for pid in product_ids]
+    if len(product_ids) == 1:
+        expr = ds.field("product_id") == product_ids[0]
+    else:
+        expr = ds.field("product_id").isin(product_ids)
+
+    categories = {category_from_product_id(pid) for pid in product_ids}
+    has_partition = dataset is None or "category_file" in dataset.schema.names
+    if has_partition and None not in categories:
+        categories = sorted(categories)
+        if len(categories) == 1:
+            expr = expr & (ds.field("category_file") == categories[0])
+        else:
+            expr = expr & ds.field("category_file").isin(categories)
+    return expr
+
+
 def load_reviews_parquet(
-    parquet_path="./data/processed_data/integrated_reviews_detail.parquet",
+    parquet_path=REVIEW_DATASET_PATH,
     product_id=None,
+    columns=None,
 ):
     """
-    리뷰 상세 Parquet 파일 로드 (필터링 옵션)
+    리뷰 상세 Parquet 데이터셋 로드 (필터링 옵션)
 
     Args:
-        parquet_path: Parquet 파일 경로
+        parquet_path: 리뷰 데이터셋 경로 (category_file 파티션 디렉토리 또는 단일 파일)
         product_id: 특정 상품 ID로 필터링 (None이면 전체 로드)
+        columns: 읽을 컬럼 리스트 (None이면 전체)
 
     Returns:
         DataFrame: 리뷰 상세 정보 (tokens, word2vec 포함)
 
     Note:
-        product_id는 이미 카테고리와 조합된 고유 ID입니다 (예: "로션_1")
+        product_id는 이미 카테고리와 조합된 고유 ID입니다 (예: "로션_with_1")
+        → 상품 인덱스가 있으면 row group 1개만 읽음 (LRU 캐시)
+        → 인덱스가 없으면 해당 카테고리 파티션의 관련 row group만 스캔
     """
     try:
-        df = pd.read_parquet(parquet_path)
-
         if product_id:
-            # product_id를 NFC로 정규화하여 비교
-            normalized_id = unicodedata.normalize("NFC", str(product_id))
-            df = df[df["product_id"] == normalized_id]
+            df = load_indexed_reviews([product_id], parquet_path, columns)
+            if df is not None:
+                return df
+
+        dataset = open_parquet_dataset(parquet_path)
+        # product_id를 NFC로 정규화하여 비교
+        expr = product_filter([product_id], dataset) if product_id else None
+        return dataset.to_table(columns=columns, filter=expr).to_pandas()
+    except FileNotFoundError:
+        print(f"[오류] 파일을 찾을 수 없습니다: {parquet_path}")
+        return None
+    except Exception as e:
+        print(f"[오류] Parquet 파일 읽기 실패: {e}")
+        return None
 
-        return df
+
+def iter_reviews_parquet(
+    parquet_path=REVIEW_DATASET_PATH,
+    columns=("label", "tokens"),
+    batch_size=10_000,
+    category=None,
+):
+    """
+    리뷰 데이터셋을 배치 단위로 스트리밍하며 리뷰 dict를 하나씩 반환 (전체 로드 없음)
+
+    Args:
+        parquet_path: 리뷰 데이터셋 경로
+        columns: 읽을 컬럼 (벡터 컬럼을 빼면 메모리 사용량이 작음)
+        batch_size: 한 번에 디코딩할 행 수
+        category: 특정 카테고리만 스캔 (None이면 전체)
+
+    Yields:
+        dict: {컬럼명: 값}
+    """
+    dataset = open_parquet_dataset(parquet_path)
+    expr = None
+    if category is not None:
+        expr = ds.field("category_file") == unicodedata.normalize("NFC", category)
+    for batch in dataset.to_batches(
+        columns=list(columns), filter=expr, batch_size=batch_size
+    ):
+        yield from batch.to_pylist()
+
+
+def load_reviews_by_category(category, parquet_path=REVIEW_DATASET_PATH, columns=None):
+    """
+    한 카테고리의 리뷰만 로드 (해당 파티션 파일만 읽음)
+
+    Args:
+        category: 카테고리 파일명 (예: "선스틱")
+        parquet_path: 리뷰 데이터셋 경로
+        columns: 읽을 컬럼 리스트 (None이면 전체)
+
+    Returns:
+        DataFrame: 카테고리 리뷰 데이터
+    """
+    try:
+        dataset = open_parquet_dataset(parquet_path)
+        category = unicodedata.normalize("NFC", str(category))
+        expr = ds.field("category_file") == category
+        return dataset.to_table(columns=columns, filter=expr).to_pandas()
     except FileNotFoundError:
         print(f"[오류] 파일을 찾을 수 없습니다: {parquet_path}")
         return None
@@ -141,22 +486,259 @@ def load_reviews_parquet(
         return None
 
 
-def load_reviews_by_products(
-    product_ids, parquet_path="./data/processed_data/integrated_reviews_detail.parquet"
+# =========================
+# product_id 인덱스 기반 리뷰 조회
+# =========================
+
+PRODUCT_FRAME_CACHE_SIZE = 256  # 디코딩된 상품 리뷰 DataFrame LRU 크기
+
+_review_index_cache = {}
+_product_frame_cache = OrderedDict()
+# 조회 서비스가 스레드풀에서 호출하므로 LRU 조작(get/move_to_end/popitem)은 잠금 안에서만
+_product_frame_cache_lock = threading.Lock()
+
+
+def load_review_index(dataset_path=REVIEW_DATASET_PATH):
+    """
+    리뷰 데이터셋의 product_id 사이드카 인덱스 로드 (인덱스 파일 mtime 기준 캐시)
+
+    Returns:
+        dict: {product_id: (파일 상대 경로, row group, row 시작, row 수)}
+              - 인덱스 파일이 없으면 None
+    """
+    index_path = os.path.join(dataset_path, REVIEW_INDEX_FILE)
+    if not os.path.isfile(index_path):
+        return None
+
+    key = (os.path.abspath(index_path), os.path.getmtime(index_path))
+    if key not in _review_index_cache:
+        _review_index_cache.clear()
+        table = pq.read_table(index_path)
+        columns = [
+            table.column(name).to_pylist()
+            for name in ("product_id", "file", "row_group", "row_start", "row_count")
+        ]
+        _review_index_cache[key] = {
+            pid: (file, row_group, row_start, row_count)
+            for pid, file, row_group, row_start, row_count in zip(*columns)
+        }
+    return _review_index_cache[key]
+
+
+@lru_cache(maxsize=64)
+def _open_parquet_file(path, mtime):
+    # mtime은 캐시 키 용도 (파티션 파일이 교체되면 footer를 다시 읽음)
+    return pq.ParquetFile(path)
+
+
+def clear_product_frame_cache():
+    """상품 리뷰 DataFrame LRU 비우기"""
+    with _product_frame_cache_lock:
+        _product_frame_cache.clear()
+
+
+def _read_product_frame(dataset_path, product_id, entry, columns):
+    """인덱스 항목의 row group 하나를 읽어 상품 행 범위만 DataFrame으로 변환"""
+    file, row_group, row_start, row_count = entry
+    path = os.path.join(dataset_path, file)
+    parquet_file = _open_parquet_file(path, os.path.getmtime(path))
+
+    # 파티션 컬럼은 파일에 없으므로 product_id에서 복원
+    read_columns = None
+    if columns is not None:
+        read_columns = [c for c in columns if c != "category_file"]
+    table = parquet_file.read_row_group(row_group, columns=read_columns)
+    table = table.slice(row_start, row_count)
+
+    if columns is None or "category_file" in columns:
+        category = category_from_product_id(product_id)
+        table = table.append_column(
+            "category_file", pa.array([category] * table.num_rows, type=pa.string())
+        )
+    if columns is not None:
+        table = table.select(columns)
+    return table.to_pandas()
+
+
+def load_indexed_reviews(product_ids, dataset_path=REVIEW_DATASET_PATH, columns=None):
+    """
+    사이드카 인덱스로 상품 리뷰 조회 (상품당 row group 1개 읽기 + LRU 캐시)
+
+    Args:
+        product_ids: 상품 ID 리스트
+        dataset_path: 리뷰 데이터셋 디렉토리
+        columns: 읽을 컬럼 리스트 (None이면 전체)
+
+    Returns:
+        DataFrame: product_ids 순서로 이어 붙인 리뷰 (인덱스에 없는 상품은 제외)
+                   - 인덱스 파일이 없으면 None (호출 측에서 스캔으로 대체)
+    """
+    index = load_review_index(dataset_path)
+    if index is None:
+        return None
+
+    index_path = os.path.join(dataset_path, REVIEW_INDEX_FILE)
+    index_key = (os.path.abspath(index_path), os.path.getmtime(index_path))
+    column_key = tuple(columns) if columns is not None else None
+
+    frames = []
+    for product_id in product_ids:
+        product_id = unicodedata.normalize("NFC", str(product_id))
+        entry = index.get(product_id)
+        if entry is None:
+            continue
+
+        cache_key = (index_key, product_id, column_key)
+        with _product_frame_cache_lock:
+            df = _product_frame_cache.get(cache_key)
+            if df is not None:
+                _product_frame_cache.move_to_end(cache_key)
+        if df is None:
+            # 파일 읽기는 잠금 밖에서 (동시에 같은 상품을 읽으면 나중 결과로 덮어씀)
+            df = _read_product_frame(dataset_path, product_id, entry, columns)
+            with _product_frame_cache_lock:
+                _product_frame_cache[cache_key] = df
+                if len(_product_frame_cache) > PRODUCT_FRAME_CACHE_SIZE:
+                    _product_frame_cache.popitem(last=False)
+        frames.append(df)
+
+    if not frames:
+        schema = open_parquet_dataset(dataset_path).schema
+        empty = schema.empty_table()
+        return (empty.select(columns) if columns else empty).to_pandas()
+    if len(frames) == 1:
+        # 캐시된 DataFrame을 호출 측 수정으로부터 보호 (데이터는 공유)
+        return frames[0].copy(deep=False)
+    return pd.concat(frames, ignore_index=True)
+
+
+def benchmark_product_lookup(
+    dataset_path=REVIEW_DATASET_PATH, n_samples=200, columns=None, seed=42
 ):
+    """
+    상품 단위 리뷰 조회 지연 시간 벤치마크 (p50/p99)
+
+    - indexed_cold: 상품 LRU를 비운 상태 (row group 1개 읽기)
+    - indexed_warm: 같은 상품 재조회 (LRU 적중)
+    - scan: 인덱스 없이 dataset 필터 스캔 (비교용)
+
+    Returns:
+        dict: {모드: {"p50_ms", "p99_ms"}} - 인덱스가 없으면 None
+    """
+    index = load_review_index(dataset_path)
+    if not index:
+        print(f"[오류] 상품 인덱스가 없습니다: {dataset_path}")
+        return None
+
+    rng = np.random.default_rng(seed)
+    product_ids = list(index)
+    sample = rng.choice(product_ids, size=min(n_samples, len(product_ids)), replace=False)
+    dataset = open_parquet_dataset(dataset_path)
+
+    def _timed(fn):
+        latencies = []
+        for product_id in sample:
+            t0 = time.perf_counter()
+            fn(product_id)
+            latencies.append((time.perf_counter() - t0) * 1000)
+        return {
+            "p50_ms": float(np.percentile(latencies, 50)),
+            "p99_ms": float(np.percentile(latencies, 99)),
+        }
+
+    clear_product_frame_cache()
+    results = {
+        "indexed_cold": _timed(
+            lambda pid: load_indexed_reviews([pid], dataset_path, columns)
+        ),
+        "indexed_warm": _timed(
+            lambda pid: load_indexed_reviews([pid], dataset_path, columns)
+        ),
+        "scan": _timed(
+            lambda pid: dataset.to_table(
+                columns=columns, filter=product_filter([pid], dataset)
+            ).to_pandas()
+        ),
+    }
+
+    print(f"상품 리뷰 조회 벤치마크 ({len(sample)}개 상품)")
+    for mode, stat in results.items():
+        print(f"  - {mode:<13} p50 {stat['p50_ms']:8.2f} ms | p99 {stat['p99_ms']:8.2f} ms")
+    return results
+
+
+def load_vector_matrix(parquet_path, vector_column, id_columns, product_ids=None):
+    """
+    Parquet 파일/데이터셋에서 벡터 컬럼을 (n, dim) 행렬로 로드
+
+    Args:
+        parquet_path: Parquet 파일 또는 파티션 디렉토리 경로
+        vector_column: 벡터 컬럼명 (예: "word2vec", "product_vector")
+        id_columns: 벡터와 함께 반환할 식별 컬럼 리스트
+        product_ids: 특정 상품 ID로 필터링 (None이면 전체)
+
+    Returns:
+        tuple: (식별 컬럼 DataFrame, (n, dim) float32 행렬) - 실패 시 (None, None)
+    """
+    try:
+        dataset = open_parquet_dataset(parquet_path)
+        expr = product_filter(product_ids, dataset) if product_ids else None
+        table = dataset.to_table(
+            columns=list(id_columns) + [vector_column], filter=expr
+        )
+        matrix = vector_column_to_numpy(table.column(vector_column))
+        return table.select(list(id_columns)).to_pandas(), matrix
+    except FileNotFoundError:
+        print(f"[오류] 파일을 찾을 수 없습니다: {parquet_path}")
+        return None, None
+    except Exception as e:
+        print(f"[오류] 벡터 로드 실패: {e}")
+        return None, None
+
+
+def load_review_vectors(
+    parquet_path=REVIEW_DATASET_PATH,
+    vector_column="word2vec",
+    product_ids=None,
+):
+    """
+    리뷰 벡터를 (n, dim) 행렬로 로드 (product_id, review_id 순서와 행 정렬)
+    """
+    return load_vector_matrix(
+        parquet_path, vector_column, ["product_id", "review_id"], product_ids
+    )
+
+
+def load_product_vectors(
+    parquet_path="./data/processed_data/integrated_products_vector.parquet",
+    vector_column="product_vector",
+):
+    """
+    상품 벡터를 (n, dim) 행렬로 로드 (product_id 순서와 행 정렬)
+    """
+    return load_vector_matrix(parquet_path, vector_column, ["product_id"])
+
+
+def load_reviews_by_products(product_ids, parquet_path=REVIEW_DATASET_PATH, columns=None):
     """
     여러 상품의 리뷰를 한 번에 로드
 
     Args:
         product_ids: 상품 ID 리스트
-        parquet_path: Parquet 파일 경로
+        parquet_path: 리뷰 데이터셋 경로
+        columns: 읽을 컬럼 리스트 (None이면 전체)
 
     Returns:
-        DataFrame: 필터링된 리뷰 데이터
+        DataFrame: 필터링된 리뷰 데이터 (상품 인덱스가 있으면 product_ids 순서)
     """
     try:
-        df = pd.read_parquet(parquet_path, filters=[("product_id", "in", product_ids)])
-        return df
+        df = load_indexed_reviews(product_ids, parquet_path, columns)
+        if df is not None:
+            return df
+
+        dataset = open_parquet_dataset(parquet_path)
+        expr = product_filter(product_ids, dataset)
+        return dataset.to_table(columns=columns, filter=expr).to_pandas()
     except FileNotFoundError:
         print(f"[오류] 파일을 찾을 수 없습니다: {parquet_path}")
         return None
@@ -173,15 +755,20 @@ if __name__ == "__main__":
         print(products_df.head())
         print("\n")
 
-    reviews_df = load_reviews_parquet(product_id="선스틱_1")
+    reviews_df = load_reviews_parquet(product_id="선스틱_with_1")
     if reviews_df is not None:
         print("리뷰 데이터 샘플:")
         print(reviews_df.head())
 
-    reviews_dfs = load_reviews_by_products(product_ids=["선스틱_1", "선쿠션_선팩트_1"])
+    reviews_dfs = load_reviews_by_products(
+        product_ids=["선스틱_with_1", "선쿠션_선팩트_with_1"]
+    )
     if reviews_dfs is not None:
         print("여러 상품 리뷰 데이터 샘플:")
         print(reviews_dfs.head())
         # 처음꺼랑 마지막꺼
         # print(reviews_dfs.iloc[0])
         # print(reviews_dfs.iloc[-1])
+
+    # 상품 단위 조회 지연 시간 (사이드카 인덱스 + LRU)
+    benchmark_product_lookup()
@@ -0,0 +1,262 @@
+"""
+상품 집계 테이블 (대시보드/EDA용 product facts)
+
+- EDA 스크립트가 매번 전체 리뷰를 읽어 상품 정보와 merge 후 groupby 하던 집계를
+  파이프라인 마지막에 한 번만 계산해 작은 Parquet 테이블로 저장
+- 카테고리 파티션 단위로 증분 갱신: 이번 실행에서 다시 쓴 리뷰 파티션과
+  집계가 없거나 리뷰 파티션보다 오래된 카테고리만 다시 계산
+- 평균은 합계와 개수를 함께 저장 → 상품명/카테고리/월 단위로 다시 묶어도 정확한 평균 계산 가능
+
+저장 구조:
+    data/processed_data/product_facts/products/category_file=<카테고리>/part-0.parquet
+        product_id, product_name, brand, price, review_count, text_review_count,
+        score_sum, mean_score, score_1 ~ score_5, helpful_sum, mean_helpful,
+        image_count, char_length_sum, mean_char_length, first_date, last_date
+    data/processed_data/product_facts/monthly/category_file=<카테고리>/part-0.parquet
+        product_id, month(YYYY-MM), review_count, score_sum, helpful_sum
+"""
+
+import os
+import shutil
+import unicodedata
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from parquet_store import (
+    REVIEW_PARTITION_COLUMN,
+    REVIEW_PART_FILE,
+    list_review_partitions,
+    review_partition_dir,
+)
+
+REVIEW_DATASET_PATH = "./data/processed_data/integrated_reviews_detail"
+PRODUCT_PARQUET_PATH = "./data/processed_data/integrated_products_vector.parquet"
+PRODUCT_FACTS_DIR = "./data/processed_data/product_facts"
+
+FACT_TABLES = ("products", "monthly")
+FACT_SCORES = (1, 2, 3, 4, 5)
+
+# 집계에 필요한 리뷰 컬럼 (토큰/벡터는 읽지 않음)
+FACT_REVIEW_COLUMNS = [
+    "product_id",
+    "score",
+    "helpful_count",
+    "has_image",
+    "char_length",
+    "date",
+]
+
+# 집계 테이블에 붙일 상품 정보 컬럼 (대시보드에서 리뷰 merge 없이 사용)
+FACT_PRODUCT_COLUMNS = ["product_id", "product_name", "brand", "price"]
+
+
+def fact_table_dir(table, facts_dir=PRODUCT_FACTS_DIR):
+    return os.path.join(facts_dir, table)
+
+
+def _load_product_info(product_parquet_path=PRODUCT_PARQUET_PATH):
+    """상품 정보 (product_id, 상품명, 브랜드, 가격) - 상품 Parquet이 없으면 None"""
+    if not os.path.exists(product_parquet_path):
+        return None
+    names = pq.read_schema(product_parquet_path).names
+    columns = [c for c in FACT_PRODUCT_COLUMNS if c in names]
+    df = pq.read_table(product_parquet_path, columns=columns).to_pandas()
+    df["product_id"] = df["product_id"].astype(str).map(
+        lambda pid: unicodedata.normalize("NFC", pid)
+    )
+    if "price" in df:
+        df["price"] = pd.to_numeric(df["price"], errors="coerce")
+    return df.drop_duplicates("product_id")
+
+
+def compute_product_facts(reviews, product_info=None):
+    """
+    한 카테고리 리뷰 DataFrame → (상품 집계, 상품×월 집계)
+
+    Args:
+        reviews: FACT_REVIEW_COLUMNS를 가진 리뷰 DataFrame
+        product_info: _load_product_info() 결과 (None이면 상품 정보 컬럼 없이 저장)
+
+    Returns:
+        tuple: (products DataFrame, monthly DataFrame)
+    """
+    df = reviews.copy()
+    df["score"] = pd.to_numeric(df["score"], errors="coerce")
+    df["helpful_count"] = df["helpful_count"].fillna(0).astype("int64")
+    df["has_image"] = df["has_image"].fillna(False).astype("int64")
+    df["char_length"] = df["char_length"].fillna(0).astype("int64")
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df["is_text"] = (df["char_length"] > 0).astype("int64")
+
+    grouped = df.groupby("product_id", sort=True)
+    products = grouped.agg(
+        review_count=("product_id", "size"),
+        text_review_count=("is_text", "sum"),
+        score_sum=("score", "sum"),
+        score_count=("score", "count"),
+        helpful_sum=("helpful_count", "sum"),
+        image_count=("has_image", "sum"),
+        char_length_sum=("char_length", "sum"),
+        first_date=("date", "min"),
+        last_date=("date", "max"),
+    )
+    products["mean_score"] = products["score_sum"] / products["score_count"]
+    products["mean_helpful"] = products["helpful_sum"] / products["review_count"]
+    products["mean_char_length"] = products["char_length_sum"] / products["review_count"]
+
+    # 상품 × 평점 pivot (score_1 ~ score_5)
+    score_pivot = (
+        df[df["score"].isin(FACT_SCORES)]
+        .groupby(["product_id", "score"])
+        .size()
+        .unstack(fill_value=0)
+        .reindex(columns=list(FACT_SCORES), fill_value=0)
+    )
+    score_pivot.columns = [f"score_{int(s)}" for s in score_pivot.columns]
+    products = products.join(score_pivot).fillna(
+        {f"score_{s}": 0 for s in FACT_SCORES}
+    )
+    for s in FACT_SCORES:
+        products[f"score_{s}"] = products[f"score_{s}"].astype("int64")
+    for column in ("first_date", "last_date"):
+        products[column] = products[column].dt.strftime("%Y-%m-%d")
+    products = products.drop(columns=["score_count"]).reset_index()
+
+    if product_info is not None:
+        products = products.merge(product_info, on="product_id", how="left")
+        ordered = [c for c in FACT_PRODUCT_COLUMNS if c in products.columns]
+        products = products[ordered + [c for c in products.columns if c not in ordered]]
+
+    # 상품 × 월 (날짜가 있는 리뷰만)
+    dated = df.dropna(subset=["date"])
+    monthly = (
+        dated.assign(month=dated["date"].dt.strftime("%Y-%m"))
+        .groupby(["product_id", "month"], sort=True)
+        .agg(
+            review_count=("product_id", "size"),
+            score_sum=("score", "sum"),
+            helpful_sum=("helpful_count", "sum"),
+        )
+        .reset_index()
+    )
+    return products, monthly
+
+
+def _write_fact_partition(df, table, category, facts_dir):
+    partition_dir = review_partition_dir(fact_table_dir(table, facts_dir), category)
+    if os.path.exists(partition_dir):
+        shutil.rmtree(partition_dir)
+    os.makedirs(partition_dir, exist_ok=True)
+    pq.write_table(
+        pa.Table.from_pandas(df, preserve_index=False),
+        os.path.join(partition_dir, REVIEW_PART_FILE),
+        compression="snappy",
+    )
+
+
+def _is_stale(category, review_dir, facts_dir):
+    """집계 파티션이 없거나 리뷰 파티션보다 오래되었는지"""
+    review_file = os.path.join(review_dir, REVIEW_PART_FILE)
+    for table in FACT_TABLES:
+        fact_file = os.path.join(
+            review_partition_dir(fact_table_dir(table, facts_dir), category),
+            REVIEW_PART_FILE,
+        )
+        if not os.path.exists(fact_file):
+            return True
+        if os.path.getmtime(fact_file) < os.path.getmtime(review_file):
+            return True
+    return False
+
+
+def update_product_facts(
+    changed_categories=(),
+    dataset_path=REVIEW_DATASET_PATH,
+    facts_dir=PRODUCT_FACTS_DIR,
+    product_parquet_path=PRODUCT_PARQUET_PATH,
+):
+    """
+    상품 집계 테이블 증분 갱신 (main.py 마지막 단계)
+
+    Args:
+        changed_categories: 이번 실행에서 다시 쓴 리뷰 파티션의 카테고리
+        dataset_path: 리뷰 데이터셋 디렉토리
+        facts_dir: 집계 테이블 디렉토리
+        product_parquet_path: 상품 정보 Parquet (상품명/브랜드/가격)
+
+    Returns:
+        dict: {"updated": [카테고리], "removed": [카테고리], "products": 갱신한 상품 수}
+    """
+    review_partitions = {
+        category: review_dir
+        for category, review_dir in list_review_partitions(dataset_path).items()
+        if os.path.exists(os.path.join(review_dir, REVIEW_PART_FILE))
+    }
+    changed = {unicodedata.normalize("NFC", str(c)) for c in changed_categories}
+    targets = sorted(
+        category
+        for category, review_dir in review_partitions.items()
+        if category in changed or _is_stale(category, review_dir, facts_dir)
+    )
+
+    summary = {"updated": [], "removed": [], "products": 0}
+
+    # 리뷰 파티션이 사라진 카테고리의 집계 제거
+    for table in FACT_TABLES:
+        for category, fact_dir in list_review_partitions(fact_table_dir(table, facts_dir)).items():
+            if category not in review_partitions:
+                shutil.rmtree(fact_dir)
+                if category not in summary["removed"]:
+                    summary["removed"].append(category)
+
+    if not targets:
+        return summary
+
+    product_info = _load_product_info(product_parquet_path)
+    for category in targets:
+        review_file = os.path.join(review_partitions[category], REVIEW_PART_FILE)
+        names = pq.read_schema(review_file).names
+        columns = [c for c in FACT_REVIEW_COLUMNS if c in names]
+        try:
+            reviews = pq.read_table(review_file, columns=columns).to_pandas()
+        except Exception as e:
+            print(f"[경고] 상품 집계 실패 ({category}): {e}")
+            continue
+        for column in FACT_REVIEW_COLUMNS:
+            if column not in reviews:
+                reviews[column] = None
+
+        products, monthly = compute_product_facts(reviews, product_info)
+        _write_fact_partition(products, "products", category, facts_dir)
+        _write_fact_partition(monthly, "monthly", category, facts_dir)
+        summary["updated"].append(category)
+        summary["products"] += len(products)
+
+    return summary
+
+
+def load_product_facts(table="products", facts_dir=PRODUCT_FACTS_DIR, categories=None):
+    """
+    상품 집계 테이블 로드 (category_file 컬럼 포함)
+
+    Args:
+        table: "products" 또는 "monthly"
+        facts_dir: 집계 테이블 디렉토리
+        categories: 특정 카테고리만 (None이면 전체)
+
+    Returns:
+        DataFrame: 집계 테이블 (없으면 None)
+    """
+    path = fact_table_dir(table, facts_dir)
+    if not list_review_partitions(path):
+        print(f"[오류] 상품 집계 테이블이 없습니다: {path}")
+        return None
+    filters = None
+    if categories is not None:
+        if isinstance(categories, str):
+            categories = [categories]
+        categories = [unicodedata.normalize("NFC", str(c)) for c in categories]
+        filters = [(REVIEW_PARTITION_COLUMN, "in", categories)]
+    df = pq.read_table(path, partitioning="hive", filters=filters).to_pandas()
+    df[REVIEW_PARTITION_COLUMN] = df[REVIEW_PARTITION_COLUMN].astype(str)
+    return df
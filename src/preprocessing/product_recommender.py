@@ -0,0 +1,337 @@
+"""
+콘텐츠 기반 상품 추천 (상품 벡터 코사인 유사도)
+
+- integrated_products_vector.parquet의 상품 벡터를 한 번만 로드해 L2 정규화 float32 행렬로 보관
+- 유사도 = 정규화 행렬 내적 (질의 블록 단위 행렬 곱 + argpartition 상위 k)
+- 카테고리 / 브랜드 / 가격 범위 / 피부 타입 필터 지원
+- 전체 상품의 상위 k 이웃을 미리 계산해 이웃 테이블(product_neighbors.parquet)로 저장
+
+저장 구조:
+    data/processed_data/product_neighbors.parquet
+        (product_id, rank, neighbor_id, similarity) + 스키마 메타데이터(vector_column, top_k)
+"""
+
+import os
+import unicodedata
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from parquet_store import PRODUCT_VECTOR_COLUMNS, vector_column_to_numpy
+
+PRODUCT_PARQUET_PATH = "./data/processed_data/integrated_products_vector.parquet"
+PRODUCT_NEIGHBORS_PATH = "./data/processed_data/product_neighbors.parquet"
+
+# 추천 결과에 함께 반환할 상품 정보 컬럼 (필터에도 사용)
+PRODUCT_META_COLUMNS = [
+    "product_id",
+    "product_name",
+    "brand",
+    "price",
+    "category_file",
+    "skin_type",
+]
+
+# 한 번에 행렬 곱을 수행할 질의 상품 수 (블록 × 전체 상품 수 float32 점수 행렬)
+RECOMMEND_BLOCK_SIZE = 1024
+NEIGHBORS_TOP_K = 20
+
+_index_cache = {}
+
+
+def _resolve_vector_column(column_names, vector_column=None):
+    """사용할 상품 벡터 컬럼 (지정하지 않으면 product_vector → word2vec → bert 순)"""
+    if vector_column:
+        return vector_column if vector_column in column_names else None
+    for name in PRODUCT_VECTOR_COLUMNS:
+        if name in column_names:
+            return name
+    return None
+
+
+def load_product_index(parquet_path=PRODUCT_PARQUET_PATH, vector_column=None):
+    """
+    상품 벡터 인덱스 로드 (파일 mtime 기준 캐시 → 프로세스당 한 번만 읽음)
+
+    Returns:
+        dict: {
+            "meta": 상품 정보 DataFrame (행 순서 = 행렬 행 순서),
+            "matrix": (n, dim) L2 정규화 float32 행렬 (벡터 없는 행은 0),
+            "valid": 벡터가 있는 행 마스크,
+            "row_of": {product_id: 행 번호},
+            "vector_column": 사용한 벡터 컬럼,
+        } - 파일/벡터 컬럼이 없으면 None
+    """
+    if not os.path.exists(parquet_path):
+        print(f"[오류] 파일을 찾을 수 없습니다: {parquet_path}")
+        return None
+
+    key = (os.path.abspath(parquet_path), os.path.getmtime(parquet_path), vector_column)
+    if key in _index_cache:
+        return _index_cache[key]
+
+    schema = pq.read_schema(parquet_path)
+    column = _resolve_vector_column(schema.names, vector_column)
+    if column is None or not pa.types.is_fixed_size_list(schema.field(column).type):
+        print(f"[오류] 상품 벡터 컬럼이 없습니다: {vector_column or PRODUCT_VECTOR_COLUMNS}")
+        return None
+
+    meta_columns = [c for c in PRODUCT_META_COLUMNS if c in schema.names]
+    table = pq.read_table(parquet_path, columns=meta_columns + [column])
+
+    matrix = np.array(vector_column_to_numpy(table.column(column)), dtype=np.float32)
+    valid = np.isfinite(matrix).all(axis=1)
+    matrix[~valid] = 0.0
+    norms = np.linalg.norm(matrix, axis=1)
+    valid &= norms > 0
+    matrix[valid] /= norms[valid, None]
+
+    meta = table.select(meta_columns).to_pandas()
+    meta["product_id"] = meta["product_id"].map(
+        lambda pid: unicodedata.normalize("NFC", str(pid))
+    )
+
+    index = {
+        "meta": meta,
+        "matrix": matrix,
+        "valid": valid,
+        "row_of": {pid: row for row, pid in enumerate(meta["product_id"])},
+        "vector_column": column,
+    }
+    _index_cache.clear()
+    _index_cache[key] = index
+    return index
+
+
+def _as_set(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return {value}
+    return set(value)
+
+
+def candidate_mask(
+    index,
+    category=None,
+    brand=None,
+    min_price=None,
+    max_price=None,
+    skin_type=None,
+):
+    """
+    필터 조건을 만족하는 후보 상품 마스크
+
+    Args:
+        category: category_file 값 (문자열 또는 리스트)
+        brand: 표준화된 브랜드명 (문자열 또는 리스트)
+        min_price / max_price: 가격 범위 (포함)
+        skin_type: 피부 타입 (문자열 또는 리스트) - "복합/혼합(건성,지성)"처럼
+                   혼합 타입은 포함된 타입 중 하나라도 일치하면 통과
+    """
+    meta = index["meta"]
+    mask = index["valid"].copy()
+
+    categories = _as_set(category)
+    if categories is not None and "category_file" in meta:
+        categories = {unicodedata.normalize("NFC", c) for c in categories}
+        mask &= meta["category_file"].isin(categories).to_numpy()
+
+    brands = _as_set(brand)
+    if brands is not None and "brand" in meta:
+        mask &= meta["brand"].isin(brands).to_numpy()
+
+    if "price" in meta and (min_price is not None or max_price is not None):
+        price = pd.to_numeric(meta["price"], errors="coerce").to_numpy()
+        if min_price is not None:
+            mask &= price >= min_price
+        if max_price is not None:
+            mask &= price <= max_price
+
+    skin_types = _as_set(skin_type)
+    if skin_types is not None and "skin_type" in meta:
+        values = meta["skin_type"].fillna("").astype(str)
+        skin_mask = np.zeros(len(meta), dtype=bool)
+        for skin in skin_types:
+            skin_mask |= values.str.contains(skin, regex=False).to_numpy()
+        mask &= skin_mask
+
+    return mask
+
+
+def _blocked_top_k(queries, matrix, k, exclude_rows=None, block_size=RECOMMEND_BLOCK_SIZE):
+    """
+    질의 블록 단위 행렬 곱으로 상위 k (점수 내림차순)
+
+    Args:
+        queries: (q, dim) 정규화 질의 행렬
+        matrix: (m, dim) 정규화 후보 행렬
+        exclude_rows: 질의별로 제외할 후보 행 번호 (자기 자신, 없으면 -1)
+
+    Returns:
+        tuple: ((q, k) 후보 행 번호, (q, k) 유사도) - 후보가 k개보다 적으면 k 축소
+    """
+    n_queries, n_candidates = len(queries), len(matrix)
+    k = min(k, n_candidates - (1 if exclude_rows is not None else 0))
+    if k <= 0 or n_queries == 0:
+        return np.empty((n_queries, 0), dtype=np.int64), np.empty(
+            (n_queries, 0), dtype=np.float32
+        )
+
+    top_rows = np.empty((n_queries, k), dtype=np.int64)
+    top_scores = np.empty((n_queries, k), dtype=np.float32)
+    for start in range(0, n_queries, block_size):
+        end = min(start + block_size, n_queries)
+        scores = queries[start:end] @ matrix.T
+        if exclude_rows is not None:
+            block_exclude = exclude_rows[start:end]
+            hit = block_exclude >= 0
+            scores[np.flatnonzero(hit), block_exclude[hit]] = -np.inf
+
+        part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        part_scores = np.take_along_axis(scores, part, axis=1)
+        order = np.argsort(-part_scores, axis=1, kind="stable")
+        top_rows[start:end] = np.take_along_axis(part, order, axis=1)
+        top_scores[start:end] = np.take_along_axis(part_scores, order, axis=1)
+
+    return top_rows, top_scores
+
+
+def _to_records(index, rows, scores):
+    meta = index["meta"]
+    records = meta.iloc[rows].to_dict("records")
+    for record, score in zip(records, scores):
+        record["similarity"] = float(score)
+    return records
+
+
+def recommend_by_vector(vector, top_k=10, index=None, exclude_product_id=None, **filters):
+    """
+    임의 벡터(예: 질의 문장 임베딩)와 유사한 상품 추천
+
+    Args:
+        vector: 상품 벡터와 같은 차원의 벡터
+        top_k: 추천 개수
+        index: load_product_index() 결과 (None이면 기본 경로 로드)
+        exclude_product_id: 결과에서 제외할 상품 ID
+        **filters: candidate_mask() 필터 (category, brand, min_price, max_price, skin_type)
+
+    Returns:
+        list: [{product_id, product_name, brand, price, category_file, skin_type, similarity}, ...]
+    """
+    index = index or load_product_index()
+    if index is None:
+        return []
+
+    query = np.asarray(vector, dtype=np.float32).reshape(1, -1)
+    norm = np.linalg.norm(query)
+    if not np.isfinite(norm) or norm == 0:
+        return []
+    query = query / norm
+
+    mask = candidate_mask(index, **filters)
+    if exclude_product_id is not None:
+        row = index["row_of"].get(unicodedata.normalize("NFC", str(exclude_product_id)))
+        if row is not None:
+            mask[row] = False
+    candidates = np.flatnonzero(mask)
+
+    rows, scores = _blocked_top_k(query, index["matrix"][candidates], top_k)
+    return _to_records(index, candidates[rows[0]], scores[0])
+
+
+def recommend_similar_products(product_id, top_k=10, index=None, **filters):
+    """
+    상품과 유사한 상품 추천 (자기 자신 제외)
+
+    Returns:
+        list: recommend_by_vector()와 같은 형식 - 상품/벡터가 없으면 빈 리스트
+    """
+    index = index or load_product_index()
+    if index is None:
+        return []
+
+    row = index["row_of"].get(unicodedata.normalize("NFC", str(product_id)))
+    if row is None or not index["valid"][row]:
+        print(f"[경고] 상품 벡터가 없습니다: {product_id}")
+        return []
+
+    return recommend_by_vector(
+        index["matrix"][row],
+        top_k=top_k,
+        index=index,
+        exclude_product_id=product_id,
+        **filters,
+    )
+
+
+def build_neighbors_table(
+    parquet_path=PRODUCT_PARQUET_PATH,
+    output_path=PRODUCT_NEIGHBORS_PATH,
+    top_k=NEIGHBORS_TOP_K,
+    vector_column=None,
+    block_size=RECOMMEND_BLOCK_SIZE,
+):
+    """
+    전체 상품의 상위 k 유사 상품을 일괄 계산해 이웃 테이블로 저장
+
+    Returns:
+        pa.Table: (product_id, rank, neighbor_id, similarity) - 벡터가 없으면 None
+    """
+    index = load_product_index(parquet_path, vector_column)
+    if index is None:
+        return None
+
+    valid_rows = np.flatnonzero(index["valid"])
+    if len(valid_rows) < 2:
+        print("[경고] 유사 상품을 계산할 상품 벡터가 부족합니다.")
+        return None
+
+    matrix = index["matrix"][valid_rows]
+    # 질의와 후보가 같은 행렬이므로 질의 i의 자기 자신은 후보 i
+    rows, scores = _blocked_top_k(
+        matrix, matrix, top_k, exclude_rows=np.arange(len(valid_rows)), block_size=block_size
+    )
+
+    product_ids = index["meta"]["product_id"].to_numpy()[valid_rows]
+    n_queries, k = rows.shape
+    table = pa.table(
+        {
+            "product_id": pa.array(np.repeat(product_ids, k), type=pa.string()),
+            "rank": pa.array(np.tile(np.arange(1, k + 1), n_queries), type=pa.int32()),
+            "neighbor_id": pa.array(product_ids[rows.reshape(-1)], type=pa.string()),
+            "similarity": pa.array(scores.reshape(-1), type=pa.float32()),
+        }
+    )
+    table = table.replace_schema_metadata(
+        {
+            b"vector_column": index["vector_column"].encode("utf-8"),
+            b"top_k": str(k).encode("utf-8"),
+        }
+    )
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    pq.write_table(table, output_path, compression="snappy")
+    return table
+
+
+def load_neighbors(product_id, neighbors_path=PRODUCT_NEIGHBORS_PATH, top_k=None):
+    """
+    미리 계산한 이웃 테이블에서 유사 상품 조회 (행렬 곱 없이 파일 조회)
+
+    Returns:
+        list: [(이웃 상품 ID, 유사도), ...] - 테이블이 없으면 None
+    """
+    if not os.path.exists(neighbors_path):
+        return None
+    product_id = unicodedata.normalize("NFC", str(product_id))
+    table = pq.read_table(
+        neighbors_path,
+        columns=["rank", "neighbor_id", "similarity"],
+        filters=[("product_id", "=", product_id)],
+    ).sort_by("rank")
+    if top_k is not None:
+        table = table.slice(0, top_k)
+    return list(
+        zip(table.column("neighbor_id").to_pylist(), table.column("similarity").to_pylist())
+    )
@@ -0,0 +1,187 @@
+"""
+조회 서비스 부하 테스트 (목표 QPS에서 p50 / p99 지연 시간 측정)
+
+- open-loop: 요청을 1/QPS 간격으로 예약하고, 지연 시간은 예약 시각부터 측정
+  → 서비스가 밀리면 대기 시간까지 지연에 포함됨 (coordinated omission 방지)
+- 상품 ID는 /products 에서 샘플링, 검색어는 SEARCH_QUERIES 순환
+
+실행 (query_service.py 실행 후):
+    python src/preprocessing/query_load_test.py --qps 200 --duration 30
+"""
+
+import json
+import time
+import random
+import argparse
+import threading
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+DEFAULT_BASE_URL = "http://127.0.0.1:8000"
+DEFAULT_QPS = 100
+DEFAULT_DURATION = 20
+DEFAULT_WORKERS = 64
+REQUEST_TIMEOUT = 10.0
+SAMPLE_PRODUCTS = 500
+
+SEARCH_QUERIES = [
+    "촉촉하고 순해요",
+    "향이 너무 강해요",
+    "건성 피부에 잘 맞아요",
+    "트러블이 올라왔어요",
+    "흡수가 빠르고 끈적임 없어요",
+]
+
+# 엔드포인트별 요청 비율
+ENDPOINT_WEIGHTS = {
+    "product": 0.35,
+    "reviews": 0.30,
+    "similar": 0.25,
+    "search": 0.10,
+}
+
+
+def _get_json(url):
+    with urllib.request.urlopen(url, timeout=REQUEST_TIMEOUT) as response:
+        return json.loads(response.read().decode("utf-8"))
+
+
+def sample_product_ids(base_url, limit=SAMPLE_PRODUCTS):
+    """부하 테스트에 사용할 상품 ID 샘플"""
+    product_ids = []
+    offset = 0
+    while len(product_ids) < limit:
+        page = _get_json(f"{base_url}/products?offset={offset}&limit=200")
+        items = page.get("items", [])
+        if not items:
+            break
+        product_ids.extend(item["product_id"] for item in items)
+        offset += len(items)
+    return product_ids[:limit]
+
+
+def build_request_urls(base_url, product_ids, n_requests, seed=42):
+    """엔드포인트 비율에 맞춰 요청 URL 목록 생성 → [(엔드포인트, URL), ...]"""
+    rng = random.Random(seed)
+    endpoints = list(ENDPOINT_WEIGHTS)
+    weights = list(ENDPOINT_WEIGHTS.values())
+    requests = []
+    for i in range(n_requests):
+        endpoint = rng.choices(endpoints, weights)[0]
+        product_id = urllib.parse.quote(rng.choice(product_ids), safe="")
+        if endpoint == "product":
+            url = f"{base_url}/products/{product_id}"
+        elif endpoint == "reviews":
+            url = f"{base_url}/products/{product_id}/reviews?offset={rng.choice([0, 20, 40])}&limit=20"
+        elif endpoint == "similar":
+            url = f"{base_url}/products/{product_id}/similar?top_k=10"
+        else:
+            query = urllib.parse.quote(SEARCH_QUERIES[i % len(SEARCH_QUERIES)])
+            url = f"{base_url}/search/reviews?q={query}&top_k=10"
+        requests.append((endpoint, url))
+    return requests
+
+
+def run_load_test(base_url=DEFAULT_BASE_URL, qps=DEFAULT_QPS, duration=DEFAULT_DURATION, workers=DEFAULT_WORKERS):
+    """
+    목표 QPS로 duration초 동안 요청 후 지연 시간 통계 반환
+
+    Returns:
+        dict: {"overall": {...}, "by_endpoint": {엔드포인트: {...}}, "achieved_qps", "errors"}
+              - 각 통계: {"count", "p50_ms", "p99_ms", "mean_ms", "max_ms"}
+    """
+    product_ids = sample_product_ids(base_url)
+    if not product_ids:
+        print(f"[오류] 상품 목록을 가져오지 못했습니다: {base_url}/products")
+        return None
+
+    n_requests = int(qps * duration)
+    requests = build_request_urls(base_url, product_ids, n_requests)
+    interval = 1.0 / qps
+
+    latencies = {endpoint: [] for endpoint in ENDPOINT_WEIGHTS}
+    errors = {endpoint: 0 for endpoint in ENDPOINT_WEIGHTS}
+    lock = threading.Lock()
+
+    def fire(endpoint, url, scheduled):
+        try:
+            with urllib.request.urlopen(url, timeout=REQUEST_TIMEOUT) as response:
+                response.read()
+            ok = True
+        except Exception:
+            ok = False
+        elapsed_ms = (time.perf_counter() - scheduled) * 1000
+        with lock:
+            if ok:
+                latencies[endpoint].append(elapsed_ms)
+            else:
+                errors[endpoint] += 1
+
+    print(f"부하 테스트: {base_url} / 목표 {qps} QPS × {duration}초 = {n_requests:,}건")
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for i, (endpoint, url) in enumerate(requests):
+            scheduled = start + i * interval
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(fire, endpoint, url, scheduled)
+    total_seconds = time.perf_counter() - start
+
+    def summarize(values):
+        if not values:
+            return {"count": 0}
+        arr = np.asarray(values)
+        return {
+            "count": len(arr),
+            "p50_ms": round(float(np.percentile(arr, 50)), 2),
+            "p99_ms": round(float(np.percentile(arr, 99)), 2),
+            "mean_ms": round(float(arr.mean()), 2),
+            "max_ms": round(float(arr.max()), 2),
+        }
+
+    all_latencies = [v for values in latencies.values() for v in values]
+    return {
+        "overall": summarize(all_latencies),
+        "by_endpoint": {endpoint: summarize(values) for endpoint, values in latencies.items()},
+        "achieved_qps": round(len(all_latencies) / total_seconds, 1),
+        "errors": errors,
+    }
+
+
+def print_report(result):
+    """부하 테스트 결과 출력"""
+    overall = result["overall"]
+    print("\n" + "=" * 60)
+    print(f"달성 QPS: {result['achieved_qps']}  /  오류: {sum(result['errors'].values()):,}건")
+    print(
+        f"전체: {overall.get('count', 0):,}건  p50 {overall.get('p50_ms', '-')}ms  "
+        f"p99 {overall.get('p99_ms', '-')}ms"
+    )
+    print("-" * 60)
+    for endpoint, stats in result["by_endpoint"].items():
+        if not stats.get("count"):
+            print(f"  {endpoint:<8} 성공 0건 (오류 {result['errors'][endpoint]:,}건)")
+            continue
+        print(
+            f"  {endpoint:<8} {stats['count']:>7,}건  p50 {stats['p50_ms']:>8}ms  "
+            f"p99 {stats['p99_ms']:>8}ms  max {stats['max_ms']:>8}ms  "
+            f"(오류 {result['errors'][endpoint]:,}건)"
+        )
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="조회 서비스 부하 테스트")
+    parser.add_argument("--url", default=DEFAULT_BASE_URL)
+    parser.add_argument("--qps", type=float, default=DEFAULT_QPS)
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    args = parser.parse_args()
+
+    result = run_load_test(args.url, args.qps, args.duration, args.workers)
+    if result:
+        print_report(result)
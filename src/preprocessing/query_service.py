@@ -0,0 +1,315 @@
+"""
+로컬 HTTP 조회 서비스 (상품 / 리뷰 / 유사 상품 / 리뷰 시맨틱 검색)
+
+- 시작 시 한 번만 로드: 상품 정보 + 정규화 상품 벡터 행렬, 유사 상품 이웃 테이블,
+  리뷰 사이드카 인덱스, 리뷰 ANN 인덱스(mmap), 전역 키워드 통계
+- 상품 리뷰는 사이드카 인덱스로 상품당 row group 1개만 읽음 (디코딩 결과 LRU)
+- 응답은 (경로, 쿼리 파라미터) 단위 LRU 캐시
+
+실행 (프로젝트 루트에서):
+    python src/preprocessing/query_service.py
+    → http://127.0.0.1:8000/docs
+
+엔드포인트:
+    GET /health
+    GET /products?category=&offset=&limit=
+    GET /products/{product_id}
+    GET /products/{product_id}/reviews?offset=&limit=
+    GET /products/{product_id}/similar?top_k=&category=&brand=&min_price=&max_price=&skin_type=
+    GET /search/reviews?q=&top_k=&vector=
+    GET /keywords
+"""
+
+import os
+import json
+import time
+import threading
+import unicodedata
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Optional
+import pyarrow.parquet as pq
+from fastapi import FastAPI, HTTPException, Query, Request
+from parquet_store import PRODUCT_VECTOR_COLUMNS
+from preprocessing_utils import (
+    REVIEW_DATASET_PATH,
+    load_review_index,
+    load_indexed_reviews,
+)
+from product_recommender import (
+    PRODUCT_PARQUET_PATH,
+    PRODUCT_NEIGHBORS_PATH,
+    PRODUCT_META_COLUMNS,
+    load_product_index,
+    recommend_similar_products,
+)
+from review_ann_index import REVIEW_ANN_DIR, load_review_ann_index, search_reviews
+
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8000
+
+RESPONSE_CACHE_SIZE = 2048
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 200
+
+# 리뷰 목록 응답 컬럼 (토큰/벡터 제외)
+REVIEW_RESPONSE_COLUMNS = [
+    "review_id",
+    "full_text",
+    "score",
+    "label",
+    "date",
+    "nickname",
+    "has_image",
+    "helpful_count",
+    "char_length",
+]
+
+PRODUCT_METADATA_PATH = PRODUCT_PARQUET_PATH.replace(".parquet", "_metadata.json")
+
+# 시작 시 로드하는 상태 (load_service_state)
+_state = {}
+_response_cache = OrderedDict()
+# 동기 핸들러는 스레드풀에서 동시에 실행되므로 LRU 조작은 잠금 안에서만
+_response_cache_lock = threading.Lock()
+
+
+def _nfc(value):
+    return unicodedata.normalize("NFC", str(value))
+
+
+def load_service_state():
+    """서비스 상태 로드 (시작 시 1회)"""
+    start = time.time()
+    state = {"products": {}, "product_order": [], "neighbors": {}, "keywords": {}}
+
+    # 상품 정보 (벡터 컬럼 제외) + 정규화 벡터 행렬
+    if os.path.exists(PRODUCT_PARQUET_PATH):
+        schema = pq.read_schema(PRODUCT_PARQUET_PATH)
+        columns = [c for c in schema.names if c not in PRODUCT_VECTOR_COLUMNS]
+        rows = pq.read_table(PRODUCT_PARQUET_PATH, columns=columns).to_pylist()
+        for row in rows:
+            row["product_id"] = _nfc(row["product_id"])
+            state["products"][row["product_id"]] = row
+            state["product_order"].append(row["product_id"])
+    else:
+        print(f"[경고] 상품 Parquet이 없습니다: {PRODUCT_PARQUET_PATH}")
+    state["product_index"] = load_product_index(PRODUCT_PARQUET_PATH)
+
+    # 미리 계산한 유사 상품 이웃
+    if os.path.exists(PRODUCT_NEIGHBORS_PATH):
+        table = pq.read_table(PRODUCT_NEIGHBORS_PATH).sort_by(
+            [("product_id", "ascending"), ("rank", "ascending")]
+        )
+        for row in table.to_pylist():
+            state["neighbors"].setdefault(row["product_id"], []).append(
+                {"product_id": row["neighbor_id"], "similarity": row["similarity"]}
+            )
+
+    # 리뷰 사이드카 인덱스 / ANN 인덱스 (mmap)
+    state["review_index"] = load_review_index(REVIEW_DATASET_PATH) or {}
+    state["ann_indexes"] = {
+        column: load_review_ann_index(column, REVIEW_ANN_DIR)
+        for column in ("word2vec", "bert")
+    }
+
+    # 전역 키워드 통계
+    if os.path.exists(PRODUCT_METADATA_PATH):
+        with open(PRODUCT_METADATA_PATH, "r", encoding="utf-8") as f:
+            state["keywords"] = json.load(f)
+
+    state["load_seconds"] = round(time.time() - start, 3)
+    return state
+
+
+@asynccontextmanager
+async def lifespan(app):
+    _state.clear()
+    _state.update(load_service_state())
+    with _response_cache_lock:
+        _response_cache.clear()
+    print(
+        f"서비스 상태 로드 완료: 상품 {len(_state['products']):,}개, "
+        f"리뷰 인덱스 {len(_state['review_index']):,}개 상품 "
+        f"({_state['load_seconds']:.2f}초)"
+    )
+    yield
+
+
+app = FastAPI(title="multicampus 리뷰 조회 서비스", lifespan=lifespan)
+
+
+def _cached(request: Request, build):
+    """(경로, 쿼리 파라미터) 단위 응답 LRU 캐시"""
+    key = (request.url.path, tuple(sorted(request.query_params.multi_items())))
+    with _response_cache_lock:
+        response = _response_cache.get(key)
+        if response is not None:
+            _response_cache.move_to_end(key)
+            return response
+    # 응답 생성은 잠금 밖에서 (느린 요청이 다른 요청의 캐시 조회를 막지 않도록)
+    response = build()
+    with _response_cache_lock:
+        _response_cache[key] = response
+        if len(_response_cache) > RESPONSE_CACHE_SIZE:
+            _response_cache.popitem(last=False)
+    return response
+
+
+def _get_product(product_id):
+    product = _state["products"].get(_nfc(product_id))
+    if product is None:
+        raise HTTPException(status_code=404, detail=f"상품을 찾을 수 없습니다: {product_id}")
+    return product
+
+
+@app.get("/health")
+def health():
+    return {
+        "status": "ok",
+        "products": len(_state.get("products", {})),
+        "indexed_products": len(_state.get("review_index", {})),
+        "ann_indexes": [c for c, idx in _state.get("ann_indexes", {}).items() if idx],
+        "cache_entries": len(_response_cache),
+        "load_seconds": _state.get("load_seconds"),
+    }
+
+
+@app.get("/products")
+def list_products(
+    request: Request,
+    category: Optional[str] = None,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+    def build():
+        product_ids = _state["product_order"]
+        if category:
+            target = _nfc(category)
+            product_ids = [
+                pid
+                for pid in product_ids
+                if _state["products"][pid].get("category_file") == target
+            ]
+        page = product_ids[offset : offset + limit]
+        return {
+            "total": len(product_ids),
+            "offset": offset,
+            "items": [
+                {key: _state["products"][pid].get(key) for key in PRODUCT_META_COLUMNS}
+                for pid in page
+            ],
+        }
+
+    return _cached(request, build)
+
+
+@app.get("/products/{product_id}")
+def product_detail(request: Request, product_id: str):
+    return _cached(request, lambda: _get_product(product_id))
+
+
+@app.get("/products/{product_id}/reviews")
+def product_reviews(
+    request: Request,
+    product_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+    def build():
+        product_id_nfc = _nfc(product_id)
+        if product_id_nfc not in _state["review_index"]:
+            raise HTTPException(status_code=404, detail=f"리뷰가 없는 상품입니다: {product_id}")
+        df = load_indexed_reviews([product_id_nfc], REVIEW_DATASET_PATH)
+        columns = [c for c in REVIEW_RESPONSE_COLUMNS if c in df.columns]
+        page = df.iloc[offset : offset + limit][columns]
+        return {
+            "product_id": product_id_nfc,
+            "total": len(df),
+            "offset": offset,
+            "items": json.loads(page.to_json(orient="records", force_ascii=False)),
+        }
+
+    return _cached(request, build)
+
+
+@app.get("/products/{product_id}/similar")
+def similar_products(
+    request: Request,
+    product_id: str,
+    top_k: int = Query(10, ge=1, le=100),
+    category: Optional[str] = None,
+    brand: Optional[str] = None,
+    min_price: Optional[int] = None,
+    max_price: Optional[int] = None,
+    skin_type: Optional[str] = None,
+):
+    def build():
+        product_id_nfc = _nfc(_get_product(product_id)["product_id"])
+        filters = {
+            "category": category,
+            "brand": brand,
+            "min_price": min_price,
+            "max_price": max_price,
+            "skin_type": skin_type,
+        }
+        neighbors = _state["neighbors"].get(product_id_nfc)
+        # 필터가 없고 미리 계산한 이웃으로 충분하면 행렬 곱 없이 응답
+        if not any(v is not None for v in filters.values()) and neighbors and len(neighbors) >= top_k:
+            items = [
+                {**_state["products"].get(n["product_id"], {}), **n}
+                for n in neighbors[:top_k]
+            ]
+            return {"product_id": product_id_nfc, "source": "neighbors_table", "items": items}
+
+        if _state["product_index"] is None:
+            raise HTTPException(status_code=503, detail="상품 벡터 인덱스가 없습니다")
+        items = recommend_similar_products(
+            product_id_nfc, top_k=top_k, index=_state["product_index"], **filters
+        )
+        return {"product_id": product_id_nfc, "source": "vectors", "items": items}
+
+    return _cached(request, build)
+
+
+@app.get("/search/reviews")
+def semantic_review_search(
+    request: Request,
+    q: str = Query(..., min_length=1),
+    top_k: int = Query(10, ge=1, le=100),
+    vector: str = Query("word2vec", pattern="^(word2vec|bert)$"),
+):
+    def build():
+        if not _state["ann_indexes"].get(vector):
+            raise HTTPException(status_code=503, detail=f"리뷰 ANN 인덱스가 없습니다: {vector}")
+        hits = search_reviews(q, top_k=top_k, vector_column=vector, index_dir=REVIEW_ANN_DIR)
+
+        # 상품별 리뷰 프레임(LRU)에서 본문 보강
+        texts = {}
+        for product_id in {h["product_id"] for h in hits}:
+            df = load_indexed_reviews([product_id], REVIEW_DATASET_PATH, ["review_id", "full_text"])
+            if df is not None:
+                texts.update(
+                    {(product_id, rid): text for rid, text in zip(df["review_id"], df["full_text"])}
+                )
+        for hit in hits:
+            hit["review_id"] = int(hit["review_id"])
+            hit["full_text"] = texts.get((hit["product_id"], hit["review_id"]))
+        return {"query": q, "vector": vector, "items": hits}
+
+    return _cached(request, build)
+
+
+@app.get("/keywords")
+def keywords():
+    metadata = _state.get("keywords", {})
+    return {
+        "overall_sentiment_special_words": metadata.get("overall_sentiment_special_words"),
+        "skin_type_word_frequency": metadata.get("skin_type_word_frequency"),
+    }
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host=SERVICE_HOST, port=SERVICE_PORT)
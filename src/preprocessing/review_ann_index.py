@@ -0,0 +1,502 @@
+"""
+리뷰 벡터 근사 최근접 이웃(ANN) 인덱스 (리뷰 단위 시맨틱 검색)
+
+- Phase 3 이후 리뷰 데이터셋의 word2vec/bert 벡터로 인덱스 생성 (코사인 유사도 = 정규화 벡터 내적)
+- 백엔드
+    - "hnsw": hnswlib 설치 시 사용 (그래프 인덱스, 로드 시 메모리에 적재)
+    - "ivfpq": NumPy IVF-PQ (k-means 역색인 + 잔차 Product Quantization, 배열은 mmap 로드)
+    - "auto": hnswlib이 있으면 hnsw, 없으면 ivfpq
+- 질의: 자유 텍스트 → 저장된 모델로 토큰화/임베딩 → 상위 k 리뷰 (product_id, review_id)
+
+저장 구조:
+    data/processed_data/review_ann/<벡터 컬럼>/meta.json          (backend, dim, n, 모델 버전 등)
+    data/processed_data/review_ann/<벡터 컬럼>/rows.parquet       (product_id, review_id - 인덱스 행 순서)
+    data/processed_data/review_ann/<벡터 컬럼>/vectors.npy        (n, dim) 정규화 float32 (재정렬/정확 검색용)
+    [ivfpq] centroids.npy, list_offsets.npy, codebooks.npy, codes.npy
+    [hnsw]  hnsw.bin
+"""
+
+import os
+import json
+import time
+import numpy as np
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from parquet_store import vector_column_to_numpy, read_partition_vector_models
+
+try:
+    import hnswlib
+except ImportError:  # 선택 의존성: 없으면 NumPy IVF-PQ 사용
+    hnswlib = None
+
+REVIEW_DATASET_PATH = "./data/processed_data/integrated_reviews_detail"
+REVIEW_ANN_DIR = "./data/processed_data/review_ann"
+
+ANN_BACKEND = "auto"
+
+# IVF-PQ 파라미터
+IVF_LISTS_PER_SQRT_N = 4  # 역색인 리스트 수 = 4 * sqrt(n)
+IVF_DEFAULT_NPROBE = 16
+PQ_MAX_SUBQUANTIZERS = 64
+PQ_CODEBOOK_SIZE = 256
+KMEANS_ITERATIONS = 20
+KMEANS_MAX_TRAIN = 65_536
+RERANK_FACTOR = 10  # PQ 근사 점수 상위 k * RERANK_FACTOR개를 원본 벡터로 재정렬
+
+# HNSW 파라미터
+HNSW_M = 16
+HNSW_EF_CONSTRUCTION = 200
+HNSW_DEFAULT_EF = 64
+
+_SEARCH_BLOCK_SIZE = 8192
+
+_index_cache = {}
+
+
+def ann_index_dir(vector_column, index_dir=REVIEW_ANN_DIR):
+    return os.path.join(index_dir, vector_column)
+
+
+# =========================
+# 학습 유틸리티 (k-means, PQ)
+# =========================
+
+
+def _assign_nearest(x, centroids):
+    """각 행의 가장 가까운 중심 (L2, 블록 단위 계산)"""
+    c_sq = (centroids**2).sum(axis=1)
+    labels = np.empty(len(x), dtype=np.int64)
+    for start in range(0, len(x), _SEARCH_BLOCK_SIZE):
+        block = x[start : start + _SEARCH_BLOCK_SIZE]
+        labels[start : start + len(block)] = np.argmin(
+            c_sq[None, :] - 2.0 * (block @ centroids.T), axis=1
+        )
+    return labels
+
+
+def _kmeans(x, k, n_iter=KMEANS_ITERATIONS, seed=42):
+    """NumPy k-means (빈 클러스터는 무작위 점으로 재배치)"""
+    rng = np.random.default_rng(seed)
+    if len(x) > KMEANS_MAX_TRAIN:
+        x = x[rng.choice(len(x), KMEANS_MAX_TRAIN, replace=False)]
+    k = min(k, len(x))
+    centroids = x[rng.choice(len(x), k, replace=False)].astype(np.float32, copy=True)
+
+    for _ in range(n_iter):
+        labels = _assign_nearest(x, centroids)
+        counts = np.bincount(labels, minlength=k)
+        nonempty = counts > 0
+        # 클러스터별 합: 라벨 순 정렬 후 구간 합 (np.add.at보다 빠름)
+        starts = (np.cumsum(counts) - counts)[nonempty]
+        sums = np.add.reduceat(x[np.argsort(labels, kind="stable")], starts, axis=0)
+        centroids[nonempty] = sums / counts[nonempty, None]
+        empty = np.flatnonzero(~nonempty)
+        if len(empty):
+            centroids[empty] = x[rng.choice(len(x), len(empty), replace=False)]
+    return centroids
+
+
+def _pq_subquantizers(dim):
+    """PQ 부분 공간 수: dim의 약수 중 dim/4 이하(최대 PQ_MAX_SUBQUANTIZERS)에서 가장 큰 값"""
+    limit = max(1, min(PQ_MAX_SUBQUANTIZERS, dim // 4))
+    return max(m for m in range(1, limit + 1) if dim % m == 0)
+
+
+def _train_ivfpq(vectors, seed=42):
+    """IVF-PQ 학습 + 인코딩 (벡터는 L2 정규화된 상태)"""
+    n, dim = vectors.shape
+    nlist = max(1, min(n, int(IVF_LISTS_PER_SQRT_N * np.sqrt(n))))
+    centroids = _kmeans(vectors, nlist, seed=seed)
+    labels = _assign_nearest(vectors, centroids)
+    residuals = vectors - centroids[labels]
+
+    m = _pq_subquantizers(dim)
+    dsub = dim // m
+    ksub = min(PQ_CODEBOOK_SIZE, n)
+    codebooks = np.empty((m, ksub, dsub), dtype=np.float32)
+    codes = np.empty((n, m), dtype=np.uint8)
+    for j in range(m):
+        sub = np.ascontiguousarray(residuals[:, j * dsub : (j + 1) * dsub])
+        codebooks[j] = _kmeans(sub, ksub, seed=seed + j + 1)
+        codes[:, j] = _assign_nearest(sub, codebooks[j])
+
+    # 역색인: 리스트 번호 순으로 행 정렬 → 리스트 = 연속 구간
+    order = np.argsort(labels, kind="stable")
+    list_offsets = np.zeros(len(centroids) + 1, dtype=np.int64)
+    list_offsets[1:] = np.cumsum(np.bincount(labels, minlength=len(centroids)))
+    return {
+        "order": order,
+        "centroids": centroids,
+        "list_offsets": list_offsets,
+        "codebooks": codebooks,
+        "codes": codes[order],
+    }
+
+
+# =========================
+# 인덱스 생성 / 로드
+# =========================
+
+
+def load_review_vectors_for_index(
+    dataset_path=REVIEW_DATASET_PATH, vector_column="word2vec", model_info=None
+):
+    """
+    리뷰 데이터셋에서 (product_id, review_id, 정규화 벡터) 로드 (null/영벡터 리뷰 제외)
+
+    - model_info를 주면 파티션에 기록된 벡터 모델 정보가 일치하는 파티션만 사용
+      (재처리하지 않은 카테고리의 이전 모델 벡터가 섞여 임베딩 공간이 어긋나지 않도록)
+
+    Returns:
+        tuple: (product_id 배열, review_id 배열, (n, dim) float32 행렬, 제외한 파티션 목록)
+               - 벡터가 없으면 None
+    """
+    if not os.path.exists(dataset_path):
+        print(f"[오류] 리뷰 데이터셋을 찾을 수 없습니다: {dataset_path}")
+        return None
+    dataset = ds.dataset(dataset_path, format="parquet", partitioning="hive")
+
+    tables = []
+    skipped = []
+    for fragment in dataset.get_fragments():
+        physical_schema = fragment.physical_schema
+        if vector_column not in physical_schema.names or not pa.types.is_fixed_size_list(
+            physical_schema.field(vector_column).type
+        ):
+            continue
+        if model_info:
+            recorded = read_partition_vector_models(physical_schema).get(vector_column)
+            if recorded != model_info:
+                skipped.append(os.path.relpath(fragment.path, dataset_path))
+                continue
+        tables.append(fragment.to_table(columns=["product_id", "review_id", vector_column]))
+
+    if skipped:
+        print(
+            f"[경고] 벡터 모델이 다른 파티션 {len(skipped)}개는 {vector_column} 인덱스에서 제외합니다 "
+            f"(해당 카테고리를 다시 처리하면 포함됨)"
+        )
+    if not tables:
+        print(f"[경고] 리뷰 벡터 컬럼이 없습니다: {vector_column}")
+        return None
+
+    table = pa.concat_tables(tables)
+    vectors = np.array(vector_column_to_numpy(table.column(vector_column)), dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1)
+    keep = np.isfinite(norms) & (norms > 0)
+    vectors = vectors[keep] / norms[keep, None]
+    product_ids = np.asarray(table.column("product_id").to_pylist(), dtype=object)[keep]
+    review_ids = table.column("review_id").to_numpy(zero_copy_only=False)[keep]
+    return product_ids, review_ids, vectors, skipped
+
+
+def build_review_ann_index(
+    vector_column="word2vec",
+    dataset_path=REVIEW_DATASET_PATH,
+    index_dir=REVIEW_ANN_DIR,
+    backend=ANN_BACKEND,
+    model_info=None,
+    seed=42,
+):
+    """
+    리뷰 ANN 인덱스 생성 및 저장
+
+    Args:
+        vector_column: "word2vec" 또는 "bert"
+        backend: "auto" | "hnsw" | "ivfpq"
+        model_info: 질의 임베딩에 사용할 모델 정보
+                    (word2vec: {"model_version": ...}, bert: {"model_name": ...})
+
+    Returns:
+        dict: 저장된 meta.json 내용 - 벡터가 없으면 None
+    """
+    loaded = load_review_vectors_for_index(dataset_path, vector_column, model_info)
+    if loaded is None:
+        return None
+    product_ids, review_ids, vectors, skipped_partitions = loaded
+    if len(vectors) == 0:
+        print(f"[경고] 인덱싱할 리뷰 벡터가 없습니다: {vector_column}")
+        return None
+
+    if backend == "auto":
+        backend = "hnsw" if hnswlib is not None else "ivfpq"
+    if backend == "hnsw" and hnswlib is None:
+        print("[경고] hnswlib이 설치되어 있지 않아 IVF-PQ 인덱스로 생성합니다.")
+        backend = "ivfpq"
+
+    out_dir = ann_index_dir(vector_column, index_dir)
+    os.makedirs(out_dir, exist_ok=True)
+    n, dim = vectors.shape
+    meta = {
+        "backend": backend,
+        "vector_column": vector_column,
+        "dim": int(dim),
+        "n": int(n),
+        **(model_info or {}),
+        "skipped_partitions": skipped_partitions,
+    }
+
+    start = time.time()
+    if backend == "ivfpq":
+        ivfpq = _train_ivfpq(vectors, seed=seed)
+        order = ivfpq.pop("order")
+        for name, array in ivfpq.items():
+            np.save(os.path.join(out_dir, f"{name}.npy"), array)
+        meta.update(
+            {
+                "nlist": int(len(ivfpq["centroids"])),
+                "pq_m": int(ivfpq["codebooks"].shape[0]),
+                "pq_ksub": int(ivfpq["codebooks"].shape[1]),
+            }
+        )
+    else:
+        order = np.arange(n)
+        index = hnswlib.Index(space="ip", dim=dim)
+        index.init_index(max_elements=n, ef_construction=HNSW_EF_CONSTRUCTION, M=HNSW_M)
+        index.add_items(vectors, np.arange(n))
+        index.save_index(os.path.join(out_dir, "hnsw.bin"))
+        meta.update({"hnsw_m": HNSW_M, "hnsw_ef_construction": HNSW_EF_CONSTRUCTION})
+    meta["build_seconds"] = round(time.time() - start, 3)
+
+    np.save(os.path.join(out_dir, "vectors.npy"), vectors[order])
+    pq.write_table(
+        pa.table(
+            {
+                "product_id": pa.array(product_ids[order], type=pa.string()),
+                "review_id": pa.array(review_ids[order], type=pa.int64()),
+            }
+        ),
+        os.path.join(out_dir, "rows.parquet"),
+    )
+    with open(os.path.join(out_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    return meta
+
+
+def load_review_ann_index(vector_column="word2vec", index_dir=REVIEW_ANN_DIR):
+    """
+    저장된 리뷰 ANN 인덱스 로드 (NumPy 배열은 mmap, meta.json mtime 기준 캐시)
+
+    Returns:
+        dict: {"meta", "rows"(product_id/review_id DataFrame), "vectors", 백엔드별 배열/객체}
+              - 인덱스가 없으면 None
+    """
+    in_dir = ann_index_dir(vector_column, index_dir)
+    meta_path = os.path.join(in_dir, "meta.json")
+    if not os.path.exists(meta_path):
+        return None
+
+    key = (os.path.abspath(meta_path), os.path.getmtime(meta_path))
+    if key in _index_cache:
+        return _index_cache[key]
+
+    with open(meta_path, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+
+    index = {
+        "meta": meta,
+        "rows": pq.read_table(os.path.join(in_dir, "rows.parquet")).to_pandas(),
+        "vectors": np.load(os.path.join(in_dir, "vectors.npy"), mmap_mode="r"),
+    }
+    if meta["backend"] == "ivfpq":
+        for name in ("centroids", "list_offsets", "codebooks", "codes"):
+            index[name] = np.load(os.path.join(in_dir, f"{name}.npy"), mmap_mode="r")
+        index["centroid_sq"] = (np.asarray(index["centroids"]) ** 2).sum(axis=1)
+    else:
+        if hnswlib is None:
+            print("[오류] hnswlib이 설치되어 있지 않아 HNSW 인덱스를 로드할 수 없습니다.")
+            return None
+        hnsw = hnswlib.Index(space="ip", dim=meta["dim"])
+        hnsw.load_index(os.path.join(in_dir, "hnsw.bin"), max_elements=meta["n"])
+        index["hnsw"] = hnsw
+
+    _index_cache[key] = index
+    return index
+
+
+# =========================
+# 검색
+# =========================
+
+
+def _top_k(scores, k):
+    """1차원 점수에서 상위 k 위치 (점수 내림차순)"""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+def _search_ivfpq(index, query, top_k, nprobe, rerank):
+    """
+    IVF-PQ 검색 (질의 1개)
+
+    - 내적은 q·x = q·c + q·r 이므로 잔차 PQ 룩업 테이블은 리스트와 무관하게 한 번만 계산
+    """
+    centroids = index["centroids"]
+    coarse_ip = centroids @ query
+    # 가까운(L2) 리스트 nprobe개: |c|² - 2 q·c 가 작은 순
+    lists = _top_k(-(index["centroid_sq"] - 2.0 * coarse_ip), nprobe)
+
+    offsets = index["list_offsets"]
+    lists = np.array([c for c in lists if offsets[c + 1] > offsets[c]], dtype=np.int64)
+    if len(lists) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    rows = np.concatenate([np.arange(offsets[c], offsets[c + 1]) for c in lists])
+    base = np.repeat(coarse_ip[lists], offsets[lists + 1] - offsets[lists])
+
+    codebooks = index["codebooks"]
+    m, _, dsub = codebooks.shape
+    lut = np.einsum("mkd,md->mk", codebooks, query.reshape(m, dsub))
+    codes = np.asarray(index["codes"][rows])
+    approx = base + lut[np.arange(m), codes].sum(axis=1)
+
+    if not rerank:
+        top = _top_k(approx, top_k)
+        return rows[top], approx[top].astype(np.float32)
+
+    # mmap 배열은 정렬된 행 순서로 읽어야 디스크 접근이 순차적
+    candidates = np.sort(rows[_top_k(approx, top_k * RERANK_FACTOR)])
+    exact = np.asarray(index["vectors"][candidates]) @ query
+    top = _top_k(exact, top_k)
+    return candidates[top], exact[top].astype(np.float32)
+
+
+def search_vectors(index, query, top_k=10, nprobe=IVF_DEFAULT_NPROBE, ef=HNSW_DEFAULT_EF, rerank=True):
+    """
+    정규화 전 질의 벡터 1개로 ANN 검색
+
+    Returns:
+        tuple: (인덱스 행 번호 배열, 코사인 유사도 배열) - 영벡터면 빈 배열
+    """
+    query = np.asarray(query, dtype=np.float32).reshape(-1)
+    norm = np.linalg.norm(query)
+    if not np.isfinite(norm) or norm == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    query = query / norm
+
+    if index["meta"]["backend"] == "ivfpq":
+        return _search_ivfpq(index, query, top_k, nprobe, rerank)
+
+    hnsw = index["hnsw"]
+    k = min(top_k, index["meta"]["n"])
+    hnsw.set_ef(max(ef, k))
+    labels, distances = hnsw.knn_query(query, k=k)
+    return labels[0].astype(np.int64), (1.0 - distances[0]).astype(np.float32)
+
+
+def embed_query(text, index):
+    """
+    자유 텍스트를 인덱스와 같은 모델로 임베딩 (Phase 3 리뷰 벡터와 같은 방식)
+
+    - word2vec: 형태소 토큰화 + 불용어 제거 후 단어 벡터 평균
+    - bert: [CLS] 임베딩
+    """
+    meta = index["meta"]
+    if meta["vector_column"] == "bert":
+        from bert_vectorizer import get_bert_vectorizer
+
+        return get_bert_vectorizer(meta.get("model_name", "klue/bert-base")).encode(text)
+
+    from preprocessing_utils import load_stopwords, get_tokens, load_keyed_vectors
+
+    kv = load_keyed_vectors(meta.get("model_version"))
+    if kv is None:
+        return None
+    tokens = get_tokens(text, load_stopwords())
+    word_vectors = [kv[w] for w in tokens if w in kv]
+    if not word_vectors:
+        return None
+    return np.mean(word_vectors, axis=0)
+
+
+def search_reviews(
+    text,
+    top_k=10,
+    vector_column="word2vec",
+    index_dir=REVIEW_ANN_DIR,
+    nprobe=IVF_DEFAULT_NPROBE,
+    ef=HNSW_DEFAULT_EF,
+):
+    """
+    자유 텍스트와 의미가 비슷한 리뷰 검색
+
+    Returns:
+        list: [{"product_id", "review_id", "similarity"}, ...]
+              - 인덱스가 없거나 질의에 아는 단어가 없으면 빈 리스트
+    """
+    index = load_review_ann_index(vector_column, index_dir)
+    if index is None:
+        print(f"[오류] 리뷰 ANN 인덱스가 없습니다: {ann_index_dir(vector_column, index_dir)}")
+        return []
+
+    query = embed_query(text, index)
+    if query is None:
+        return []
+
+    rows, scores = search_vectors(index, query, top_k, nprobe=nprobe, ef=ef)
+    records = index["rows"].iloc[rows].to_dict("records")
+    for record, score in zip(records, scores):
+        record["similarity"] = float(score)
+    return records
+
+
+# =========================
+# 벤치마크
+# =========================
+
+
+def benchmark_review_ann(
+    vector_column="word2vec",
+    index_dir=REVIEW_ANN_DIR,
+    n_queries=200,
+    top_k=10,
+    settings=None,
+    seed=42,
+):
+    """
+    ANN 검색 recall@k (전수 검색 대비) 및 QPS 벤치마크
+
+    - 질의: 인덱스에 저장된 리뷰 벡터 중 무작위 n_queries개
+    - settings: ivfpq는 nprobe 목록, hnsw는 ef 목록 (None이면 기본 목록)
+
+    Returns:
+        dict: {"brute_force_qps", "results": [{"setting", "recall", "qps"}, ...]} - 인덱스가 없으면 None
+    """
+    index = load_review_ann_index(vector_column, index_dir)
+    if index is None:
+        print(f"[오류] 리뷰 ANN 인덱스가 없습니다: {ann_index_dir(vector_column, index_dir)}")
+        return None
+
+    vectors = index["vectors"]
+    rng = np.random.default_rng(seed)
+    sample = rng.choice(len(vectors), size=min(n_queries, len(vectors)), replace=False)
+    queries = np.asarray(vectors[np.sort(sample)])
+
+    # 전수 검색 (정답)
+    start = time.perf_counter()
+    exact = [_top_k(np.asarray(vectors) @ q, top_k) for q in queries]
+    brute_qps = len(queries) / (time.perf_counter() - start)
+
+    backend = index["meta"]["backend"]
+    if settings is None:
+        settings = [1, 4, 16, 64] if backend == "ivfpq" else [16, 64, 256]
+
+    results = []
+    print(f"리뷰 ANN 벤치마크 ({backend}, {vector_column}, n={len(vectors):,}, 질의 {len(queries)}개, k={top_k})")
+    print(f"  brute-force: {brute_qps:,.0f} QPS")
+    for setting in settings:
+        params = {"nprobe": setting} if backend == "ivfpq" else {"ef": setting}
+        start = time.perf_counter()
+        found = [search_vectors(index, q, top_k, **params)[0] for q in queries]
+        qps = len(queries) / (time.perf_counter() - start)
+        recall = float(
+            np.mean([len(set(f) & set(e)) / max(len(e), 1) for f, e in zip(found, exact)])
+        )
+        name = "nprobe" if backend == "ivfpq" else "ef"
+        results.append({"setting": f"{name}={setting}", "recall": recall, "qps": qps})
+        print(f"  {name}={setting:<4} recall@{top_k}: {recall:.3f} | {qps:,.0f} QPS")
+
+    return {"brute_force_qps": brute_qps, "results": results}
@@ -0,0 +1,421 @@
+"""
+상품별 일 리뷰 수 배치 예측 (수요 예측 baseline)
+
+- 입력: 리뷰 시계열 큐브(review_timeseries)의 상품 × 일 리뷰 수 (리뷰 재스캔 없음)
+- 모델
+    - "seasonal_naive": 마지막 1주(SEASON_LENGTH일) 반복
+    - "ets": 가법 계절 지수평활 ETS(A,N,A) - 상품 전체 × 파라미터 격자를 NumPy로 한 번에 적합,
+             상품마다 1-step 제곱오차가 가장 작은 (alpha, gamma) 선택
+    - "prophet": prophet 설치 시 사용 가능한 무거운 모델 (상품마다 개별 적합, 기본 비활성)
+- 상품을 FORECAST_BLOCK_SIZE개씩 나눠 프로세스 풀에서 병렬 적합 (워커는 큐브를 mmap으로 공유)
+- 백테스트: 마지막 horizon일을 가리고 예측 → MAE / WAPE / MASE(계절 naive 대비)
+
+저장 구조:
+    data/processed_data/review_forecasts.parquet
+        product_id, category_file, model, date, forecast
+    data/processed_data/review_forecasts_metadata.json
+        trained_through, horizon, models, backtest 오차, 적합 속도
+"""
+
+import os
+import json
+import time
+import unicodedata
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from multiprocessing import Pool, cpu_count
+from review_timeseries import REVIEW_TIMESERIES_DIR, load_review_timeseries
+
+try:
+    from prophet import Prophet
+except ImportError:  # 선택 의존성: 없으면 prophet 모델 제외
+    Prophet = None
+
+FORECAST_PATH = "./data/processed_data/review_forecasts.parquet"
+
+FORECAST_MODELS = ("seasonal_naive", "ets")  # 기본 실행 모델 ("prophet" 추가 가능)
+FORECAST_HORIZON = 28  # 예측 일수
+FORECAST_HISTORY_DAYS = 364  # 적합에 사용할 최근 일수 (52주)
+SEASON_LENGTH = 7  # 요일 계절성
+FORECAST_BLOCK_SIZE = 512  # 워커 작업 1개당 상품 수
+FORECAST_WORKERS = max(1, cpu_count() - 1)
+
+# ETS(A,N,A) 파라미터 격자 (상품마다 in-sample 1-step SSE 최소 조합 선택)
+ETS_ALPHAS = (0.02, 0.05, 0.1, 0.2, 0.3, 0.5)
+ETS_GAMMAS = (0.01, 0.05, 0.1, 0.2)
+
+
+# =========================
+# 모델 (상품 행렬 단위, Y: (상품 수, 일 수))
+# =========================
+
+
+def seasonal_naive_forecast(Y, horizon, season_length=SEASON_LENGTH):
+    """마지막 한 주기를 반복 → (상품 수, horizon)"""
+    Y = np.asarray(Y, dtype=np.float64)
+    if Y.shape[1] < season_length:
+        return np.repeat(Y.mean(axis=1, keepdims=True), horizon, axis=1)
+    last = Y[:, -season_length:]
+    return last[:, np.arange(horizon) % season_length]
+
+
+def ets_forecast(Y, horizon, season_length=SEASON_LENGTH, alphas=ETS_ALPHAS, gammas=ETS_GAMMAS):
+    """
+    가법 계절 지수평활 ETS(A,N,A) (오차 수정형)
+
+        e_t = y_t - (l_{t-1} + s_{t-m})
+        l_t = l_{t-1} + alpha * e_t
+        s_t = s_{t-m} + gamma * e_t
+
+    - 시간 축만 반복하고 (파라미터 격자 × 상품)은 NumPy 벡터 연산
+    - 예측값은 0 미만이면 0으로 자름 (리뷰 수)
+
+    Returns:
+        ndarray: (상품 수, horizon)
+    """
+    Y = np.asarray(Y, dtype=np.float64)
+    n, T = Y.shape
+    m = season_length
+    if T < 2 * m:
+        return seasonal_naive_forecast(Y, horizon, m)
+
+    grid = np.array([(a, g) for a in alphas for g in gammas], dtype=np.float64)
+    alpha = grid[:, 0, None]
+    gamma = grid[:, 1, None]
+
+    # 초기값: 첫 주기 평균 / 편차
+    level = np.broadcast_to(Y[:, :m].mean(axis=1), (len(grid), n)).copy()
+    season = np.broadcast_to(Y[:, :m] - Y[:, :m].mean(axis=1, keepdims=True), (len(grid), n, m)).copy()
+    sse = np.zeros((len(grid), n))
+
+    for t in range(m, T):
+        k = t % m
+        error = Y[:, t] - (level + season[:, :, k])
+        sse += error * error
+        level += alpha * error
+        season[:, :, k] += gamma * error
+
+    best = np.argmin(sse, axis=0)
+    products = np.arange(n)
+    steps = (T + np.arange(horizon)) % m
+    forecast = level[best, products][:, None] + season[best, products][:, steps]
+    return np.maximum(forecast, 0.0)
+
+
+def prophet_forecast(Y, horizon, dates):
+    """
+    prophet 상품별 적합 (무거운 모델, prophet 설치 시)
+
+    Args:
+        dates: Y 열에 해당하는 DatetimeIndex
+    """
+    if Prophet is None:
+        raise ImportError("prophet이 설치되어 있지 않습니다.")
+    import logging
+
+    logging.getLogger("cmdstanpy").setLevel(logging.WARNING)
+    forecasts = np.zeros((len(Y), horizon))
+    for i, y in enumerate(np.asarray(Y, dtype=np.float64)):
+        if y.sum() == 0:
+            continue
+        model = Prophet(weekly_seasonality=True, yearly_seasonality=len(dates) >= 365, daily_seasonality=False)
+        model.fit(pd.DataFrame({"ds": dates, "y": y}))
+        future = model.make_future_dataframe(periods=horizon, include_history=False)
+        forecasts[i] = model.predict(future)["yhat"].to_numpy()
+    return np.maximum(forecasts, 0.0)
+
+
+# =========================
+# 병렬 배치 실행
+# =========================
+
+
+def _series_window(cube, rows, end_day, history_days):
+    """큐브에서 상품 행들의 [end_day - history_days, end_day) 일 리뷰 수"""
+    start_day = max(0, end_day - history_days)
+    counts = np.asarray(cube["score_counts"][:, rows, start_day:end_day]).sum(axis=0, dtype=np.int64)
+    return counts.astype(np.float64), cube["dates"][start_day:end_day]
+
+
+def _forecast_block(args):
+    """워커: 상품 블록 하나에 대해 모델별 예측 → (블록 번호, {모델: 예측}, {모델: 소요 시간})"""
+    block_id, rows, models, horizon, history_days, end_day, ts_dir = args
+    cube = load_review_timeseries(ts_dir)
+    Y, dates = _series_window(cube, rows, end_day, history_days)
+
+    forecasts = {}
+    seconds = {}
+    for model in models:
+        start = time.perf_counter()
+        if model == "seasonal_naive":
+            forecasts[model] = seasonal_naive_forecast(Y, horizon)
+        elif model == "ets":
+            forecasts[model] = ets_forecast(Y, horizon)
+        elif model == "prophet":
+            forecasts[model] = prophet_forecast(Y, horizon, dates)
+        seconds[model] = time.perf_counter() - start
+        forecasts[model] = forecasts[model].astype(np.float32)
+    return block_id, forecasts, seconds
+
+
+def _resolve_models(models):
+    models = list(models)
+    unknown = [m for m in models if m not in ("seasonal_naive", "ets", "prophet")]
+    if unknown:
+        raise ValueError(f"지원하지 않는 모델: {unknown}")
+    if "prophet" in models and Prophet is None:
+        print("[경고] prophet이 설치되어 있지 않아 prophet 모델을 제외합니다.")
+        models.remove("prophet")
+    return models
+
+
+def forecast_products(
+    models=FORECAST_MODELS,
+    horizon=FORECAST_HORIZON,
+    history_days=FORECAST_HISTORY_DAYS,
+    product_ids=None,
+    end_day=None,
+    ts_dir=REVIEW_TIMESERIES_DIR,
+    workers=FORECAST_WORKERS,
+):
+    """
+    상품별 일 리뷰 수 예측 (상품 블록 단위 프로세스 풀 병렬)
+
+    Args:
+        models: 실행할 모델 리스트
+        horizon: 예측 일수
+        history_days: 적합에 사용할 최근 일수
+        product_ids: 예측할 상품 (None이면 큐브 전체)
+        end_day: 학습 구간 끝 (큐브 날짜 축 위치, 제외) - None이면 큐브 끝 (백테스트에서 사용)
+        ts_dir: 리뷰 시계열 큐브 디렉토리
+        workers: 프로세스 수 (1이면 현재 프로세스에서 실행)
+
+    Returns:
+        dict: {
+            "rows": 큐브 행 번호, "product_ids", "category_files",
+            "dates": 예측 날짜 DatetimeIndex,
+            "forecasts": {모델: (상품 수, horizon) float32},
+            "fit_seconds": {모델: 블록 적합 시간 합계 (워커 CPU 기준)},
+            "wall_seconds": 전체 경과 시간,
+        }
+        - 큐브가 없으면 None
+    """
+    cube = load_review_timeseries(ts_dir)
+    if cube is None:
+        print(f"[오류] 리뷰 시계열 큐브가 없습니다: {ts_dir}")
+        return None
+    models = _resolve_models(models)
+
+    if product_ids is None:
+        rows = np.arange(len(cube["products"]))
+    else:
+        product_ids = [unicodedata.normalize("NFC", str(p)) for p in product_ids]
+        rows = np.asarray(
+            sorted(cube["row_of"][p] for p in product_ids if p in cube["row_of"]), dtype=np.int64
+        )
+    n_days = len(cube["dates"])
+    end_day = n_days if end_day is None else min(end_day, n_days)
+
+    tasks = [
+        (block_id, rows[i : i + FORECAST_BLOCK_SIZE], models, horizon, history_days, end_day, ts_dir)
+        for block_id, i in enumerate(range(0, len(rows), FORECAST_BLOCK_SIZE))
+    ]
+
+    start = time.perf_counter()
+    if workers > 1 and len(tasks) > 1:
+        with Pool(min(workers, len(tasks))) as pool:
+            results = list(pool.imap_unordered(_forecast_block, tasks))
+    else:
+        results = [_forecast_block(task) for task in tasks]
+    wall_seconds = time.perf_counter() - start
+    results.sort(key=lambda r: r[0])
+
+    forecasts = {
+        model: (
+            np.concatenate([r[1][model] for r in results])
+            if results
+            else np.zeros((0, horizon), dtype=np.float32)
+        )
+        for model in models
+    }
+    fit_seconds = {model: sum(r[2][model] for r in results) for model in models}
+    last_date = cube["dates"][end_day - 1] if end_day > 0 else pd.Timestamp(cube["meta"]["start_date"])
+    products = cube["products"]
+    return {
+        "rows": rows,
+        "product_ids": products["product_id"].to_numpy()[rows],
+        "category_files": products["category_file"].to_numpy()[rows],
+        "dates": pd.date_range(last_date + pd.Timedelta(days=1), periods=horizon, freq="D"),
+        "forecasts": forecasts,
+        "fit_seconds": fit_seconds,
+        "wall_seconds": wall_seconds,
+    }
+
+
+def backtest_forecast(
+    models=FORECAST_MODELS,
+    horizon=FORECAST_HORIZON,
+    history_days=FORECAST_HISTORY_DAYS,
+    product_ids=None,
+    ts_dir=REVIEW_TIMESERIES_DIR,
+    workers=FORECAST_WORKERS,
+):
+    """
+    마지막 horizon일을 가리고 예측한 뒤 실제 리뷰 수와 비교
+
+    Returns:
+        dict: {모델: {"mae", "wape", "mase", "products_per_sec"}}
+              - mase: 학습 구간 계절 naive 1-step 오차(MAE) 대비 비율 (1보다 작으면 naive보다 좋음)
+              - 큐브가 없거나 날짜가 부족하면 None
+    """
+    cube = load_review_timeseries(ts_dir)
+    if cube is None:
+        print(f"[오류] 리뷰 시계열 큐브가 없습니다: {ts_dir}")
+        return None
+    n_days = len(cube["dates"])
+    if n_days <= horizon + 2 * SEASON_LENGTH:
+        print(f"[오류] 백테스트에 필요한 날짜가 부족합니다: {n_days}일")
+        return None
+
+    end_day = n_days - horizon
+    result = forecast_products(models, horizon, history_days, product_ids, end_day, ts_dir, workers)
+    actual, _ = _series_window(cube, result["rows"], n_days, horizon)
+    history, _ = _series_window(cube, result["rows"], end_day, history_days)
+
+    naive_scale = np.abs(history[:, SEASON_LENGTH:] - history[:, :-SEASON_LENGTH]).mean()
+    metrics = {}
+    for model, forecast in result["forecasts"].items():
+        abs_error = np.abs(forecast - actual)
+        n_products = len(result["rows"])
+        metrics[model] = {
+            "mae": float(abs_error.mean()),
+            "wape": float(abs_error.sum() / max(actual.sum(), 1.0)),
+            "mase": float(abs_error.mean() / naive_scale) if naive_scale > 0 else None,
+            "products_per_sec": (
+                n_products / result["fit_seconds"][model] if result["fit_seconds"][model] > 0 else None
+            ),
+        }
+    return metrics
+
+
+def run_batch_forecast(
+    models=FORECAST_MODELS,
+    horizon=FORECAST_HORIZON,
+    ts_dir=REVIEW_TIMESERIES_DIR,
+    output_path=FORECAST_PATH,
+    workers=FORECAST_WORKERS,
+    backtest=True,
+):
+    """
+    전체 상품 예측 후 예측 테이블 저장 (main.py 마지막 단계, 야간 배치)
+
+    Returns:
+        dict: 메타데이터 (trained_through, horizon, models, n_products, backtest, ...)
+              - 큐브가 없으면 None
+    """
+    result = forecast_products(models, horizon, ts_dir=ts_dir, workers=workers)
+    if result is None:
+        return None
+
+    n_products = len(result["rows"])
+    dates = result["dates"].to_numpy(dtype="datetime64[D]")
+    tables = []
+    for model, forecast in result["forecasts"].items():
+        tables.append(
+            pa.table(
+                {
+                    "product_id": pa.array(np.repeat(result["product_ids"], horizon), type=pa.string()),
+                    "category_file": pa.array(np.repeat(result["category_files"], horizon), type=pa.string()),
+                    "model": pa.array([model] * (n_products * horizon), type=pa.string()),
+                    "date": pa.array(np.tile(dates, n_products), type=pa.date32()),
+                    "forecast": pa.array(forecast.reshape(-1), type=pa.float32()),
+                }
+            )
+        )
+    if not tables:
+        return None
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    pq.write_table(pa.concat_tables(tables), output_path, compression="snappy")
+
+    metadata = {
+        "trained_through": str((result["dates"][0] - pd.Timedelta(days=1)).date()),
+        "horizon": horizon,
+        "models": list(result["forecasts"]),
+        "n_products": n_products,
+        "fit_seconds": {m: round(s, 3) for m, s in result["fit_seconds"].items()},
+        "wall_seconds": round(result["wall_seconds"], 3),
+        "backtest": backtest_forecast(list(result["forecasts"]), horizon, ts_dir=ts_dir, workers=workers)
+        if backtest
+        else None,
+    }
+    meta_path = output_path.replace(".parquet", "_metadata.json")
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(metadata, f, ensure_ascii=False, indent=2)
+    return metadata
+
+
+def load_forecasts(product_id=None, model=None, forecast_path=FORECAST_PATH):
+    """예측 테이블 로드 (상품/모델 필터) - 파일이 없으면 None"""
+    if not os.path.exists(forecast_path):
+        print(f"[오류] 예측 테이블이 없습니다: {forecast_path}")
+        return None
+    filters = []
+    if product_id is not None:
+        filters.append(("product_id", "=", product_id))
+    if model is not None:
+        filters.append(("model", "=", model))
+    return pq.read_table(forecast_path, filters=filters or None).to_pandas()
+
+
+def benchmark_forecast(
+    models=("seasonal_naive", "ets", "prophet"),
+    horizon=FORECAST_HORIZON,
+    n_products=None,
+    ts_dir=REVIEW_TIMESERIES_DIR,
+    workers=FORECAST_WORKERS,
+):
+    """
+    모델별 적합 속도(상품/초)와 백테스트 오차 비교
+
+    - prophet은 느리므로 n_products를 작게 주는 것을 권장
+    - 속도는 워커 적합 시간 합계 기준 (단일 코어 상품/초) + 전체 경과 시간 기준
+
+    Returns:
+        dict: {모델: {"products_per_sec", "wall_products_per_sec", "mae", "wape", "mase"}}
+    """
+    cube = load_review_timeseries(ts_dir)
+    if cube is None:
+        print(f"[오류] 리뷰 시계열 큐브가 없습니다: {ts_dir}")
+        return None
+    product_ids = None
+    if n_products is not None:
+        product_ids = list(cube["products"]["product_id"].iloc[:n_products])
+
+    results = {}
+    for model in _resolve_models(models):
+        start = time.perf_counter()
+        metrics = backtest_forecast([model], horizon, product_ids=product_ids, ts_dir=ts_dir, workers=workers)
+        if metrics is None:
+            return None
+        elapsed = time.perf_counter() - start
+        count = len(product_ids) if product_ids is not None else len(cube["products"])
+        results[model] = {
+            **metrics[model],
+            "wall_products_per_sec": count / elapsed if elapsed > 0 else None,
+        }
+
+    print(f"\n{'모델':<16}{'상품/초':>12}{'경과 기준':>12}{'MAE':>10}{'WAPE':>10}{'MASE':>10}")
+    for model, r in results.items():
+        mase = f"{r['mase']:.3f}" if r["mase"] is not None else "-"
+        pps = f"{r['products_per_sec']:,.0f}" if r["products_per_sec"] else "-"
+        print(
+            f"{model:<16}{pps:>12}{r['wall_products_per_sec']:>12,.0f}"
+            f"{r['mae']:>10.3f}{r['wape']:>10.3f}{mase:>10}"
+        )
+    return results
+
+
+if __name__ == "__main__":
+    benchmark_forecast()
@@ -0,0 +1,363 @@
+"""
+부정 리뷰 급증 탐지 (스트리밍 윈도우)
+
+- 상품별 일 단위 링 버퍼(SURGE_WINDOW_DAYS칸)에 전체/부정(label == 0) 리뷰 수를 누적
+  → 칸 하나 = 하루, 새 날짜가 들어오면 가장 오래된 칸을 비우고 재사용
+- 부정 리뷰 토큰도 (상품, 칸) 단위 Counter로 보관 → 급증을 만든 키워드 계산
+- 증분 실행: 카테고리마다 마지막으로 반영한 날짜(watermark)를 저장하고
+  그 이후 리뷰만 읽어 반영 (갱신 비용 = 새 리뷰 수)
+- 탐지: 최근 SURGE_RECENT_DAYS일 부정 리뷰 수를 "최근 리뷰 수 × 이전 기간 부정 비율"(기대값)과 비교
+  (이항 z 점수 + 최소 건수/배율 조건), 상품과 카테고리 단위 모두 검사
+  → 리뷰 수 자체가 늘어난 경우는 급증으로 보지 않음
+  → 이전 기간 리뷰가 적은 상품은 부정 비율을 상위(카테고리/전체) 비율 쪽으로 보정
+
+저장 구조:
+    data/processed_data/review_surge_state.pkl     (링 버퍼/토큰 Counter/watermark 상태)
+    data/processed_data/review_surge_alerts.json   (마지막 실행의 경고 목록)
+"""
+
+import os
+import json
+import pickle
+import unicodedata
+from collections import Counter
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+from parquet_store import REVIEW_PART_FILE, list_review_partitions
+
+REVIEW_DATASET_PATH = "./data/processed_data/integrated_reviews_detail"
+SURGE_STATE_PATH = "./data/processed_data/review_surge_state.pkl"
+SURGE_ALERTS_PATH = "./data/processed_data/review_surge_alerts.json"
+
+SURGE_WINDOW_DAYS = 120  # 링 버퍼 길이 (최근 구간 + 비교 기간)
+SURGE_RECENT_DAYS = 30  # 최근 1개월
+SURGE_Z_THRESHOLD = 3.0  # 이항 z 점수 기준 (_surge_scores)
+SURGE_MIN_NEGATIVE = 5  # 최근 부정 리뷰 최소 건수
+SURGE_MIN_LIFT = 1.5  # 최근 부정 리뷰 수 / 기대값 최소 배율
+SURGE_PRIOR_REVIEWS = 20  # 이전 기간 부정 비율 보정 강도 (가상 리뷰 수)
+SURGE_TOP_KEYWORDS = 10
+
+_EPOCH = np.datetime64("1970-01-01", "D")
+
+
+def init_surge_state(window_days=SURGE_WINDOW_DAYS):
+    """빈 탐지 상태"""
+    return {
+        "window_days": window_days,
+        "products": [],  # 행 순서의 product_id
+        "categories": [],  # 행 순서의 category_file
+        "row_of": {},
+        "total": np.zeros((0, window_days), dtype=np.int32),
+        "negative": np.zeros((0, window_days), dtype=np.int32),
+        "slot_day": np.full(window_days, -1, dtype=np.int64),  # 칸별 날짜 (1970-01-01 기준 일 번호)
+        "first_day": None,
+        "tokens": {},  # {행: {칸: Counter(부정 리뷰 토큰)}}
+        "watermarks": {},  # {카테고리: {"date": "YYYY-MM-DD", "seen": [(product_id, review_id), ...]}}
+    }
+
+
+def load_surge_state(state_path=SURGE_STATE_PATH):
+    """저장된 탐지 상태 로드 (없으면 빈 상태)"""
+    if not os.path.exists(state_path):
+        return init_surge_state()
+    with open(state_path, "rb") as f:
+        return pickle.load(f)
+
+
+def save_surge_state(state, state_path=SURGE_STATE_PATH):
+    """탐지 상태 저장 (임시 파일에 쓰고 교체)"""
+    os.makedirs(os.path.dirname(state_path) or ".", exist_ok=True)
+    tmp_path = state_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, state_path)
+
+
+def _ensure_rows(state, product_ids, category):
+    """처음 보는 상품의 행 추가 → product_ids의 행 번호 배열"""
+    new_ids = [pid for pid in dict.fromkeys(product_ids) if pid not in state["row_of"]]
+    if new_ids:
+        start = len(state["products"])
+        for i, pid in enumerate(new_ids):
+            state["row_of"][pid] = start + i
+        state["products"].extend(new_ids)
+        state["categories"].extend([category] * len(new_ids))
+        pad = np.zeros((len(new_ids), state["window_days"]), dtype=np.int32)
+        state["total"] = np.vstack([state["total"], pad])
+        state["negative"] = np.vstack([state["negative"], pad])
+    return np.fromiter((state["row_of"][pid] for pid in product_ids), dtype=np.int64, count=len(product_ids))
+
+
+def _advance_ring(state, days):
+    """
+    새 날짜가 차지할 칸을 비움 (칸의 기존 날짜보다 새로운 날짜만)
+
+    Returns:
+        ndarray: days 중 링 버퍼에 반영할 수 있는 리뷰 마스크 (윈도우보다 오래된 날짜 제외)
+    """
+    window = state["window_days"]
+    slot_day = state["slot_day"]
+    for day in np.unique(days):
+        slot = day % window
+        if day > slot_day[slot]:
+            state["total"][:, slot] = 0
+            state["negative"][:, slot] = 0
+            for slots in state["tokens"].values():
+                slots.pop(int(slot), None)
+            slot_day[slot] = day
+    return slot_day[days % window] == days
+
+
+def ingest_reviews(state, reviews, category):
+    """
+    새 리뷰를 링 버퍼/토큰 Counter에 반영 (O(새 리뷰 수))
+
+    Args:
+        state: 탐지 상태
+        reviews: product_id, date, label, tokens 컬럼 DataFrame
+        category: 카테고리 파일 이름
+
+    Returns:
+        int: 반영한 리뷰 수
+    """
+    if len(reviews) == 0:
+        return 0
+    parsed = pd.to_datetime(reviews["date"], errors="coerce").to_numpy(dtype="datetime64[D]")
+    valid = ~np.isnat(parsed)
+    if not valid.any():
+        return 0
+    reviews = reviews[valid]
+    days = (parsed[valid] - _EPOCH).astype(np.int64)
+
+    keep = _advance_ring(state, days)
+    reviews, days = reviews[keep], days[keep]
+    if len(reviews) == 0:
+        return 0
+
+    rows = _ensure_rows(state, reviews["product_id"].tolist(), category)
+    slots = days % state["window_days"]
+    negative = (reviews["label"] == 0).to_numpy()
+    np.add.at(state["total"], (rows, slots), 1)
+    np.add.at(state["negative"], (rows[negative], slots[negative]), 1)
+
+    token_lists = reviews["tokens"].to_numpy()
+    for row, slot, tokens in zip(rows[negative], slots[negative], token_lists[negative]):
+        if tokens is None or len(tokens) == 0:
+            continue
+        state["tokens"].setdefault(int(row), {}).setdefault(int(slot), Counter()).update(tokens)
+
+    first_day = int(days.min())
+    if state["first_day"] is None or first_day < state["first_day"]:
+        state["first_day"] = first_day
+    return len(reviews)
+
+
+def _new_category_reviews(review_file, watermark):
+    """카테고리 파티션에서 watermark 이후 리뷰만 읽기 (watermark 날짜의 이미 본 리뷰는 제외)"""
+    columns = ["product_id", "review_id", "date", "label", "tokens"]
+    filters = [("date", ">=", watermark["date"])] if watermark else None
+    df = pq.read_table(review_file, columns=columns, filters=filters).to_pandas()
+    if watermark and len(df):
+        seen = set(map(tuple, watermark["seen"]))
+        keys = list(zip(df["product_id"], df["review_id"]))
+        df = df[[key not in seen for key in keys]]
+    return df
+
+
+def update_surge_state(
+    changed_categories=None,
+    dataset_path=REVIEW_DATASET_PATH,
+    state_path=SURGE_STATE_PATH,
+):
+    """
+    새 리뷰를 탐지 상태에 반영하고 저장 (main.py 마지막 단계)
+
+    Args:
+        changed_categories: 새 리뷰가 있을 수 있는 카테고리 (None이면 전체 파티션 확인)
+                            - watermark가 없는 카테고리는 항상 처음부터 반영
+        dataset_path: 리뷰 데이터셋 디렉토리
+        state_path: 상태 파일 경로
+
+    Returns:
+        tuple: (상태, {카테고리: 반영한 리뷰 수})
+    """
+    state = load_surge_state(state_path)
+    partitions = list_review_partitions(dataset_path)
+    if changed_categories is None:
+        targets = set(partitions)
+    else:
+        targets = {unicodedata.normalize("NFC", str(c)) for c in changed_categories}
+        targets |= {c for c in partitions if c not in state["watermarks"]}
+
+    ingested = {}
+    for category in sorted(targets):
+        if category not in partitions:
+            continue
+        review_file = os.path.join(partitions[category], REVIEW_PART_FILE)
+        if not os.path.exists(review_file):
+            continue
+        watermark = state["watermarks"].get(category)
+        df = _new_category_reviews(review_file, watermark)
+        ingested[category] = ingest_reviews(state, df, category)
+
+        # watermark 갱신: 가장 최근 날짜와 그 날짜에 본 리뷰 키
+        dates = df["date"].dropna()
+        if len(dates):
+            last_date = dates.max()
+            last = df[df["date"] == last_date]
+            seen = list(zip(last["product_id"], last["review_id"].astype(int)))
+            if watermark and watermark["date"] == last_date:
+                seen = list(map(tuple, watermark["seen"])) + seen
+            state["watermarks"][category] = {"date": last_date, "seen": seen}
+        elif watermark is None:
+            state["watermarks"][category] = None
+
+    save_surge_state(state, state_path)
+    return state, ingested
+
+
+def _window_masks(state, recent_days):
+    """(최근 구간 칸 마스크, 비교 구간 칸 마스크, 비교 구간 일수, 기준일)"""
+    slot_day = state["slot_day"]
+    as_of = int(slot_day.max())
+    window = state["window_days"]
+    recent = (slot_day > as_of - recent_days) & (slot_day >= 0)
+    baseline = (slot_day <= as_of - recent_days) & (slot_day > as_of - window) & (slot_day >= 0)
+    first_day = state["first_day"] if state["first_day"] is not None else as_of
+    baseline_days = max(0, min(window - recent_days, as_of - recent_days - first_day + 1))
+    return recent, baseline, baseline_days, as_of
+
+
+def _surge_scores(recent_negative, recent_total, base_negative, base_total, prior_ratio, prior_reviews):
+    """
+    이항 모형 급증 점수
+
+    - 이전 부정 비율 p0 = (이전 부정 + prior_reviews × 상위 비율) / (이전 리뷰 + prior_reviews)
+    - 기대 부정 수 = 최근 리뷰 수 × p0, z = (관측 - 기대) / sqrt(기대 × (1 - p0) + 1)
+
+    Returns:
+        tuple: (기대 부정 수, z 점수)
+    """
+    p0 = (base_negative + prior_reviews * prior_ratio) / (base_total + prior_reviews)
+    expected = recent_total * p0
+    z = (recent_negative - expected) / np.sqrt(expected * (1.0 - p0) + 1.0)
+    return expected, z
+
+
+def _spike_keywords(counters, recent_slots, baseline_slots, scale, top_n):
+    """최근 구간 부정 토큰 수 - 비교 구간 기대 토큰 수가 큰 순"""
+    recent = Counter()
+    baseline = Counter()
+    for slots in counters:
+        for slot, counter in slots.items():
+            if slot in recent_slots:
+                recent.update(counter)
+            elif slot in baseline_slots:
+                baseline.update(counter)
+    excess = {word: count - baseline.get(word, 0) * scale for word, count in recent.items()}
+    top = sorted(excess.items(), key=lambda item: -item[1])[:top_n]
+    return [{"word": word, "count": recent[word], "excess": round(value, 2)} for word, value in top if value > 0]
+
+
+def detect_surges(
+    state,
+    recent_days=SURGE_RECENT_DAYS,
+    z_threshold=SURGE_Z_THRESHOLD,
+    min_negative=SURGE_MIN_NEGATIVE,
+    min_lift=SURGE_MIN_LIFT,
+    prior_reviews=SURGE_PRIOR_REVIEWS,
+    top_keywords=SURGE_TOP_KEYWORDS,
+):
+    """
+    상품/카테고리 단위 부정 리뷰 급증 탐지
+
+    Returns:
+        list: [{"level", "key", "as_of", "recent_negative", "expected_negative", "z",
+                "recent_total", "negative_ratio", "baseline_ratio", "keywords"}, ...] (z 내림차순)
+    """
+    if len(state["products"]) == 0 or state["slot_day"].max() < 0:
+        return []
+
+    recent, baseline, baseline_days, as_of = _window_masks(state, recent_days)
+    if baseline_days == 0:
+        return []
+    recent_slots = set(np.flatnonzero(recent).tolist())
+    baseline_slots = set(np.flatnonzero(baseline).tolist())
+    scale = recent_days / baseline_days
+
+    categories, category_codes = np.unique(np.asarray(state["categories"], dtype=object), return_inverse=True)
+    category_total = np.array([state["total"][category_codes == c].sum(axis=0) for c in range(len(categories))])
+    category_negative = np.array([state["negative"][category_codes == c].sum(axis=0) for c in range(len(categories))])
+
+    # 상위 단위 이전 부정 비율 (상품 → 카테고리, 카테고리 → 전체)
+    category_base_ratio = category_negative[:, baseline].sum(axis=1) / np.maximum(
+        category_total[:, baseline].sum(axis=1), 1
+    )
+    global_base_ratio = category_negative[:, baseline].sum() / max(category_total[:, baseline].sum(), 1)
+    levels = {
+        "product": (
+            state["total"],
+            state["negative"],
+            np.asarray(state["products"], dtype=object),
+            category_base_ratio[category_codes],
+        ),
+        "category": (category_total, category_negative, categories, global_base_ratio),
+    }
+
+    alerts = []
+    for level, (total, negative, keys, prior_ratio) in levels.items():
+        recent_negative = negative[:, recent].sum(axis=1)
+        recent_total = total[:, recent].sum(axis=1)
+        base_negative = negative[:, baseline].sum(axis=1)
+        base_total = total[:, baseline].sum(axis=1)
+        expected, z = _surge_scores(
+            recent_negative, recent_total, base_negative, base_total, prior_ratio, prior_reviews
+        )
+        hits = np.flatnonzero(
+            (recent_negative >= min_negative)
+            & (z >= z_threshold)
+            & (recent_negative >= min_lift * expected)
+        )
+        for i in hits:
+            if level == "product":
+                counters = [state["tokens"].get(int(i), {})]
+            else:
+                counters = [state["tokens"].get(int(r), {}) for r in np.flatnonzero(category_codes == i)]
+            alerts.append(
+                {
+                    "level": level,
+                    "key": str(keys[i]),
+                    "as_of": str(_EPOCH + np.timedelta64(as_of, "D")),
+                    "recent_negative": int(recent_negative[i]),
+                    "expected_negative": round(float(expected[i]), 2),
+                    "z": round(float(z[i]), 2),
+                    "recent_total": int(recent_total[i]),
+                    "negative_ratio": round(float(recent_negative[i] / max(recent_total[i], 1)), 4),
+                    "baseline_ratio": round(float(base_negative[i] / max(base_total[i], 1)), 4),
+                    "keywords": _spike_keywords(counters, recent_slots, baseline_slots, scale, top_keywords),
+                }
+            )
+
+    alerts.sort(key=lambda a: -a["z"])
+    return alerts
+
+
+def run_surge_detection(
+    changed_categories=None,
+    dataset_path=REVIEW_DATASET_PATH,
+    state_path=SURGE_STATE_PATH,
+    alerts_path=SURGE_ALERTS_PATH,
+):
+    """
+    새 리뷰 반영 → 급증 탐지 → 경고 JSON 저장
+
+    Returns:
+        dict: {"ingested": 반영한 리뷰 수, "alerts": 경고 리스트}
+    """
+    state, ingested = update_surge_state(changed_categories, dataset_path, state_path)
+    alerts = detect_surges(state)
+    os.makedirs(os.path.dirname(alerts_path) or ".", exist_ok=True)
+    with open(alerts_path, "w", encoding="utf-8") as f:
+        json.dump(alerts, f, ensure_ascii=False, indent=2)
+    return {"ingested": sum(ingested.values()), "alerts": alerts}
@@ -0,0 +1,338 @@
+"""
+리뷰 일별 시계열 큐브 (수요 예측용 상품 × 일 리뷰 수 / 평점)
+
+- 리뷰 데이터셋에서 (상품, 날짜, 평점) 3개 컬럼만 읽어 한 번의 bincount로 집계
+- 평점별 리뷰 수를 (5, 상품 수, 일 수) uint16 배열 하나로 저장
+  → 리뷰 수 = 평점별 합, 평균 평점 = Σ(평점 × 수) / 리뷰 수, 부정 리뷰 수 = 1~2점 합
+- 카테고리 파티션 단위 증분 갱신: 다시 쓴 파티션(또는 기록된 mtime이 달라진 파티션)의
+  상품 행만 다시 계산하고 나머지 행은 기존 큐브에서 복사 (날짜 축은 필요한 만큼 확장)
+- 카테고리/상품 단위, 일/주/월 단위 롤업은 큐브만 사용 (리뷰 재스캔 없음)
+
+저장 구조:
+    data/processed_data/review_timeseries/meta.json            (start_date, n_days, 파티션별 mtime)
+    data/processed_data/review_timeseries/products.parquet     (행 순서의 product_id, category_file)
+    data/processed_data/review_timeseries/score_counts.npy     (5, 상품 수, 일 수) uint16
+"""
+
+import os
+import json
+import unicodedata
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from parquet_store import REVIEW_PART_FILE, list_review_partitions
+
+REVIEW_DATASET_PATH = "./data/processed_data/integrated_reviews_detail"
+REVIEW_TIMESERIES_DIR = "./data/processed_data/review_timeseries"
+
+TIMESERIES_SCORES = (1, 2, 3, 4, 5)
+NEGATIVE_SCORES = (1, 2)  # label 0 (부정) 기준과 동일
+TIMESERIES_VALUES = ("count", "mean_score", "negative")
+
+# 상품/날짜 단위 롤업 주기 → pandas Period 주기
+ROLLUP_FREQS = {"D": "D", "W": "W", "M": "M"}
+
+_EPOCH = np.datetime64("1970-01-01", "D")
+
+_cube_cache = {}
+
+
+def _day_numbers(dates):
+    """날짜 문자열 배열 → 1970-01-01 기준 일 번호 (파싱 실패는 -1)"""
+    parsed = pd.to_datetime(pd.Series(dates), errors="coerce")
+    days = parsed.to_numpy(dtype="datetime64[D]")
+    out = np.full(len(days), -1, dtype=np.int64)
+    valid = ~np.isnat(days)
+    out[valid] = (days[valid] - _EPOCH).astype(np.int64)
+    return out
+
+
+def _category_block(review_file):
+    """
+    카테고리 파티션 하나 → (product_ids, 시작 일 번호, (5, 상품 수, 일 수) 평점별 리뷰 수)
+
+    - product_id × 일 × 평점을 평탄화한 인덱스 하나로 np.bincount (한 번의 벡터화 패스)
+    """
+    table = pq.read_table(review_file, columns=["product_id", "score", "date"])
+    product_ids, product_codes = np.unique(
+        np.asarray(table.column("product_id").to_pylist(), dtype=object),
+        return_inverse=True,
+    )
+    scores = pd.to_numeric(
+        pd.Series(table.column("score").to_pylist()), errors="coerce"
+    ).to_numpy()
+    days = _day_numbers(table.column("date").to_pylist())
+
+    valid = (days >= 0) & np.isin(scores, TIMESERIES_SCORES)
+    if not valid.any():
+        return product_ids, None, np.zeros((len(TIMESERIES_SCORES), len(product_ids), 0), dtype=np.uint16)
+
+    days = days[valid]
+    start = int(days.min())
+    n_days = int(days.max()) - start + 1
+    score_codes = scores[valid].astype(np.int64) - TIMESERIES_SCORES[0]
+    flat = (score_codes * len(product_ids) + product_codes[valid]) * n_days + (days - start)
+    counts = np.bincount(flat, minlength=len(TIMESERIES_SCORES) * len(product_ids) * n_days)
+    if counts.max(initial=0) > np.iinfo(np.uint16).max:
+        print("[경고] 상품 하루 리뷰 수가 uint16 범위를 넘어 잘립니다.")
+    counts = np.minimum(counts, np.iinfo(np.uint16).max).astype(np.uint16)
+    return product_ids, start, counts.reshape(len(TIMESERIES_SCORES), len(product_ids), n_days)
+
+
+def _read_meta(ts_dir):
+    meta_path = os.path.join(ts_dir, "meta.json")
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def update_review_timeseries(
+    changed_categories=(),
+    dataset_path=REVIEW_DATASET_PATH,
+    ts_dir=REVIEW_TIMESERIES_DIR,
+):
+    """
+    리뷰 시계열 큐브 증분 갱신 (main.py 마지막 단계)
+
+    Args:
+        changed_categories: 이번 실행에서 다시 쓴 리뷰 파티션의 카테고리
+        dataset_path: 리뷰 데이터셋 디렉토리
+        ts_dir: 큐브 저장 디렉토리
+
+    Returns:
+        dict: {"updated": [카테고리], "removed": [카테고리], "products", "start_date", "n_days"}
+              - 리뷰 데이터셋이 없으면 None
+    """
+    partitions = {
+        category: os.path.join(path, REVIEW_PART_FILE)
+        for category, path in list_review_partitions(dataset_path).items()
+        if os.path.exists(os.path.join(path, REVIEW_PART_FILE))
+    }
+    if not partitions:
+        print(f"[오류] 리뷰 데이터셋이 없습니다: {dataset_path}")
+        return None
+
+    meta = _read_meta(ts_dir) or {"partitions": {}}
+    recorded = meta.get("partitions", {})
+    changed = {unicodedata.normalize("NFC", str(c)) for c in changed_categories}
+    targets = sorted(
+        category
+        for category, review_file in partitions.items()
+        if category in changed or recorded.get(category) != os.path.getmtime(review_file)
+    )
+    removed = sorted(c for c in recorded if c not in partitions)
+
+    old = load_review_timeseries(ts_dir) if meta.get("n_days") is not None else None
+    if old is not None and not targets and not removed:
+        return {
+            "updated": [],
+            "removed": [],
+            "products": len(old["products"]),
+            "start_date": meta["start_date"],
+            "n_days": meta["n_days"],
+        }
+
+    # 새로 계산할 카테고리 블록
+    blocks = []  # (category, product_ids, 시작 일 번호, 배열)
+    for category in targets:
+        product_ids, start, counts = _category_block(partitions[category])
+        blocks.append((category, product_ids, start, counts))
+
+    # 기존 큐브에서 유지할 행 (갱신/제거 대상이 아닌 카테고리)
+    kept_rows = np.empty(0, dtype=np.int64)
+    old_start = None
+    if old is not None:
+        drop = set(targets) | set(removed)
+        kept_rows = np.flatnonzero(~old["products"]["category_file"].isin(drop).to_numpy())
+        old_start = int(meta["start_day"])
+
+    # 새 날짜 축 = 유지 행과 새 블록을 모두 포함하는 구간
+    spans = [(s, s + c.shape[2]) for _, _, s, c in blocks if s is not None]
+    if len(kept_rows) and meta["n_days"]:
+        spans.append((old_start, old_start + meta["n_days"]))
+    start = min((s for s, _ in spans), default=0)
+    end = max((e for _, e in spans), default=0)
+    n_days = end - start
+
+    # 새 행 순서: (category_file, product_id) 정렬 / 출처: -1 = 기존 큐브, b = blocks[b]
+    rows = [
+        (old["products"]["category_file"].iat[r], old["products"]["product_id"].iat[r], -1, r)
+        for r in kept_rows
+    ]
+    for b, (category, product_ids, _, _) in enumerate(blocks):
+        rows.extend((category, pid, b, i) for i, pid in enumerate(product_ids))
+    rows.sort(key=lambda row: (row[0], row[1]))
+    sources = np.asarray([row[2] for row in rows], dtype=np.int64)
+    source_rows = np.asarray([row[3] for row in rows], dtype=np.int64)
+
+    cube = np.zeros((len(TIMESERIES_SCORES), len(rows), n_days), dtype=np.uint16)
+    dst = np.flatnonzero(sources == -1)
+    if len(dst):
+        offset = old_start - start
+        cube[:, dst, offset : offset + meta["n_days"]] = old["score_counts"][:, source_rows[dst], :]
+    for b, (_, _, block_start, counts) in enumerate(blocks):
+        dst = np.flatnonzero(sources == b)
+        if block_start is None or len(dst) == 0:
+            continue
+        offset = block_start - start
+        cube[:, dst, offset : offset + counts.shape[2]] = counts[:, source_rows[dst], :]
+
+    # 저장 (기존 큐브 mmap을 먼저 해제하고 임시 파일에 쓴 뒤 교체)
+    old = None
+    _cube_cache.clear()
+    os.makedirs(ts_dir, exist_ok=True)
+    tmp_path = os.path.join(ts_dir, "score_counts.tmp.npy")
+    np.save(tmp_path, cube)
+    os.replace(tmp_path, os.path.join(ts_dir, "score_counts.npy"))
+    pq.write_table(
+        pa.table(
+            {
+                "product_id": pa.array([row[1] for row in rows], type=pa.string()),
+                "category_file": pa.array([row[0] for row in rows], type=pa.string()),
+            }
+        ),
+        os.path.join(ts_dir, "products.parquet"),
+    )
+    start_date = str(_EPOCH + np.timedelta64(start, "D"))
+    meta = {
+        "start_day": int(start),
+        "start_date": start_date,
+        "n_days": int(n_days),
+        "n_products": len(rows),
+        "scores": list(TIMESERIES_SCORES),
+        "partitions": {c: os.path.getmtime(f) for c, f in partitions.items()},
+    }
+    with open(os.path.join(ts_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+
+    return {
+        "updated": targets,
+        "removed": removed,
+        "products": len(rows),
+        "start_date": start_date,
+        "n_days": int(n_days),
+    }
+
+
+def load_review_timeseries(ts_dir=REVIEW_TIMESERIES_DIR):
+    """
+    리뷰 시계열 큐브 로드 (score_counts는 mmap, meta.json mtime 기준 캐시)
+
+    Returns:
+        dict: {
+            "meta": meta.json,
+            "products": product_id / category_file DataFrame (행 순서 = 큐브 행 순서),
+            "row_of": {product_id: 행 번호},
+            "dates": 날짜 축 DatetimeIndex,
+            "score_counts": (5, 상품 수, 일 수) uint16,
+        }
+        - 큐브가 없으면 None
+    """
+    meta_path = os.path.join(ts_dir, "meta.json")
+    if not os.path.exists(meta_path):
+        return None
+
+    key = (os.path.abspath(meta_path), os.path.getmtime(meta_path))
+    if key in _cube_cache:
+        return _cube_cache[key]
+
+    meta = _read_meta(ts_dir)
+    products = pq.read_table(os.path.join(ts_dir, "products.parquet")).to_pandas()
+    cube = {
+        "meta": meta,
+        "products": products,
+        "row_of": {pid: i for i, pid in enumerate(products["product_id"])},
+        "dates": pd.date_range(meta["start_date"], periods=meta["n_days"], freq="D"),
+        "score_counts": np.load(os.path.join(ts_dir, "score_counts.npy"), mmap_mode="r"),
+    }
+    _cube_cache.clear()
+    _cube_cache[key] = cube
+    return cube
+
+
+def _group_boundaries(labels):
+    """정렬된 라벨 배열에서 그룹 시작 위치와 그룹 라벨"""
+    labels = np.asarray(labels)
+    if len(labels) == 0:
+        return np.empty(0, dtype=np.int64), labels
+    starts = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]])
+    return starts, labels[starts]
+
+
+def timeseries_rollup(level="category", freq="M", keys=None, value="count", cube=None):
+    """
+    큐브에서 카테고리/상품 단위 × 일/주/월 단위 시계열 집계 (리뷰 재스캔 없음)
+
+    Args:
+        level: "category", "product", "all"
+        freq: "D"(일), "W"(주), "M"(월)
+        keys: 포함할 카테고리 또는 product_id 리스트 (None이면 전체)
+        value: "count"(리뷰 수), "mean_score"(평균 평점), "negative"(부정 리뷰 수)
+        cube: load_review_timeseries() 결과 (None이면 기본 경로에서 로드)
+
+    Returns:
+        DataFrame: index = 기간 시작일, columns = 카테고리/product_id (level="all"이면 "all")
+                   - 큐브가 없으면 None
+    """
+    if level not in ("category", "product", "all"):
+        raise ValueError(f"지원하지 않는 level: {level}")
+    if freq not in ROLLUP_FREQS:
+        raise ValueError(f"지원하지 않는 freq: {freq} (D/W/M)")
+    if value not in TIMESERIES_VALUES:
+        raise ValueError(f"지원하지 않는 value: {value} {TIMESERIES_VALUES}")
+
+    cube = cube or load_review_timeseries()
+    if cube is None:
+        print(f"[오류] 리뷰 시계열 큐브가 없습니다: {REVIEW_TIMESERIES_DIR}")
+        return None
+    products = cube["products"]
+
+    # 1) 행 선택 (행은 category_file, product_id 순으로 정렬되어 있음)
+    if keys is None:
+        rows = np.arange(len(products))
+    elif level == "product":
+        normalized = [unicodedata.normalize("NFC", str(k)) for k in keys]
+        rows = np.asarray(sorted(cube["row_of"][k] for k in normalized if k in cube["row_of"]), dtype=np.int64)
+    else:
+        normalized = {unicodedata.normalize("NFC", str(k)) for k in keys}
+        rows = np.flatnonzero(products["category_file"].isin(normalized).to_numpy())
+
+    if level == "product":
+        row_starts = np.arange(len(rows))
+        columns = products["product_id"].to_numpy()[rows]
+    elif level == "category":
+        row_starts, columns = _group_boundaries(products["category_file"].to_numpy()[rows])
+    else:
+        row_starts, columns = np.zeros(1, dtype=np.int64), np.array(["all"])
+
+    # 2) 기간 경계 (날짜 축은 연속이므로 같은 기간은 연속 구간)
+    dates = cube["dates"]
+    if freq == "D":
+        day_starts, index = np.arange(len(dates)), dates
+    else:
+        periods = dates.to_period(ROLLUP_FREQS[freq])
+        day_starts, _ = _group_boundaries(periods.asi8)
+        index = periods[day_starts].to_timestamp()
+
+    if len(rows) == 0 or len(day_starts) == 0:
+        return pd.DataFrame(index=index, columns=list(columns) if len(rows) else [], dtype=float)
+
+    # 3) 평점 평면별 (그룹 × 기간) 합계
+    planes = np.asarray(cube["score_counts"][:, rows, :])
+    grouped = np.add.reduceat(planes, row_starts, axis=1, dtype=np.int64)
+    grouped = np.add.reduceat(grouped, day_starts, axis=2, dtype=np.int64)
+
+    counts = grouped.sum(axis=0)
+    if value == "count":
+        result = counts
+    elif value == "negative":
+        negative = [TIMESERIES_SCORES.index(s) for s in NEGATIVE_SCORES]
+        result = grouped[negative].sum(axis=0)
+    else:
+        weights = np.asarray(TIMESERIES_SCORES, dtype=np.float64)[:, None, None]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result = np.where(counts > 0, (grouped * weights).sum(axis=0) / counts, np.nan)
+
+    return pd.DataFrame(result.T, index=index, columns=list(columns))
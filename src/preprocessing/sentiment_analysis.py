@@ -3,26 +3,25 @@
 """
 
 import math
+import heapq
 from collections import Counter, defaultdict
+from functools import partial
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from skintype import TYPE_KEYWORDS, get_keyword_matcher
 
-# 피부 타입 키워드
-SKIN_TYPES = {
-    "건성": ["건성"],
-    "지성": ["지성", "지성인"],
-    "복합성": ["복합", "복합성"],
-    "민감성": ["민감", "민감성"],
-    "여드름성": ["여드름", "여드름성"],
-}
+# 피부 타입 키워드 (skintype.TYPE_KEYWORDS와 같은 사전 → 같은 컴파일 매처 공유)
+SKIN_TYPES = TYPE_KEYWORDS
 
 
 def detect_skin_types(tokens):
-    """토큰 리스트에서 피부 타입 감지"""
-    token_set = set(tokens)
-    found = []
-    for skin, keys in SKIN_TYPES.items():
-        if any(k in token_set for k in keys):
-            found.append(skin)
-    return found
+    """토큰 리스트에서 피부 타입 감지 (키워드 토큰 → 타입 사전 조회, SKIN_TYPES 순서)"""
+    token_weights = get_keyword_matcher(SKIN_TYPES)["token_weights"]
+    hits = set()
+    for tok in set(tokens) & token_weights.keys():
+        hits.update(token_weights[tok])
+    return [skin for skin in SKIN_TYPES if skin in hits]
 
 
 def normalize_tfidf(tfidf):
@@ -39,206 +38,614 @@ def normalize_tfidf(tfidf):
     return {}
 
 
-def analyze_skin_type_frequency(reviews, top_n=20):
+class SpaceSavingCounter:
     """
-    피부 타입별 단어 빈도 분석
+    Space-Saving top-k 스케치 (메모리 상한이 있는 근사 단어 빈도 카운터)
+
+    - 최대 capacity개 단어만 유지하고, 가득 차면 최소 빈도 단어를 새 단어로 교체
+    - 실제 빈도가 (전체 빈도 / capacity)보다 큰 단어는 항상 남아 있음
+    - 추정 빈도는 실제 이상이며, 과대 추정 상한은 errors[단어]
+    - Counter와 같은 update / most_common 인터페이스
+    """
+
+    def __init__(self, capacity=5000):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self._heap = []  # (빈도, 단어) - 갱신 전 항목은 꺼낼 때 무시
+
+    def _pop_min(self):
+        while True:
+            count, word = heapq.heappop(self._heap)
+            if self.counts.get(word) == count:
+                return count, word
+
+    def _add(self, word, count):
+        counts = self.counts
+        if word in counts:
+            counts[word] += count
+        elif len(counts) < self.capacity:
+            counts[word] = count
+            self.errors[word] = 0
+        else:
+            min_count, min_word = self._pop_min()
+            del counts[min_word]
+            del self.errors[min_word]
+            counts[word] = min_count + count
+            self.errors[word] = min_count
+        heapq.heappush(self._heap, (counts[word], word))
+
+        # 무효 항목이 쌓이면 힙 재구성
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(c, w) for w, c in counts.items()]
+            heapq.heapify(self._heap)
+
+    def update(self, items):
+        """토큰 iterable 또는 {단어: 빈도} 매핑을 반영"""
+        if not hasattr(items, "items"):
+            items = Counter(items)
+        for word, count in items.items():
+            self._add(word, count)
+
+    def error_bound(self):
+        """추정 빈도의 과대 추정 상한 (가득 찼을 때 최소 빈도, 전체 빈도 / capacity 이하)"""
+        if len(self.counts) < self.capacity:
+            return 0
+        return min(self.counts.values())
+
+    def most_common(self, n=None):
+        ranked = sorted(self.counts.items(), key=lambda x: x[1], reverse=True)
+        return ranked if n is None else ranked[:n]
+
+    def items(self):
+        return self.counts.items()
+
+    def __len__(self):
+        return len(self.counts)
+
+
+def analyze_skin_type_frequency(reviews, top_n=20, sketch_capacity=None):
+    """
+    피부 타입별 단어 빈도 분석 (피부 타입별 카운터에 리뷰 단위로 누적)
 
     Args:
-        reviews: 리뷰 리스트 (각 리뷰는 'tokens' 필드 포함)
+        reviews: 리뷰 iterable (각 리뷰는 'tokens' 필드 포함)
+                 - 리스트뿐 아니라 Parquet 스트리밍 스캔 제너레이터도 가능
         top_n: 상위 N개 단어
+        sketch_capacity: 지정하면 피부 타입별 Space-Saving 스케치 사용 (메모리 상한)
 
     Returns:
         dict: {피부타입: [(단어, 빈도), ...]}
     """
-    skin_type_tokens = defaultdict(list)
+    skin_type_counts = update_skin_type_counts(
+        init_skin_type_counts(sketch_capacity), reviews
+    )
+    return skin_type_counts_to_top(skin_type_counts, top_n=top_n)
+
+
+def init_skin_type_counts(sketch_capacity=None):
+    """
+    피부 타입별 단어 빈도 누적 카운터
+
+    Args:
+        sketch_capacity: None이면 {피부타입: Counter} (정확한 빈도)
+                         지정하면 {피부타입: SpaceSavingCounter} (단어 수 상한)
+    """
+    if sketch_capacity is None:
+        return defaultdict(Counter)
+    return defaultdict(partial(SpaceSavingCounter, sketch_capacity))
 
+
+def update_skin_type_counts(skin_type_counts, reviews):
+    """
+    리뷰 묶음의 토큰을 피부 타입별 카운터에 누적 (토큰 리스트를 이어 붙이지 않음)
+
+    Args:
+        skin_type_counts: init_skin_type_counts()로 만든 카운터
+        reviews: 리뷰 iterable (tokens 필드 포함)
+
+    Returns:
+        dict: 갱신된 skin_type_counts
+    """
     for review in reviews:
         tokens = review.get("tokens", [])
         if not isinstance(tokens, list) or not tokens:
             continue
 
         skin_types = detect_skin_types(tokens)
+        if not skin_types:
+            continue
+
+        # 리뷰 내 빈도는 한 번만 계산해 해당 피부 타입 카운터에 모두 반영
+        token_freq = Counter(tokens)
         for skin in skin_types:
-            skin_type_tokens[skin].extend(tokens)
+            skin_type_counts[skin].update(token_freq)
+
+    return skin_type_counts
 
-    result = {}
-    for skin, all_tokens in skin_type_tokens.items():
-        result[skin] = Counter(all_tokens).most_common(top_n)
 
-    return result
+def merge_skin_type_counts(skin_type_counts, other):
+    """
+    피부 타입별 부분 카운터(워커/파일 단위)를 누적 카운터에 합산
+
+    Returns:
+        dict: 갱신된 skin_type_counts
+    """
+    for skin, counter in other.items():
+        skin_type_counts[skin].update(counter)
+    return skin_type_counts
 
 
-def sentiment_tfidf_diff(reviews, top_n=30, min_doc_freq=20):
+def skin_type_counts_to_top(skin_type_counts, top_n=20):
     """
-    감성 특화 키워드 추출 (토큰 빈도 기반)
+    누적 카운터에서 피부 타입별 상위 단어 추출
 
-    score = (긍정 평균 빈도 - 부정 평균 빈도) * log1p(pos_n + neg_n)
+    Returns:
+        dict: {피부타입: [(단어, 빈도), ...]}
+    """
+    return {
+        skin: counter.most_common(top_n) for skin, counter in skin_type_counts.items()
+    }
+
+
+def skin_type_counts_error_bound(skin_type_counts):
+    """
+    피부 타입별 빈도 과대 추정 상한 (정확한 Counter면 0)
+
+    Returns:
+        dict: {피부타입: 상한}
+    """
+    return {
+        skin: counter.error_bound() if hasattr(counter, "error_bound") else 0
+        for skin, counter in skin_type_counts.items()
+    }
+
+
+# =========================
+# 감성 키워드 통계 (CSR 문서-단어 행렬 기반)
+# =========================
+
+_INITIAL_VOCAB_CAPACITY = 1024
+
+
+def init_sentiment_stats():
+    """
+    감성 키워드 분석용 누적 통계 (단어별 TF 합계/문서 수는 리뷰 단위로 더해지는 값)
+
+    - words/vocab: 단어 ID ↔ 단어 (배치마다 새 단어를 뒤에 추가)
+    - pos_sum/pos_cnt/neg_sum/neg_cnt: 단어 ID로 인덱싱되는 numpy 배열
+      (용량을 두 배씩 늘려 재할당 횟수를 줄이므로 유효 길이는 len(words))
+
+    Returns:
+        dict: 단어별 긍정/부정 TF 합계·문서 수 + 리뷰 수 카운터
+    """
+    return {
+        "words": [],
+        "vocab": {},
+        "pos_sum": np.zeros(_INITIAL_VOCAB_CAPACITY, dtype=np.float64),
+        "pos_cnt": np.zeros(_INITIAL_VOCAB_CAPACITY, dtype=np.int64),
+        "neg_sum": np.zeros(_INITIAL_VOCAB_CAPACITY, dtype=np.float64),
+        "neg_cnt": np.zeros(_INITIAL_VOCAB_CAPACITY, dtype=np.int64),
+        "review_count": 0,
+        "pos_count": 0,
+        "neg_count": 0,
+        "tokens_count": 0,
+    }
+
+
+def _ensure_vocab_capacity(stats, size):
+    """단어 수가 배열 용량을 넘으면 두 배씩 확장"""
+    capacity = len(stats["pos_sum"])
+    if size <= capacity:
+        return
+    while capacity < size:
+        capacity *= 2
+    for key in ("pos_sum", "pos_cnt", "neg_sum", "neg_cnt"):
+        grown = np.zeros(capacity, dtype=stats[key].dtype)
+        grown[: len(stats[key])] = stats[key]
+        stats[key] = grown
+
+
+def _to_global_ids(stats, words):
+    """배치 단어 리스트를 누적 통계의 단어 ID 배열로 변환 (새 단어는 vocab에 추가)"""
+    vocab = stats["vocab"]
+    stat_words = stats["words"]
+    ids = np.empty(len(words), dtype=np.int64)
+    for i, word in enumerate(words):
+        word_id = vocab.get(word)
+        if word_id is None:
+            word_id = len(stat_words)
+            vocab[word] = word_id
+            stat_words.append(word)
+        ids[i] = word_id
+    _ensure_vocab_capacity(stats, len(stat_words))
+    return ids
+
+
+def build_term_matrix(token_ids, offsets, n_words):
+    """
+    토큰 ID 배열로 CSR 문서-단어 빈도 행렬 생성
 
     Args:
-        reviews: 리뷰 리스트 (label, tokens 필드 포함)
-        top_n: 추출할 키워드 개수
-        min_doc_freq: 최소 문서 빈도
+        token_ids: 평탄화된 토큰 ID 배열 (리뷰 순서대로 이어 붙인 것)
+        offsets: 리뷰 i의 토큰은 token_ids[offsets[i]:offsets[i + 1]] (길이 n_reviews + 1)
+        n_words: 단어 ID 범위 (0 ~ n_words - 1)
 
     Returns:
-        tuple: (긍정 특화 키워드 리스트, 부정 특화 키워드 리스트)
+        tuple: (indptr, indices, counts) - 행 내부의 단어 ID는 오름차순
+    """
+    offsets = np.asarray(offsets, dtype=np.int64)
+    n_rows = len(offsets) - 1
+    lengths = np.diff(offsets)
+    rows = np.repeat(np.arange(n_rows, dtype=np.int64), lengths)
+
+    # (행, 단어) 쌍을 하나의 키로 만들어 중복 집계 → 행 우선 정렬된 CSR 항목
+    keys = rows * n_words + np.asarray(token_ids, dtype=np.int64)
+    keys, counts = np.unique(keys, return_counts=True)
+    entry_rows = keys // n_words
+    indices = keys - entry_rows * n_words
+
+    indptr = np.zeros(n_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(entry_rows, minlength=n_rows), out=indptr[1:])
+    return indptr, indices, counts
+
+
+def update_sentiment_stats_from_csr(
+    stats, indptr, indices, weights, labels, words, token_counts=None
+):
+    """
+    CSR 리뷰×단어 가중치 행렬(TF 또는 TF-IDF)을 누적 통계에 반영
+
+    Args:
+        stats: init_sentiment_stats()로 만든 누적 통계
+        indptr, indices, weights: 리뷰 i의 항목은 indptr[i]:indptr[i + 1]
+        labels: 리뷰별 라벨 배열 (1=긍정, 0=부정, 그 외=중립/없음)
+        words: 단어 ID(indices 값) → 단어 리스트
+        token_counts: 리뷰별 토큰 수 (None이면 행의 항목 수로 토큰 유무 판단)
+
+    Returns:
+        dict: 갱신된 stats
+    """
+    labels = np.asarray(labels)
+    indptr = np.asarray(indptr, dtype=np.int64)
+    row_nnz = np.diff(indptr)
+    is_pos = labels == 1
+    is_neg = labels == 0
+    if token_counts is None:
+        token_counts = row_nnz
+
+    stats["review_count"] += len(labels)
+    stats["pos_count"] += int(is_pos.sum())
+    stats["neg_count"] += int(is_neg.sum())
+    stats["tokens_count"] += int((np.asarray(token_counts) > 0).sum())
+
+    if len(indices) == 0 or not (is_pos | is_neg).any():
+        return stats
+
+    # 배치에 등장한 단어만 압축 (전역 vocab 크기와 무관하게 항목 수에 비례)
+    cols, local_ids = np.unique(indices, return_inverse=True)
+    n_local = len(cols)
+    entry_rows = np.repeat(np.arange(len(row_nnz)), row_nnz)
+    weights = np.asarray(weights, dtype=np.float64)
+
+    # 라벨별 열 합계 (가중치 합계, 문서 수) - bincount는 리뷰 순서대로 더함
+    pos_entries = is_pos[entry_rows]
+    neg_entries = is_neg[entry_rows]
+    pos_idx, neg_idx = local_ids[pos_entries], local_ids[neg_entries]
+    pos_sum = np.bincount(pos_idx, weights=weights[pos_entries], minlength=n_local)
+    pos_cnt = np.bincount(pos_idx, minlength=n_local)
+    neg_sum = np.bincount(neg_idx, weights=weights[neg_entries], minlength=n_local)
+    neg_cnt = np.bincount(neg_idx, minlength=n_local)
+
+    # 긍정/부정 리뷰에 등장한 단어만 누적 통계 vocab에 추가
+    seen = np.flatnonzero((pos_cnt > 0) | (neg_cnt > 0))
+    global_ids = _to_global_ids(stats, [words[cols[i]] for i in seen])
+    stats["pos_sum"][global_ids] += pos_sum[seen]
+    stats["pos_cnt"][global_ids] += pos_cnt[seen]
+    stats["neg_sum"][global_ids] += neg_sum[seen]
+    stats["neg_cnt"][global_ids] += neg_cnt[seen]
+    return stats
+
+
+def update_sentiment_stats_from_ids(stats, token_ids, offsets, labels, words):
+    """
+    토큰 ID 배열(예: Arrow dictionary 인코딩 결과)을 누적 통계에 반영 (가중치 = TF)
+
+    Args:
+        stats: init_sentiment_stats()로 만든 누적 통계
+        token_ids: 평탄화된 토큰 ID 배열
+        offsets: 리뷰별 토큰 구간 (길이 n_reviews + 1)
+        labels: 리뷰별 라벨 배열 (1=긍정, 0=부정, 그 외=중립/없음)
+        words: 토큰 ID → 단어 리스트
+
+    Returns:
+        dict: 갱신된 stats
+    """
+    offsets = np.asarray(offsets, dtype=np.int64)
+    lengths = np.diff(offsets)
+
+    # 리뷰별 TF = 단어 빈도 / 리뷰 토큰 수 (CSR 항목 단위)
+    indptr, indices, counts = build_term_matrix(token_ids, offsets, max(len(words), 1))
+    entry_rows = np.repeat(np.arange(len(lengths)), np.diff(indptr))
+    tf = counts / lengths[entry_rows]
+
+    return update_sentiment_stats_from_csr(
+        stats, indptr, indices, tf, labels, words, token_counts=lengths
+    )
+
+
+def encode_token_lists(token_lists):
+    """
+    토큰 리스트들을 (토큰 ID 배열, offsets, 단어 리스트)로 변환 (Arrow dictionary 인코딩)
+
+    Args:
+        token_lists: list<string> Arrow 배열/ChunkedArray 또는 토큰 리스트의 리스트
+
+    Returns:
+        tuple: (token_ids, offsets, words)
+    """
+    if isinstance(token_lists, pa.ChunkedArray):
+        token_lists = token_lists.combine_chunks()
+    elif not isinstance(token_lists, pa.Array):
+        token_lists = pa.array(token_lists, type=pa.list_(pa.string()))
+
+    # null 리스트는 빈 리스트로 취급 (offsets 기준 길이 0)
+    offsets = token_lists.offsets.to_numpy().astype(np.int64)
+    offsets = offsets - offsets[0]
+    encoded = pc.dictionary_encode(token_lists.flatten())
+    token_ids = encoded.indices.to_numpy(zero_copy_only=False)
+    words = encoded.dictionary.to_pylist()
+    return token_ids, offsets, words
+
+
+def term_frequency_matrix(token_lists):
+    """
+    토큰 리스트들을 리뷰별 TF CSR로 변환 (tf = 단어 빈도 / 리뷰 토큰 수)
+
+    Returns:
+        tuple: (indptr, indices, tf, words)
+    """
+    token_ids, offsets, words = encode_token_lists(token_lists)
+    indptr, indices, counts = build_term_matrix(token_ids, offsets, max(len(words), 1))
+    entry_rows = np.repeat(np.arange(len(offsets) - 1), np.diff(indptr))
+    return indptr, indices, counts / np.diff(offsets)[entry_rows], words
+
+
+def update_sentiment_stats(stats, reviews):
     """
-    pos_sum = defaultdict(float)
-    pos_cnt = defaultdict(int)
-    neg_sum = defaultdict(float)
-    neg_cnt = defaultdict(int)
+    리뷰 묶음을 누적 통계에 반영 (전체 리뷰를 메모리에 모으지 않고 점진적으로 집계)
+
+    Args:
+        stats: init_sentiment_stats()로 만든 누적 통계
+        reviews: 리뷰 리스트/iterable (label, tokens 필드 포함)
 
+    Returns:
+        dict: 갱신된 stats
+    """
+    labels = []
+    token_lists = []
     for review in reviews:
         label = review.get("label")
-        if label not in [0, 1]:
-            continue
+        labels.append(1 if label == 1 else 0 if label == 0 else -1)
 
-        # tokens에서 직접 빈도 계산
+        # 리스트가 아니거나 비어 있으면 토큰 없음으로 취급
         tokens = review.get("tokens", [])
-        if not isinstance(tokens, list) or not tokens:
-            continue
+        token_lists.append(tokens if isinstance(tokens, list) and tokens else [])
 
-        # 토큰별 빈도 계산 (TF)
-        token_freq = Counter(tokens)
-        total_tokens = len(tokens)
+    if not labels:
+        return stats
 
-        if label == 1:
-            for word, freq in token_freq.items():
-                tf = freq / total_tokens if total_tokens > 0 else 0
-                pos_sum[word] += tf
-                pos_cnt[word] += 1
-        else:
-            for word, freq in token_freq.items():
-                tf = freq / total_tokens if total_tokens > 0 else 0
-                neg_sum[word] += tf
-                neg_cnt[word] += 1
+    token_ids, offsets, words = encode_token_lists(token_lists)
+    return update_sentiment_stats_from_ids(
+        stats, token_ids, offsets, np.array(labels, dtype=np.int8), words
+    )
 
-    if not pos_sum and not neg_sum:
-        return [], []
 
-    # 전체 긍정/부정 리뷰 수 계산 (클래스 불균형 보정용)
-    total_pos = sum(1 for r in reviews if r.get("label") == 1)
-    total_neg = sum(1 for r in reviews if r.get("label") == 0)
+def merge_sentiment_stats(stats, other):
+    """
+    부분 통계(상품/카테고리/워커 결과)를 누적 통계에 합산
 
-    rows = []
-    for w in set(pos_sum.keys()) | set(neg_sum.keys()):
-        pc = pos_cnt.get(w, 0)
-        nc = neg_cnt.get(w, 0)
+    - TF 합계, 문서 수, 리뷰 수는 모두 더해지는 값이므로 리뷰를 다시 보지 않고 병합 가능
+    - other의 단어는 stats의 단어 ID로 다시 매핑
 
-        # 전체 support가 최소 빈도를 만족해야 함
-        support = pc + nc
-        if support < min_doc_freq:
-            continue
+    Returns:
+        dict: 갱신된 stats
+    """
+    for key in ("review_count", "pos_count", "neg_count", "tokens_count"):
+        stats[key] += other[key]
 
-        # 1. 문서 출현 비율 계산 (클래스 불균형 보정)
-        pos_rate = pc / total_pos if total_pos > 0 else 0
-        neg_rate = nc / total_neg if total_neg > 0 else 0
+    n_words = len(other["words"])
+    if n_words == 0:
+        return stats
 
-        # 2. 균형 잡힌 비율 (Balanced Ratio)
-        # 긍정에서 더 잘 나오면 양수, 부정에서 더 잘 나오면 음수
-        if (pos_rate + neg_rate) == 0:
-            balanced_ratio = 0
-        else:
-            balanced_ratio = (pos_rate - neg_rate) / (pos_rate + neg_rate)
+    global_ids = _to_global_ids(stats, other["words"])
+    for key in ("pos_sum", "pos_cnt", "neg_sum", "neg_cnt"):
+        stats[key][global_ids] += other[key][:n_words]
+    return stats
 
-        # 3. 평균 TF 차이
-        pos_mean = (pos_sum[w] / pc) if pc else 0.0
-        neg_mean = (neg_sum[w] / nc) if nc else 0.0
-        diff = pos_mean - neg_mean
-
-        # 4. 최종 점수: abs(diff)로 강도만 반영, balanced_ratio가 방향성 결정
-        # 이렇게 하면 음수 × 음수 = 양수가 되는 부호 반전 현상 방지
-        score = abs(diff) * math.log1p(support) * balanced_ratio
-
-        rows.append(
-            {
-                "word": w,
-                "diff": diff,
-                "pos_tfidf_mean": pos_mean,
-                "neg_tfidf_mean": neg_mean,
-                "pos_doc_count": pc,
-                "neg_doc_count": nc,
-                "support": support,
-                "balanced_ratio": balanced_ratio,
-                "score": score,
-            }
-        )
 
-    if not rows:
+def product_sentiment_stats(product):
+    """
+    상품 하나의 감성 부분 통계 (상품 리뷰를 한 번만 집계)
+
+    Returns:
+        dict: init_sentiment_stats() 형식의 통계
+    """
+    reviews = product.get("reviews", {}).get("data", [])
+    return update_sentiment_stats(init_sentiment_stats(), reviews)
+
+
+def update_sentiment_stats_from_table(stats, table):
+    """
+    Arrow 테이블(label, tokens 컬럼)을 누적 통계에 반영 (dict 변환 없음)
+
+    Returns:
+        dict: 갱신된 stats
+    """
+    if table.num_rows == 0:
+        return stats
+    labels = table.column("label").to_numpy(zero_copy_only=False)
+    labels = np.where(np.isnan(labels.astype(np.float64)), -1, labels).astype(np.int8)
+    token_ids, offsets, words = encode_token_lists(table.column("tokens"))
+    return update_sentiment_stats_from_ids(stats, token_ids, offsets, labels, words)
+
+
+def _keyword_entry(
+    word, i, diff, pos_mean, neg_mean, pos_n, neg_n, support, ratio, score
+):
+    """점수 배열의 i번째 값을 키워드 결과 dict로 변환 (기존 출력 포맷 유지)"""
+    return {
+        "word": word,
+        "diff": float(diff[i]),
+        "pos": float(pos_mean[i]),
+        "neg": float(neg_mean[i]),
+        "pos_n": int(pos_n[i]),
+        "neg_n": int(neg_n[i]),
+        "support": int(support[i]),
+        "balanced_ratio": float(ratio[i]),
+        "score": float(score[i]),
+    }
+
+
+def sentiment_stats_to_keywords(stats, top_n=30, min_doc_freq=20):
+    """
+    누적 통계로부터 감성 특화 키워드 추출 (단어 전체를 numpy로 한 번에 점수 계산)
+
+    score = (긍정 평균 빈도 - 부정 평균 빈도) * log1p(pos_n + neg_n)
+
+    Returns:
+        tuple: (긍정 특화 키워드 리스트, 부정 특화 키워드 리스트)
+    """
+    n_words = len(stats["words"])
+    if n_words == 0:
         return [], []
 
-    # 점수 기준 정렬
-    rows_sorted = sorted(rows, key=lambda x: x["score"], reverse=True)
+    pos_sum = stats["pos_sum"][:n_words]
+    pos_n = stats["pos_cnt"][:n_words]
+    neg_sum = stats["neg_sum"][:n_words]
+    neg_n = stats["neg_cnt"][:n_words]
+
+    # 전체 support가 최소 빈도를 만족해야 함
+    support = pos_n + neg_n
+    candidates = np.flatnonzero(support >= min_doc_freq)
+    if len(candidates) == 0:
+        return [], []
+    pos_n = pos_n[candidates]
+    neg_n = neg_n[candidates]
+    support = support[candidates]
+
+    # 전체 긍정/부정 리뷰 수 (클래스 불균형 보정용)
+    total_pos = stats["pos_count"]
+    total_neg = stats["neg_count"]
+
+    # 1. 문서 출현 비율 계산 (클래스 불균형 보정)
+    pos_rate = pos_n / total_pos if total_pos > 0 else np.zeros(len(pos_n))
+    neg_rate = neg_n / total_neg if total_neg > 0 else np.zeros(len(neg_n))
+
+    # 2. 균형 잡힌 비율 (Balanced Ratio)
+    # 긍정에서 더 잘 나오면 양수, 부정에서 더 잘 나오면 음수
+    rate_sum = pos_rate + neg_rate
+    with np.errstate(divide="ignore", invalid="ignore"):
+        balanced_ratio = np.where(
+            rate_sum == 0, 0.0, (pos_rate - neg_rate) / rate_sum
+        )
 
+        # 3. 평균 TF 차이
+        pos_mean = np.where(pos_n > 0, pos_sum[candidates] / pos_n, 0.0)
+        neg_mean = np.where(neg_n > 0, neg_sum[candidates] / neg_n, 0.0)
+    diff = pos_mean - neg_mean
+
+    # 4. 최종 점수: abs(diff)로 강도만 반영, balanced_ratio가 방향성 결정
+    # 이렇게 하면 음수 × 음수 = 양수가 되는 부호 반전 현상 방지
+    # (log1p는 support 값별로 math.log1p를 써서 기존 스칼라 계산과 동일한 값 유지)
+    support_values, support_inverse = np.unique(support, return_inverse=True)
+    log_support = np.array([math.log1p(v) for v in support_values])[support_inverse]
+    score = np.abs(diff) * log_support * balanced_ratio
+
+    # 상위/하위 top_n만 argpartition으로 뽑은 뒤 그 안에서만 정렬
+    k = min(top_n, len(score))
+    if k <= 0:
+        return [], []
+    if k < len(score):
+        top_idx = np.argpartition(-score, k - 1)[:k]
+        bottom_idx = np.argpartition(score, k - 1)[:k]
+    else:
+        top_idx = bottom_idx = np.arange(len(score))
+    top_idx = top_idx[np.argsort(-score[top_idx], kind="stable")]
+    bottom_idx = bottom_idx[np.argsort(score[bottom_idx], kind="stable")]
+
+    words = stats["words"]
+    columns = (diff, pos_mean, neg_mean, pos_n, neg_n, support, balanced_ratio, score)
     positive_special = [
-        {
-            "word": r["word"],
-            "diff": float(r["diff"]),
-            "pos": float(r["pos_tfidf_mean"]),
-            "neg": float(r["neg_tfidf_mean"]),
-            "pos_n": int(r["pos_doc_count"]),
-            "neg_n": int(r["neg_doc_count"]),
-            "support": int(r["support"]),
-            "balanced_ratio": float(r["balanced_ratio"]),
-            "score": float(r["score"]),
-        }
-        for r in rows_sorted[:top_n]
+        _keyword_entry(words[candidates[i]], i, *columns) for i in top_idx
     ]
-
     negative_special = [
-        {
-            "word": r["word"],
-            "diff": float(r["diff"]),
-            "pos": float(r["pos_tfidf_mean"]),
-            "neg": float(r["neg_tfidf_mean"]),
-            "pos_n": int(r["pos_doc_count"]),
-            "neg_n": int(r["neg_doc_count"]),
-            "support": int(r["support"]),
-            "balanced_ratio": float(r["balanced_ratio"]),
-            "score": float(r["score"]),
-        }
-        for r in reversed(rows_sorted[-top_n:])
+        _keyword_entry(words[candidates[i]], i, *columns) for i in bottom_idx
     ]
 
     return positive_special, negative_special
 
 
-def analyze_category_sentiment(products, top_n=30, min_doc_freq=20):
+def sentiment_tfidf_diff(reviews, top_n=30, min_doc_freq=20):
     """
-    카테고리별 감성 키워드 분석
+    감성 특화 키워드 추출 (토큰 빈도 기반)
+
+    score = (긍정 평균 빈도 - 부정 평균 빈도) * log1p(pos_n + neg_n)
 
     Args:
-        products: 상품 리스트
+        reviews: 리뷰 리스트 (label, tokens 필드 포함)
         top_n: 추출할 키워드 개수
         min_doc_freq: 최소 문서 빈도
 
     Returns:
-        dict: 카테고리별 감성 키워드
+        tuple: (긍정 특화 키워드 리스트, 부정 특화 키워드 리스트)
     """
-    all_reviews = []
-    for product in products:
-        reviews = product.get("reviews", {}).get("data", [])
-        all_reviews.extend(reviews)
+    stats = update_sentiment_stats(init_sentiment_stats(), reviews)
+    return sentiment_stats_to_keywords(stats, top_n=top_n, min_doc_freq=min_doc_freq)
 
-    positive_special, negative_special = sentiment_tfidf_diff(
-        all_reviews, top_n=top_n, min_doc_freq=min_doc_freq
-    )
 
-    pos_count = sum(1 for r in all_reviews if r.get("label") == 1)
-    neg_count = sum(1 for r in all_reviews if r.get("label") == 0)
-    tokens_count = sum(
-        1 for r in all_reviews if r.get("tokens") and isinstance(r.get("tokens"), list)
+def sentiment_stats_summary(stats, top_n=30, min_doc_freq=20):
+    """
+    누적 통계로부터 감성 분석 결과 dict 생성 (상품/카테고리/전체 공통 포맷)
+    """
+    positive_special, negative_special = sentiment_stats_to_keywords(
+        stats, top_n=top_n, min_doc_freq=min_doc_freq
     )
-
     return {
         "positive_special": positive_special,
         "negative_special": negative_special,
-        "review_count": len(all_reviews),
-        "pos_count": pos_count,
-        "neg_count": neg_count,
-        "tfidf_notna_count": tokens_count,
+        "review_count": stats["review_count"],
+        "pos_count": stats["pos_count"],
+        "neg_count": stats["neg_count"],
+        "tfidf_notna_count": stats["tokens_count"],
     }
 
 
+def analyze_category_sentiment(
+    products, top_n=30, min_doc_freq=20, product_stats=None
+):
+    """
+    카테고리별 감성 키워드 분석
+
+    Args:
+        products: 상품 리스트
+        top_n: 추출할 키워드 개수
+        min_doc_freq: 최소 문서 빈도
+        product_stats: 이미 계산한 상품별 부분 통계 리스트 (있으면 리뷰를 다시 보지 않음)
+
+    Returns:
+        dict: 카테고리별 감성 키워드
+    """
+    if product_stats is None:
+        product_stats = [product_sentiment_stats(product) for product in products]
+
+    stats = init_sentiment_stats()
+    for part_stats in product_stats:
+        merge_sentiment_stats(stats, part_stats)
+
+    return sentiment_stats_summary(stats, top_n=top_n, min_doc_freq=min_doc_freq)
+
+
 def analyze_product_sentiment(product, top_n=30, min_doc_freq=5):
     """
     개별 상품의 감성 키워드 분석
@@ -251,23 +658,6 @@ def analyze_product_sentiment(product, top_n=30, min_doc_freq=5):
     Returns:
         dict: 상품별 감성 키워드
     """
-    reviews = product.get("reviews", {}).get("data", [])
+    stats = product_sentiment_stats(product)
 
-    positive_special, negative_special = sentiment_tfidf_diff(
-        reviews, top_n=top_n, min_doc_freq=min_doc_freq
-    )
-
-    pos_count = sum(1 for r in reviews if r.get("label") == 1)
-    neg_count = sum(1 for r in reviews if r.get("label") == 0)
-    tokens_count = sum(
-        1 for r in reviews if r.get("tokens") and isinstance(r.get("tokens"), list)
-    )
-
-    return {
-        "positive_special": positive_special,
-        "negative_special": negative_special,
-        "review_count": len(reviews),
-        "pos_count": pos_count,
-        "neg_count": neg_count,
-        "tfidf_notna_count": tokens_count,
-    }
+    return sentiment_stats_summary(stats, top_n=top_n, min_doc_freq=min_doc_freq)
@@ -1,7 +1,13 @@
 import json
-import math
+import numpy as np
 import pandas as pd
-from collections import Counter, defaultdict
+from collections import Counter
+from tfidf_store import (
+    TFIDF_STORE_DIR,
+    load_idf,
+    load_review_tfidf,
+    list_tfidf_categories,
+)
 
 # =========================
 # 0) 설정
@@ -104,6 +110,7 @@ def load_and_flatten(json_path):
                     "score": r.get("score"),
                     "date": r.get("date"),
                     "tokens": tokens,
+                    "review_id": r.get("id"),
                     "tfidf": r.get("tfidf", None),
                 }
             )
@@ -111,6 +118,61 @@ def load_and_flatten(json_path):
     return pd.DataFrame(rows)
 
 
+def attach_tfidf_from_store(df_reviews, store_dir=TFIDF_STORE_DIR):
+    """
+    tfidf 필드가 없는 리뷰에 TF-IDF 저장소(전처리 Phase 3 결과)의 값을 채움
+
+    - (product_id, review_id) → 행렬 행 번호를 카테고리별 merge로 한 번에 찾고
+      찾은 행만 {단어: TF-IDF} dict로 변환
+    - 현재 IDF 버전으로 만든 카테고리 행렬만 사용 (전처리가 모든 카테고리를 같은 버전으로 유지)
+    """
+    missing = df_reviews["tfidf"].isna()
+    idf_model = load_idf(store_dir)
+    if not missing.any() or idf_model is None:
+        return df_reviews
+
+    words = np.asarray(idf_model["words"], dtype=object)
+    wanted = pd.DataFrame(
+        {
+            "product_id": df_reviews.loc[missing, "product_id"].astype(str).to_numpy(),
+            "review_id": pd.to_numeric(
+                df_reviews.loc[missing, "review_id"], errors="coerce"
+            ).to_numpy(),
+            "pos": np.arange(int(missing.sum())),
+        }
+    ).dropna(subset=["review_id"])
+    wanted["review_id"] = wanted["review_id"].astype(np.int64)
+
+    values = [None] * int(missing.sum())
+    for category in list_tfidf_categories(store_dir):
+        if wanted.empty:
+            break
+        matrix = load_review_tfidf(category, store_dir)
+        if matrix is None or matrix["meta"]["idf_version"] != idf_model["version"]:
+            continue
+        rows = pd.DataFrame(
+            {
+                "product_id": matrix["product_id"].astype(str),
+                "review_id": np.asarray(matrix["review_id"], dtype=np.int64),
+                "row": np.arange(len(matrix["review_id"])),
+            }
+        )
+        hit = wanted.merge(rows, on=["product_id", "review_id"], how="inner")
+        if hit.empty:
+            continue
+        indptr, indices, data = matrix["indptr"], matrix["indices"], matrix["data"]
+        for pos, row in zip(hit["pos"].tolist(), hit["row"].tolist()):
+            lo, hi = indptr[row], indptr[row + 1]
+            values[pos] = dict(zip(words[indices[lo:hi]].tolist(), data[lo:hi].tolist()))
+        wanted = wanted[~wanted["pos"].isin(hit["pos"])]
+
+    tfidf = df_reviews["tfidf"].astype(object)
+    tfidf[missing] = pd.Series(values, index=tfidf.index[missing])
+    df_reviews["tfidf"] = tfidf
+    print(f"TF-IDF 저장소에서 채운 리뷰 수: {sum(v is not None for v in values)}")
+    return df_reviews
+
+
 # =========================
 # 2) 빈도 분석 (피부 타입별)
 # =========================
@@ -137,113 +199,187 @@ def top_words_by_skin(df_reviews, top_n=30):
 # =========================
 # 3) 감성 특화 키워드 (대안 1: 가중 diff)
 # =========================
-def sentiment_tfidf_diff(df_reviews, top_n=50, min_doc_freq=5):
+DIFF_COLUMNS = [
+    "word",
+    "diff",
+    "pos_tfidf_mean",
+    "neg_tfidf_mean",
+    "pos_doc_count",
+    "neg_doc_count",
+    "support",
+    "score",
+]
+
+WORD_STAT_COLUMNS = ["pos_sum", "pos_cnt", "neg_sum", "neg_cnt"]
+
+
+def explode_tfidf(df_reviews, keys=()):
     """
-    (긍정 평균 TF-IDF) - (부정 평균 TF-IDF) 를 구한 뒤,
-    support(=pos_n+neg_n)로 가중치를 줘서(로그) 표본이 작은 단어가 과도하게 뜨는 현상을 완화.
+    리뷰별 tfidf를 (review_id, word, weight) 롱 테이블로 펼치기
 
-    score = diff * log1p(pos_n + neg_n)
+    - label이 0/1이고 tfidf가 있는 리뷰만 대상 (review_id는 df_reviews의 인덱스)
+    - keys 컬럼(예: category, product_key)과 label을 행마다 함께 붙임
+    """
+    df = df_reviews[df_reviews["label"].isin([0, 1]) & df_reviews["tfidf"].notna()]
+    tfidf = [normalize_tfidf(t) for t in df["tfidf"].tolist()]
+    lengths = np.fromiter((len(t) for t in tfidf), dtype=np.int64, count=len(tfidf))
 
-    - score > 0 : 긍정 특화(강도 + 신뢰도 반영)
-    - score < 0 : 부정 특화(강도 + 신뢰도 반영)
+    df_long = pd.DataFrame(
+        {
+            "review_id": np.repeat(df.index.to_numpy(), lengths),
+            "word": [w for t in tfidf for w in t],
+            "weight": np.fromiter(
+                (v for t in tfidf for v in t.values()),
+                dtype=np.float64,
+                count=int(lengths.sum()),
+            ),
+        }
+    )
+    for col in list(keys) + ["label"]:
+        df_long[col] = np.repeat(df[col].to_numpy(), lengths)
+    return df_long
+
+
+def aggregate_word_stats(df_long, keys):
     """
-    empty_cols = [
-        "word",
-        "diff",
-        "pos_tfidf_mean",
-        "neg_tfidf_mean",
-        "pos_doc_count",
-        "neg_doc_count",
-        "support",
-        "score",
-    ]
+    롱 테이블을 (keys, word) 단위로 한 번에 집계
 
-    df = df_reviews.copy()
-    df = df[df["label"].isin([0, 1])].copy()
-    df = df[df["tfidf"].notna()].copy()
+    Returns:
+        DataFrame: keys + word + pos_sum/pos_cnt/neg_sum/neg_cnt
+    """
+    is_pos = df_long["label"] == 1
+    df = pd.DataFrame(
+        {
+            **{k: df_long[k] for k in keys},
+            "word": df_long["word"],
+            "pos_sum": df_long["weight"].where(is_pos, 0.0),
+            "pos_cnt": is_pos.astype(np.int64),
+            "neg_sum": df_long["weight"].where(~is_pos, 0.0),
+            "neg_cnt": (~is_pos).astype(np.int64),
+        }
+    )
+    return df.groupby(list(keys) + ["word"], sort=False, observed=True)[
+        WORD_STAT_COLUMNS
+    ].sum().reset_index()
 
-    if df.empty:
-        return pd.DataFrame(columns=empty_cols), pd.DataFrame(columns=empty_cols)
 
-    pos_sum = defaultdict(float)
-    pos_cnt = defaultdict(int)
-    neg_sum = defaultdict(float)
-    neg_cnt = defaultdict(int)
+def review_counts(df_reviews, keys):
+    """
+    그룹별 리뷰 수 집계 (review_count, pos_count, neg_count, tfidf_notna_count)
+    + 점수 계산용 total_pos/total_neg (tfidf가 있는 긍정/부정 리뷰 수)
+    """
+    label = df_reviews["label"]
+    has_tfidf = df_reviews["tfidf"].notna()
+    df = pd.DataFrame(
+        {
+            **{k: df_reviews[k] for k in keys},
+            "review_count": 1,
+            "pos_count": (label == 1).astype(np.int64),
+            "neg_count": (label == 0).astype(np.int64),
+            "tfidf_notna_count": has_tfidf.astype(np.int64),
+            "total_pos": ((label == 1) & has_tfidf).astype(np.int64),
+            "total_neg": ((label == 0) & has_tfidf).astype(np.int64),
+        }
+    )
+    return df.groupby(list(keys), observed=True).sum()
 
-    for _, row in df.iterrows():
-        tfidf_dict = normalize_tfidf(row["tfidf"])
-        if not tfidf_dict:
-            continue
 
-        if row["label"] == 1:
-            for w, s in tfidf_dict.items():
-                pos_sum[w] += float(s)
-                pos_cnt[w] += 1
-        else:
-            for w, s in tfidf_dict.items():
-                neg_sum[w] += float(s)
-                neg_cnt[w] += 1
+def score_word_stats(word_stats, counts, keys, top_n=50, min_doc_freq=5):
+    """
+    (keys, word) 집계 결과로 그룹별 감성 특화 키워드 계산 (전체 단어를 한 번에 벡터 연산)
 
-    if not pos_sum and not neg_sum:
-        return pd.DataFrame(columns=empty_cols), pd.DataFrame(columns=empty_cols)
+    score = abs(diff) * log1p(pos_n + neg_n) * balanced_ratio
 
-    # 전체 긍정/부정 리뷰 수 계산 (클래스 불균형 보정용)
-    total_pos = int((df["label"] == 1).sum())
-    total_neg = int((df["label"] == 0).sum())
+    Returns:
+        dict: {그룹 키: (긍정 특화 DataFrame, 부정 특화 DataFrame)}
+    """
+    keys = list(keys)
+    ws = word_stats.join(counts[["total_pos", "total_neg"]], on=keys)
 
-    rows = []
-    for w in set(pos_sum.keys()) | set(neg_sum.keys()):
-        pc = pos_cnt.get(w, 0)
-        nc = neg_cnt.get(w, 0)
+    # 전체 support가 최소 빈도를 만족해야 함
+    support = ws["pos_cnt"] + ws["neg_cnt"]
+    ws = ws[support >= min_doc_freq]
+    if ws.empty:
+        return {}
 
-        # 전체 support가 최소 빈도를 만족해야 함
-        support = pc + nc
-        if support < min_doc_freq:
-            continue
+    pc = ws["pos_cnt"].to_numpy(dtype=np.float64)
+    nc = ws["neg_cnt"].to_numpy(dtype=np.float64)
+    total_pos = ws["total_pos"].to_numpy(dtype=np.float64)
+    total_neg = ws["total_neg"].to_numpy(dtype=np.float64)
 
+    with np.errstate(divide="ignore", invalid="ignore"):
         # 1. 문서 출현 비율 계산 (클래스 불균형 보정)
-        pos_rate = pc / total_pos if total_pos > 0 else 0
-        neg_rate = nc / total_neg if total_neg > 0 else 0
+        pos_rate = np.where(total_pos > 0, pc / total_pos, 0.0)
+        neg_rate = np.where(total_neg > 0, nc / total_neg, 0.0)
 
         # 2. 균형 잡힌 비율 (Balanced Ratio)
-        # 긍정에서 더 잘 나오면 양수, 부정에서 더 잘 나오면 음수
-        if (pos_rate + neg_rate) == 0:
-            balanced_ratio = 0
-        else:
-            balanced_ratio = (pos_rate - neg_rate) / (pos_rate + neg_rate)
+        rate_sum = pos_rate + neg_rate
+        balanced_ratio = np.where(
+            rate_sum == 0, 0.0, (pos_rate - neg_rate) / rate_sum
+        )
 
         # 3. 평균 TF-IDF 차이
-        pos_mean = (pos_sum[w] / pc) if pc else 0.0
-        neg_mean = (neg_sum[w] / nc) if nc else 0.0
-        diff = pos_mean - neg_mean
+        pos_mean = np.where(pc > 0, ws["pos_sum"].to_numpy() / pc, 0.0)
+        neg_mean = np.where(nc > 0, ws["neg_sum"].to_numpy() / nc, 0.0)
+    diff = pos_mean - neg_mean
+
+    # 4. 최종 점수: abs(diff)로 강도만 반영, balanced_ratio가 방향성 결정
+    support = pc + nc
+    score = np.abs(diff) * np.log1p(support) * balanced_ratio
+
+    df_diff = ws[keys + ["word"]].assign(
+        diff=diff,
+        pos_tfidf_mean=pos_mean,
+        neg_tfidf_mean=neg_mean,
+        pos_doc_count=ws["pos_cnt"].to_numpy(),
+        neg_doc_count=ws["neg_cnt"].to_numpy(),
+        support=support.astype(np.int64),
+        score=score,
+    )
 
-        # 4. 최종 점수: abs(diff)로 강도만 반영, balanced_ratio가 방향성 결정
-        # 이렇게 하면 음수 × 음수 = 양수가 되는 부호 반전 현상 방지
-        score = abs(diff) * math.log1p(support) * balanced_ratio
+    # ✅ 정렬 기준을 diff가 아니라 score로 변경(표본 반영) - 그룹별 상·하위 top_n
+    ascending = [True] * len(keys)
+    pos_top = (
+        df_diff.sort_values(keys + ["score"], ascending=ascending + [False], kind="stable")
+        .groupby(keys, sort=False, observed=True)
+        .head(top_n)
+    )
+    neg_top = (
+        df_diff.sort_values(keys + ["score"], ascending=ascending + [True], kind="stable")
+        .groupby(keys, sort=False, observed=True)
+        .head(top_n)
+    )
 
-        rows.append(
-            {
-                "word": w,
-                "diff": diff,
-                "pos_tfidf_mean": pos_mean,
-                "neg_tfidf_mean": neg_mean,
-                "pos_doc_count": pc,
-                "neg_doc_count": nc,
-                "support": support,
-                "balanced_ratio": balanced_ratio,
-                "score": score,
-            }
-        )
+    def _split(df_top):
+        key = keys[0] if len(keys) == 1 else keys
+        return {
+            k: part[DIFF_COLUMNS].reset_index(drop=True)
+            for k, part in df_top.groupby(key, sort=False, observed=True)
+        }
+
+    pos_by_group = _split(pos_top)
+    neg_by_group = _split(neg_top)
+    return {k: (pos_by_group[k], neg_by_group[k]) for k in pos_by_group}
+
+
+def sentiment_tfidf_diff(df_reviews, top_n=50, min_doc_freq=5):
+    """
+    (긍정 평균 TF-IDF) - (부정 평균 TF-IDF) 를 구한 뒤,
+    support(=pos_n+neg_n)로 가중치를 줘서(로그) 표본이 작은 단어가 과도하게 뜨는 현상을 완화.
 
-    if not rows:
-        return pd.DataFrame(columns=empty_cols), pd.DataFrame(columns=empty_cols)
+    score = diff * log1p(pos_n + neg_n)
 
-    df_diff = pd.DataFrame(rows, columns=empty_cols)
+    - score > 0 : 긍정 특화(강도 + 신뢰도 반영)
+    - score < 0 : 부정 특화(강도 + 신뢰도 반영)
+    """
+    empty = pd.DataFrame(columns=DIFF_COLUMNS)
+    df = df_reviews.assign(_scope="all")
 
-    # ✅ 정렬 기준을 diff가 아니라 score로 변경(표본 반영)
-    pos_special = df_diff.sort_values("score", ascending=False).head(top_n)
-    neg_special = df_diff.sort_values("score", ascending=True).head(top_n)
-    return pos_special, neg_special
+    word_stats = aggregate_word_stats(explode_tfidf(df, ["_scope"]), ["_scope"])
+    results = score_word_stats(
+        word_stats, review_counts(df, ["_scope"]), ["_scope"], top_n, min_doc_freq
+    )
+    return results.get("all", (empty, empty))
 
 
 def df_to_diff_list(df_part):
@@ -261,7 +397,7 @@ def df_to_diff_list(df_part):
             "balanced_ratio": float(row.get("balanced_ratio", 0.0)),
             "score": float(row.get("score", row["diff"])),
         }
-        for _, row in df_part.iterrows()
+        for row in df_part.to_dict("records")
     ]
 
 
@@ -275,7 +411,7 @@ def print_diff_block(title, df_pos, df_neg, max_print=10):
         return
 
     print("✅ 긍정 특화 키워드 (score 큰 순)")
-    for _, r in df_pos.head(max_print).iterrows():
+    for r in df_pos.head(max_print).to_dict("records"):
         # 기존 요청 포맷 + score/support 같이 보여줌(원치 않으면 score/support 부분 삭제)
         print(
             f"{r['word']}\t"
@@ -285,7 +421,7 @@ def print_diff_block(title, df_pos, df_neg, max_print=10):
         )
 
     print("❌ 부정 특화 키워드 (score 작은 순)")
-    for _, r in df_neg.head(max_print).iterrows():
+    for r in df_neg.head(max_print).to_dict("records"):
         print(
             f"{r['word']}\t"
             f"diff={r['diff']:.6f} pos={r['pos_tfidf_mean']:.6f} neg={r['neg_tfidf_mean']:.6f} "
@@ -294,6 +430,16 @@ def print_diff_block(title, df_pos, df_neg, max_print=10):
         )
 
 
+def count_summary(counts_row):
+    """그룹 리뷰 수 집계 행 → 결과 JSON의 카운트 필드"""
+    return {
+        "review_count": int(counts_row["review_count"]),
+        "pos_count": int(counts_row["pos_count"]),
+        "neg_count": int(counts_row["neg_count"]),
+        "tfidf_notna_count": int(counts_row["tfidf_notna_count"]),
+    }
+
+
 # =========================
 # 4) 메인
 # =========================
@@ -304,6 +450,9 @@ def main():
         print("리뷰 데이터가 비어있습니다. JSON_PATH 또는 JSON 구조를 확인하세요.")
         return
 
+    # 리뷰 JSON에 tfidf가 없으면 전처리 TF-IDF 저장소 값 사용 (재계산 없음)
+    df_reviews = attach_tfidf_from_store(df_reviews)
+
     # (A) 피부 타입별 빈도 분석
     df_skin, skin_top = top_words_by_skin(df_reviews, top_n=TOP_N_FREQ)
 
@@ -316,37 +465,73 @@ def main():
         for w, c in pairs:
             print(f"{w}\t{c}")
 
-    # (B) 전체 감성 특화 키워드(가중 diff)
-    pos_all, neg_all = sentiment_tfidf_diff(
-        df_reviews, top_n=TOP_N_SENTIMENT, min_doc_freq=MIN_DOC_FREQ
+    # (B)~(D) 감성 특화 키워드(가중 diff)
+    # 롱 테이블을 (카테고리, 상품, 단어) 단위로 한 번만 집계한 뒤
+    # 카테고리/전체 통계는 그 부분합을 다시 더해서 계산 (그룹마다 재계산하지 않음)
+    empty = pd.DataFrame(columns=DIFF_COLUMNS)
+    df_reviews["_scope"] = "all"
+    product_keys = ["category", "product_key"]
+
+    df_long = explode_tfidf(df_reviews, product_keys)
+    product_word = aggregate_word_stats(df_long, product_keys)
+    category_word = (
+        product_word.groupby(["category", "word"], sort=False)[WORD_STAT_COLUMNS]
+        .sum()
+        .reset_index()
+    )
+    overall_word = (
+        product_word.groupby("word", sort=False)[WORD_STAT_COLUMNS]
+        .sum()
+        .reset_index()
+        .assign(_scope="all")
+    )
+
+    overall_counts = review_counts(df_reviews, ["_scope"])
+    category_counts = review_counts(df_reviews, ["category"])
+    product_counts = review_counts(df_reviews, ["product_key"])
+
+    overall_scores = score_word_stats(
+        overall_word, overall_counts, ["_scope"], TOP_N_SENTIMENT, MIN_DOC_FREQ
+    )
+    category_scores = score_word_stats(
+        category_word, category_counts, ["category"], TOP_N_SENTIMENT, MIN_DOC_FREQ
+    )
+    # 리뷰 수는 product_key 단위 → 여러 카테고리에 걸친 product_key(예: UNKNOWN_ID__UNKNOWN_NAME)도
+    # 단어 통계를 product_key 단위로 다시 합산해야 단어 행이 중복/분할되지 않음
+    product_only_word = (
+        product_word.groupby(["product_key", "word"], sort=False)[WORD_STAT_COLUMNS]
+        .sum()
+        .reset_index()
     )
+    product_scores = score_word_stats(
+        product_only_word,
+        product_counts,
+        ["product_key"],
+        TOP_N_SENTIMENT,
+        MIN_DOC_FREQ,
+    )
+
+    # (B) 전체
+    pos_all, neg_all = overall_scores.get("all", (empty, empty))
     print_diff_block(
         "[전체 리뷰 집합 - 감성 특화 키워드(가중 diff)]", pos_all, neg_all, max_print=10
     )
 
     # (C) 카테고리별
     category_results = {}
-    for cat, part in df_reviews.groupby("category"):
-        pos_cat, neg_cat = sentiment_tfidf_diff(
-            part, top_n=TOP_N_SENTIMENT, min_doc_freq=MIN_DOC_FREQ
-        )
+    for cat, counts_row in category_counts.iterrows():
+        pos_cat, neg_cat = category_scores.get(cat, (empty, empty))
         category_results[str(cat)] = {
             "positive_special": df_to_diff_list(pos_cat),
             "negative_special": df_to_diff_list(neg_cat),
-            "review_count": int(len(part)),
-            "pos_count": int((part["label"] == 1).sum()),
-            "neg_count": int((part["label"] == 0).sum()),
-            "tfidf_notna_count": int(part["tfidf"].notna().sum()),
+            **count_summary(counts_row),
         }
 
     # (D) 상품별
     product_results = {}
-    for pkey, part in df_reviews.groupby("product_key"):
+    for pkey, counts_row in product_counts.iterrows():
         pid, pname = (pkey.split("__", 1) + [""])[:2]
-
-        pos_p, neg_p = sentiment_tfidf_diff(
-            part, top_n=TOP_N_SENTIMENT, min_doc_freq=MIN_DOC_FREQ
-        )
+        pos_p, neg_p = product_scores.get(pkey, (empty, empty))
 
         print_diff_block(f"[상품] {pid} | {pname}", pos_p, neg_p, max_print=5)
 
@@ -355,10 +540,7 @@ def main():
             "product_name": pname,
             "positive_special": df_to_diff_list(pos_p),
             "negative_special": df_to_diff_list(neg_p),
-            "review_count": int(len(part)),
-            "pos_count": int((part["label"] == 1).sum()),
-            "neg_count": int((part["label"] == 0).sum()),
-            "tfidf_notna_count": int(part["tfidf"].notna().sum()),
+            **count_summary(counts_row),
         }
 
     # 저장
@@ -381,10 +563,7 @@ def main():
             "overall_sentiment_special_words_weighted_diff": {
                 "positive_special": df_to_diff_list(pos_all),
                 "negative_special": df_to_diff_list(neg_all),
-                "review_count": int(len(df_reviews)),
-                "pos_count": int((df_reviews["label"] == 1).sum()),
-                "neg_count": int((df_reviews["label"] == 0).sum()),
-                "tfidf_notna_count": int(df_reviews["tfidf"].notna().sum()),
+                **count_summary(overall_counts.loc["all"]),
             },
             "category_sentiment_special_words_weighted_diff": category_results,
             "product_sentiment_special_words_weighted_diff": product_results,
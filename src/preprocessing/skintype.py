@@ -1,5 +1,6 @@
+import re
 import json
-from collections import Counter
+from functools import lru_cache
 from typing import Dict, List, Any, Optional
 
 TYPE_KEYWORDS = {
@@ -10,12 +11,109 @@ TYPE_KEYWORDS = {
     "여드름성": ["여드름", "여드름성"],
 }
 
+# 리뷰 텍스트를 이어 붙일 때 구분자 (키워드에 포함되지 않는 문자 → 경계를 넘는 매칭 없음)
+_TEXT_SEPARATOR = "\n"
+
+def _has_boundary_overlap(keywords: List[str]) -> bool:
+    """
+    한 키워드의 접미사가 다른(또는 같은) 키워드의 접두사인지 확인
+
+    - 겹침이 없으면 "긴 키워드 우선" 정규식 한 번의 스캔 결과가 키워드별 text.count 합과 같음
+    - 겹침이 있으면 매칭 경계에서 누락이 생길 수 있으므로 text.count로 폴백
+    """
+    prefixes = {kw[:i] for kw in keywords for i in range(1, len(kw))}
+    return any(kw[i:] in prefixes for kw in keywords for i in range(1, len(kw)))
+
+@lru_cache(maxsize=8)
+def _build_keyword_matcher(frozen_keywords):
+    types = [t for t, _ in frozen_keywords]
+    keywords = sorted(
+        {kw for _, kws in frozen_keywords for kw in kws if kw},
+        key=lambda kw: (-len(kw), kw),
+    )
+
+    # 매칭된 키워드 1개 → {타입: 기여 횟수}
+    # (예: "지성인" 매칭은 "지성" 1회 + "지성인" 1회 → 지성 2)
+    match_weights = {}
+    token_weights = {}
+    for kw in keywords:
+        text_w = {}
+        token_w = {}
+        for t, kws in frozen_keywords:
+            n_text = sum(kw.count(k) for k in kws if k)
+            n_token = sum(1 for k in kws if k == kw)
+            if n_text:
+                text_w[t] = n_text
+            if n_token:
+                token_w[t] = n_token
+        match_weights[kw] = text_w
+        if token_w:
+            token_weights[kw] = token_w
+
+    pattern = None
+    if keywords and not _has_boundary_overlap(keywords):
+        pattern = re.compile("|".join(re.escape(kw) for kw in keywords))
+
+    return {
+        "types": types,
+        "type_keywords": {t: list(kws) for t, kws in frozen_keywords},
+        "pattern": pattern,
+        "match_weights": match_weights,
+        "token_weights": token_weights,
+    }
+
+def get_keyword_matcher(type_keywords: Optional[Dict[str, List[str]]] = None) -> Dict[str, Any]:
+    """
+    피부 타입 키워드 매처 (키워드 사전당 한 번만 컴파일, 캐시)
+
+    Returns:
+        dict: {"types", "type_keywords", "pattern"(긴 키워드 우선 alternation 정규식),
+               "match_weights"(매칭 키워드 → 타입별 횟수), "token_weights"(토큰 → 타입별 횟수)}
+    """
+    type_keywords = TYPE_KEYWORDS if type_keywords is None else type_keywords
+    frozen = tuple((t, tuple(kws)) for t, kws in type_keywords.items())
+    return _build_keyword_matcher(frozen)
+
+def count_types_in_text(text: str, matcher: Dict[str, Any]) -> Dict[str, int]:
+    """텍스트 한 번 스캔으로 타입별 키워드 등장 횟수 계산 (키워드별 text.count 합과 동일)"""
+    counts = dict.fromkeys(matcher["types"], 0)
+    if not text:
+        return counts
+
+    pattern = matcher["pattern"]
+    if pattern is None:
+        for t, kws in matcher["type_keywords"].items():
+            counts[t] = sum(text.count(kw) for kw in kws)
+        return counts
+
+    match_weights = matcher["match_weights"]
+    for kw in pattern.findall(text):
+        for t, n in match_weights[kw].items():
+            counts[t] += n
+    return counts
+
+def count_types_in_tokens(tokens: List[str], matcher: Dict[str, Any]) -> Dict[str, int]:
+    """토큰 리스트에서 타입별 키워드 토큰 수 계산 (토큰 한 번 순회)"""
+    counts = dict.fromkeys(matcher["types"], 0)
+    token_weights = matcher["token_weights"]
+    for tok in tokens:
+        weights = token_weights.get(tok)
+        if weights:
+            for t, n in weights.items():
+                counts[t] += n
+    return counts
+
+def match_types_in_text(text: str, matcher: Dict[str, Any]) -> List[str]:
+    """텍스트에 키워드가 하나라도 등장하는 타입 목록 (정렬)"""
+    if not text:
+        return []
+    return sorted(t for t, n in count_types_in_text(text, matcher).items() if n > 0)
+
 def _count_from_tokens(tokens: List[str], type_keywords: Dict[str, List[str]]) -> Dict[str, int]:
-    token_counter = Counter(tokens)
-    return {t: sum(token_counter.get(kw, 0) for kw in kws) for t, kws in type_keywords.items()}
+    return count_types_in_tokens(tokens, get_keyword_matcher(type_keywords))
 
 def _count_from_text(text: str, type_keywords: Dict[str, List[str]]) -> Dict[str, int]:
-    return {t: sum(text.count(kw) for kw in kws) for t, kws in type_keywords.items()}
+    return count_types_in_text(text, get_keyword_matcher(type_keywords))
 
 def _pick_skin_type_from_counts(counts: Dict[str, int]) -> str:
     """리뷰 기반 최다 스킨타입 1개(동점이면 혼합, 전부 0이면 미분류)"""
@@ -38,43 +136,46 @@ def _find_skin_type_in_product_name(product_name: str, type_keywords: Dict[str,
     if not product_name:
         return None
 
-    matched_types = []
-    for t, kws in type_keywords.items():
-        for kw in kws:
-            if kw and kw in product_name:
-                matched_types.append(t)
-                break
-
-    matched_types = sorted(set(matched_types))
+    matched_types = match_types_in_text(product_name, get_keyword_matcher(type_keywords))
     if not matched_types:
         return None
     if len(matched_types) == 1:
         return matched_types[0]
     return "복합/혼합(" + ",".join(matched_types) + ")"
 
-def classify_product(product_obj: Dict[str, Any]) -> Dict[str, Any]:
+def _count_from_reviews(reviews: List[Dict[str, Any]], matcher: Dict[str, Any]) -> Dict[str, int]:
+    """
+    상품 리뷰 전체의 타입별 키워드 수
+    - tokens가 있는 리뷰는 토큰 기준, 없는 리뷰는 텍스트를 이어 붙여 한 번에 스캔
+    """
+    total_counts = dict.fromkeys(matcher["types"], 0)
+    texts = []
+    for r in reviews:
+        tokens = r.get("tokens")
+        if isinstance(tokens, list) and tokens:
+            for t, n in count_types_in_tokens(tokens, matcher).items():
+                total_counts[t] += n
+        else:
+            texts.append(r.get("full_text") or r.get("content") or "")
+
+    if texts:
+        for t, n in count_types_in_text(_TEXT_SEPARATOR.join(texts), matcher).items():
+            total_counts[t] += n
+    return total_counts
+
+def classify_product(product_obj: Dict[str, Any], matcher: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    matcher = matcher or get_keyword_matcher()
     pinfo = product_obj.get("product_info") or {}
     product_name = (pinfo.get("product_name_clean") or pinfo.get("product_name") or "").strip()
 
     # ✅ 1) 상품명 우선 룰
-    name_based = _find_skin_type_in_product_name(product_name, TYPE_KEYWORDS)
+    name_based = _find_skin_type_in_product_name(product_name, matcher["type_keywords"])
     if name_based:
         skin_type = name_based
     else:
         # ✅ 2) 리뷰 기반 룰
         reviews = (product_obj.get("reviews") or {}).get("data") or []
-        total_counts = Counter({t: 0 for t in TYPE_KEYWORDS})
-
-        for r in reviews:
-            tokens = r.get("tokens")
-            if isinstance(tokens, list) and tokens:
-                c = _count_from_tokens(tokens, TYPE_KEYWORDS)
-            else:
-                text = r.get("full_text") or r.get("content") or ""
-                c = _count_from_text(text, TYPE_KEYWORDS)
-            total_counts.update(c)
-
-        skin_type = _pick_skin_type_from_counts(dict(total_counts))
+        skin_type = _pick_skin_type_from_counts(_count_from_reviews(reviews, matcher))
 
     category = (pinfo.get("category_norm") or pinfo.get("category_path") or "").strip()
 
@@ -84,12 +185,17 @@ def classify_product(product_obj: Dict[str, Any]) -> Dict[str, Any]:
         "skin_type": skin_type,
     }
 
+def classify_products(products: List[Dict[str, Any]], type_keywords: Optional[Dict[str, List[str]]] = None) -> List[Dict[str, Any]]:
+    """카테고리(파일) 단위 일괄 분류 - 매처는 한 번만 가져와 모든 상품에 재사용"""
+    matcher = get_keyword_matcher(type_keywords)
+    return [classify_product(p, matcher) for p in products]
+
 def make_product_skin_type_json(input_json_path: str, output_json_path: str):
     with open(input_json_path, "r", encoding="utf-8") as f:
         raw = json.load(f)
 
     products = raw.get("data") or []
-    results = [classify_product(p) for p in products]
+    results = classify_products(products)
 
     with open(output_json_path, "w", encoding="utf-8") as f:
         json.dump(results, f, ensure_ascii=False, indent=2)
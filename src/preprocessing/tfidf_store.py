@@ -0,0 +1,454 @@
+"""
+TF-IDF 피처 저장소 (corpus 단위 IDF 학습 + 리뷰별 희소 TF-IDF CSR 저장/로딩)
+
+- IDF는 실행마다 Phase 2에서 한 번만 학습 (전체 corpus 기준)
+    - 이번 실행 토큰 파일 + 재처리하지 않은 카테고리의 저장된 행렬(문서 빈도)을 함께 사용
+    - 저장된 행렬은 새 IDF로 재가중해 모든 카테고리가 같은 IDF 버전을 유지
+- 리뷰 TF-IDF는 Phase 3 워커가 카테고리별 CSR(.npy)로 저장 → mmap 로딩
+- 감성 키워드 점수와 상품 유사도 계산이 같은 행렬을 재사용 (재계산 없음)
+
+저장 구조:
+    data/features/tfidf/idf.parquet                       (word, df, idf + 버전 메타데이터)
+    data/features/tfidf/reviews/<카테고리>/indptr.npy      (int64, n_rows + 1)
+    data/features/tfidf/reviews/<카테고리>/indices.npy     (int32, 단어 ID)
+    data/features/tfidf/reviews/<카테고리>/data.npy        (float32, L2 정규화 TF-IDF)
+    data/features/tfidf/reviews/<카테고리>/rows.parquet    (product_id, review_id)
+    data/features/tfidf/reviews/<카테고리>/meta.json       (idf_version, n_rows, n_cols)
+"""
+
+import os
+import json
+import pickle
+import hashlib
+import unicodedata
+from collections import Counter
+from urllib.parse import quote, unquote
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sentiment_analysis import encode_token_lists, build_term_matrix
+
+TFIDF_STORE_DIR = "./data/features/tfidf"
+IDF_FILE = "idf.parquet"
+REVIEW_MATRIX_DIR = "reviews"
+
+# 프로세스별 캐시 (워커가 여러 파일을 처리할 때 IDF 재로딩 방지)
+_idf_cache = {}
+_product_matrix_cache = {}
+
+
+# =========================
+# IDF 학습/저장/로딩
+# =========================
+
+
+def make_idf_version(corpus_hash):
+    """corpus 해시로 IDF 버전 ID 생성"""
+    return "idf-" + hashlib.sha256(corpus_hash.encode("utf-8")).hexdigest()[:12]
+
+
+def fit_idf(token_files, corpus_hash, base_doc_freq=None, base_n_docs=0):
+    """
+    토큰 파일(리뷰별 토큰 리스트 pickle)로 corpus IDF 학습
+
+    idf = ln((1 + N) / (1 + df)) + 1  (smooth idf)
+
+    Args:
+        base_doc_freq: 토큰 파일 밖 문서의 단어별 문서 수 (stored_document_frequency 결과)
+        base_n_docs: 토큰 파일 밖 문서 수
+
+    Returns:
+        dict: {"version", "words", "vocab", "df", "idf", "n_docs"}
+    """
+    doc_freq = Counter(base_doc_freq or {})
+    n_docs = base_n_docs
+    for token_file in sorted(token_files):
+        with open(token_file, "rb") as f:
+            token_lists = [tokens for tokens in pickle.load(f) if tokens]
+        if not token_lists:
+            continue
+        n_docs += len(token_lists)
+
+        # 파일 단위로 (리뷰, 단어) 중복 제거 후 단어별 문서 수 집계
+        token_ids, offsets, words = encode_token_lists(token_lists)
+        _, indices, _ = build_term_matrix(token_ids, offsets, len(words))
+        counts = np.bincount(indices, minlength=len(words))
+        doc_freq.update(dict(zip(words, counts.tolist())))
+
+    words = sorted(doc_freq)
+    df = np.array([doc_freq[w] for w in words], dtype=np.int64)
+    idf = (np.log((1 + n_docs) / (1 + df)) + 1).astype(np.float32)
+    return {
+        "version": make_idf_version(corpus_hash),
+        "words": words,
+        "vocab": {w: i for i, w in enumerate(words)},
+        "df": df,
+        "idf": idf,
+        "n_docs": n_docs,
+    }
+
+
+def save_idf(idf_model, store_dir=TFIDF_STORE_DIR):
+    """IDF 모델을 idf.parquet로 저장 (버전/문서 수는 스키마 메타데이터)"""
+    os.makedirs(store_dir, exist_ok=True)
+    table = pa.table(
+        {
+            "word": pa.array(idf_model["words"], type=pa.string()),
+            "df": pa.array(idf_model["df"], type=pa.int64()),
+            "idf": pa.array(idf_model["idf"], type=pa.float32()),
+        }
+    )
+    table = table.replace_schema_metadata(
+        {
+            b"idf_version": idf_model["version"].encode("utf-8"),
+            b"n_docs": str(idf_model["n_docs"]).encode("utf-8"),
+        }
+    )
+    path = os.path.join(store_dir, IDF_FILE)
+    pq.write_table(table, path, compression="snappy")
+    return path
+
+
+def load_idf(store_dir=TFIDF_STORE_DIR):
+    """
+    저장된 IDF 모델 로드 (파일 mtime 기준 캐시)
+
+    Returns:
+        dict: fit_idf()와 같은 형식 - 파일이 없으면 None
+    """
+    path = os.path.join(store_dir, IDF_FILE)
+    if not os.path.exists(path):
+        return None
+
+    key = (os.path.abspath(path), os.path.getmtime(path))
+    if key not in _idf_cache:
+        table = pq.read_table(path)
+        metadata = table.schema.metadata or {}
+        words = table.column("word").to_pylist()
+        _idf_cache.clear()
+        _idf_cache[key] = {
+            "version": metadata.get(b"idf_version", b"").decode("utf-8"),
+            "words": words,
+            "vocab": {w: i for i, w in enumerate(words)},
+            "df": table.column("df").to_numpy(),
+            "idf": table.column("idf").to_numpy(),
+            "n_docs": int(metadata.get(b"n_docs", b"0")),
+        }
+    return _idf_cache[key]
+
+
+def stored_document_frequency(categories, idf_model, store_dir=TFIDF_STORE_DIR):
+    """
+    저장된 카테고리 행렬에서 단어별 문서 수 집계 (토큰 파일이 없는 카테고리의 IDF 기여분)
+
+    - 행렬의 0이 아닌 항목 = (리뷰, 단어) 쌍이므로 열별 개수가 곧 문서 수
+
+    Returns:
+        tuple: (Counter {단어: 문서 수}, 문서 수)
+    """
+    doc_freq = Counter()
+    n_docs = 0
+    words = idf_model["words"]
+    for category in categories:
+        matrix = load_review_tfidf(category, store_dir)
+        if matrix is None:
+            continue
+        indptr = np.asarray(matrix["indptr"])
+        n_docs += int(np.count_nonzero(np.diff(indptr)))
+        counts = np.bincount(np.asarray(matrix["indices"]), minlength=len(words))
+        nonzero = np.flatnonzero(counts)
+        doc_freq.update(dict(zip([words[i] for i in nonzero], counts[nonzero].tolist())))
+    return doc_freq, n_docs
+
+
+def reweight_review_tfidf(category, old_idf, new_idf, store_dir=TFIDF_STORE_DIR):
+    """
+    이전 IDF로 저장된 카테고리 행렬을 새 IDF로 재가중해 교체 (토큰 재로딩 불필요)
+
+    - 저장값 = tf * idf_old / norm → idf_old로 나누고 idf_new를 곱한 뒤 다시 L2 정규화
+      (행 단위 norm은 정규화에서 상쇄되므로 새 IDF로 변환한 값과 같음)
+    - 단어 ID는 새 어휘 ID로 재매핑
+
+    Returns:
+        bool: 교체 여부 (행렬이 없거나 새 어휘에 없는 단어가 있으면 False)
+    """
+    matrix = load_review_tfidf(category, store_dir)
+    if matrix is None:
+        return False
+
+    # mmap 파일을 덮어쓰므로 메모리로 복사해서 계산
+    indptr = np.array(matrix["indptr"], dtype=np.int64)
+    old_cols = np.array(matrix["indices"], dtype=np.int64)
+    data = np.array(matrix["data"], dtype=np.float64)
+    n_rows = len(indptr) - 1
+
+    vocab = new_idf["vocab"]
+    to_new = np.array([vocab.get(w, -1) for w in old_idf["words"]], dtype=np.int64)
+    cols = to_new[old_cols]
+    if len(cols) and cols.min() < 0:
+        return False
+
+    entry_rows = np.repeat(np.arange(n_rows), np.diff(indptr))
+    weights = data / old_idf["idf"][old_cols] * new_idf["idf"][cols]
+
+    order = np.lexsort((cols, entry_rows))
+    entry_rows, cols, weights = entry_rows[order], cols[order], weights[order]
+    norms = np.sqrt(np.bincount(entry_rows, weights=weights * weights, minlength=n_rows))
+    weights = weights / np.where(norms[entry_rows] > 0, norms[entry_rows], 1.0)
+
+    save_review_tfidf(
+        category,
+        (indptr, cols.astype(np.int32), weights.astype(np.float32)),
+        np.asarray(matrix["product_id"]),
+        np.array(matrix["review_id"]),
+        new_idf,
+        store_dir,
+    )
+    return True
+
+
+# =========================
+# 리뷰 TF-IDF 변환/저장
+# =========================
+
+
+def transform_tfidf(token_lists, idf_model):
+    """
+    토큰 리스트들을 리뷰별 L2 정규화 TF-IDF CSR로 변환
+
+    - tf = 단어 빈도 / 리뷰 토큰 수 (기존 감성 분석 TF와 같은 정의)
+    - IDF 어휘에 없는 단어는 제외
+
+    Returns:
+        tuple: (indptr int64, indices int32, data float32) - 행 내부 단어 ID 오름차순
+    """
+    token_ids, offsets, words = encode_token_lists(token_lists)
+    n_rows = len(offsets) - 1
+    lengths = np.diff(offsets)
+
+    indptr, local_ids, counts = build_term_matrix(token_ids, offsets, max(len(words), 1))
+    entry_rows = np.repeat(np.arange(n_rows), np.diff(indptr))
+
+    # 배치 단어 ID → IDF 어휘 ID (-1: 어휘 밖)
+    vocab = idf_model["vocab"]
+    to_global = np.array([vocab.get(w, -1) for w in words], dtype=np.int64)
+    cols = to_global[local_ids] if len(local_ids) else local_ids
+    keep = cols >= 0
+    entry_rows, cols = entry_rows[keep], cols[keep]
+    weights = counts[keep] / lengths[entry_rows] * idf_model["idf"][cols]
+
+    # 행 내부를 어휘 ID 순으로 정렬 + L2 정규화
+    order = np.lexsort((cols, entry_rows))
+    entry_rows, cols, weights = entry_rows[order], cols[order], weights[order]
+    norms = np.sqrt(np.bincount(entry_rows, weights=weights * weights, minlength=n_rows))
+    weights = weights / norms[entry_rows]
+
+    indptr = np.zeros(n_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(entry_rows, minlength=n_rows), out=indptr[1:])
+    return indptr, cols.astype(np.int32), weights.astype(np.float32)
+
+
+def review_matrix_dir(category, store_dir=TFIDF_STORE_DIR):
+    """카테고리 TF-IDF 행렬 디렉토리 (카테고리명은 NFC 정규화 후 URI 인코딩)"""
+    category = unicodedata.normalize("NFC", str(category))
+    return os.path.join(store_dir, REVIEW_MATRIX_DIR, quote(category, safe=""))
+
+
+def save_review_tfidf(
+    category, matrix, product_ids, review_ids, idf_model, store_dir=TFIDF_STORE_DIR
+):
+    """
+    카테고리 리뷰 TF-IDF CSR 저장 (기존 파일 교체)
+
+    Args:
+        category: 카테고리 파일명
+        matrix: transform_tfidf() 결과 (indptr, indices, data)
+        product_ids, review_ids: 행 순서의 상품/리뷰 ID
+        idf_model: 사용한 IDF 모델 (버전 기록용)
+
+    Returns:
+        str: 저장 디렉토리
+    """
+    indptr, indices, data = matrix
+    out_dir = review_matrix_dir(category, store_dir)
+    os.makedirs(out_dir, exist_ok=True)
+
+    np.save(os.path.join(out_dir, "indptr.npy"), indptr)
+    np.save(os.path.join(out_dir, "indices.npy"), indices)
+    np.save(os.path.join(out_dir, "data.npy"), data)
+    pq.write_table(
+        pa.table(
+            {
+                "product_id": pa.array(product_ids, type=pa.string()),
+                "review_id": pa.array(review_ids, type=pa.int64()),
+            }
+        ),
+        os.path.join(out_dir, "rows.parquet"),
+    )
+    meta = {
+        "idf_version": idf_model["version"],
+        "n_rows": len(indptr) - 1,
+        "n_cols": len(idf_model["words"]),
+        "nnz": int(len(indices)),
+    }
+    with open(os.path.join(out_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    return out_dir
+
+
+def load_review_tfidf(category, store_dir=TFIDF_STORE_DIR):
+    """
+    카테고리 리뷰 TF-IDF CSR 로드 (배열은 mmap)
+
+    Returns:
+        dict: {"indptr", "indices", "data", "product_id", "review_id", "meta"}
+              - 저장된 행렬이 없으면 None
+    """
+    in_dir = review_matrix_dir(category, store_dir)
+    meta_path = os.path.join(in_dir, "meta.json")
+    if not os.path.exists(meta_path):
+        return None
+
+    with open(meta_path, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    rows = pq.read_table(os.path.join(in_dir, "rows.parquet"))
+    return {
+        "indptr": np.load(os.path.join(in_dir, "indptr.npy"), mmap_mode="r"),
+        "indices": np.load(os.path.join(in_dir, "indices.npy"), mmap_mode="r"),
+        "data": np.load(os.path.join(in_dir, "data.npy"), mmap_mode="r"),
+        "product_id": rows.column("product_id").to_numpy(zero_copy_only=False),
+        "review_id": rows.column("review_id").to_numpy(),
+        "meta": meta,
+    }
+
+
+def list_tfidf_categories(store_dir=TFIDF_STORE_DIR):
+    """TF-IDF 행렬이 저장된 카테고리 목록"""
+    base = os.path.join(store_dir, REVIEW_MATRIX_DIR)
+    if not os.path.isdir(base):
+        return []
+    return sorted(unquote(name) for name in os.listdir(base))
+
+
+# =========================
+# 상품 TF-IDF 벡터 / 유사도
+# =========================
+
+
+def product_tfidf_matrix(review_matrix):
+    """
+    리뷰 TF-IDF CSR을 상품별 평균 벡터(L2 정규화) CSR로 집계
+
+    Returns:
+        tuple: (상품 ID 배열, (indptr, indices, data))
+    """
+    indptr = np.asarray(review_matrix["indptr"])
+    indices = np.asarray(review_matrix["indices"], dtype=np.int64)
+    data = np.asarray(review_matrix["data"], dtype=np.float64)
+    n_cols = review_matrix["meta"]["n_cols"]
+
+    product_ids, row_products = np.unique(
+        review_matrix["product_id"].astype(str), return_inverse=True
+    )
+    n_products = len(product_ids)
+    entry_products = np.repeat(row_products, np.diff(indptr))
+
+    # (상품, 단어) 단위 합계 → 정규화하면 평균과 방향이 같음
+    keys, inverse = np.unique(entry_products * n_cols + indices, return_inverse=True)
+    sums = np.bincount(inverse, weights=data)
+    rows = keys // n_cols
+    cols = keys - rows * n_cols
+    norms = np.sqrt(np.bincount(rows, weights=sums * sums, minlength=n_products))
+    values = sums / np.where(norms[rows] > 0, norms[rows], 1.0)
+
+    p_indptr = np.zeros(n_products + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n_products), out=p_indptr[1:])
+    return product_ids, (p_indptr, cols.astype(np.int32), values.astype(np.float32))
+
+
+def load_product_tfidf(store_dir=TFIDF_STORE_DIR, categories=None):
+    """
+    저장된 리뷰 TF-IDF로 전체(또는 일부 카테고리) 상품 TF-IDF 행렬 구성 (프로세스 캐시)
+
+    Returns:
+        tuple: (상품 ID 배열, (indptr, indices, data), n_cols) - 저장된 행렬이 없으면 None
+    """
+    categories = tuple(categories or list_tfidf_categories(store_dir))
+    idf_path = os.path.join(store_dir, IDF_FILE)
+    if not os.path.exists(idf_path):
+        return None
+    key = (os.path.abspath(store_dir), os.path.getmtime(idf_path), categories)
+    if key in _product_matrix_cache:
+        return _product_matrix_cache[key]
+
+    idf_model = load_idf(store_dir)
+    if idf_model is None:
+        return None
+    n_cols = len(idf_model["words"])
+
+    ids_list, indptr_list, indices_list, data_list = [], [], [], []
+    offset = 0
+    for category in categories:
+        review_matrix = load_review_tfidf(category, store_dir)
+        if review_matrix is None or review_matrix["meta"]["n_rows"] == 0:
+            continue
+        # 다른 IDF 버전으로 만든 행렬은 단어 ID 체계가 달라 함께 쓸 수 없음
+        if review_matrix["meta"]["idf_version"] != idf_model["version"]:
+            print(f"[경고] IDF 버전이 달라 제외합니다: {category}")
+            continue
+        product_ids, (indptr, indices, data) = product_tfidf_matrix(review_matrix)
+        ids_list.append(product_ids)
+        indptr_list.append(indptr[:-1] + offset)
+        indices_list.append(indices)
+        data_list.append(data)
+        offset += len(indices)
+
+    if not ids_list:
+        return None
+
+    result = (
+        np.concatenate(ids_list),
+        (
+            np.concatenate(indptr_list + [np.array([offset], dtype=np.int64)]),
+            np.concatenate(indices_list),
+            np.concatenate(data_list),
+        ),
+        n_cols,
+    )
+    _product_matrix_cache[key] = result
+    return result
+
+
+def similar_products_tfidf(product_id, top_k=10, store_dir=TFIDF_STORE_DIR):
+    """
+    상품 TF-IDF 코사인 유사도 상위 상품 검색 (저장된 리뷰 TF-IDF 재사용)
+
+    Returns:
+        list: [(상품 ID, 유사도), ...] - 상품이 없으면 빈 리스트
+    """
+    loaded = load_product_tfidf(store_dir)
+    if loaded is None:
+        return []
+    product_ids, (indptr, indices, data), n_cols = loaded
+
+    product_id = unicodedata.normalize("NFC", str(product_id))
+    matches = np.flatnonzero(product_ids == product_id)
+    if len(matches) == 0:
+        return []
+    row = matches[0]
+
+    # 질의 상품을 dense 벡터로 펼친 뒤 모든 상품 항목과 한 번에 내적
+    query = np.zeros(n_cols, dtype=np.float32)
+    query[indices[indptr[row] : indptr[row + 1]]] = data[indptr[row] : indptr[row + 1]]
+    entry_products = np.repeat(np.arange(len(product_ids)), np.diff(indptr))
+    scores = np.bincount(
+        entry_products, weights=data * query[indices], minlength=len(product_ids)
+    )
+    scores[row] = -np.inf
+
+    k = min(top_k, len(scores) - 1)
+    if k <= 0:
+        return []
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top], kind="stable")]
+    return [(str(product_ids[i]), float(scores[i])) for i in top]
@@ -1,5 +1,5 @@
 import os
-import json
+import sys
 import pandas as pd
 import matplotlib.pyplot as plt
 from collections import Counter
@@ -8,11 +8,13 @@ from itertools import chain
 import seaborn as sns
 import random
 import matplotlib.gridspec as gridspec
-from pathlib import Path
 
 from matplotlib import rc
 import platform
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "EDA"))
+from eda_data import load_eda_data
+
 # 운영체제별 한글 폰트 설정
 if platform.system() == "Windows":
     plt.rc("font", family="Malgun Gothic")
@@ -29,65 +31,50 @@ else:  # Linux
 
 # 파일 경로
 DATA_DIR = "data/processed_data/"
-PARQUET_PATH = "data/processed_data/integrated_reviews_detail.parquet"
-
-# with_text와 without_text 파일 모두 재귀적으로 수집
-data_path = Path(DATA_DIR)
-with_text_files = list(data_path.rglob("*_with_text.json"))
-without_text_files = list(data_path.rglob("*_without_text.json"))
-all_json_files = with_text_files + without_text_files
-
-print(f"with_text 파일: {len(with_text_files)}개")
-print(f"without_text 파일: {len(without_text_files)}개")
-print(f"총 파일 개수: {len(all_json_files)}개")
+PARQUET_PATH = "data/processed_data/integrated_reviews_detail"  # category_file 파티션 디렉토리
+# 전처리(main.py)가 미리 계산한 상품 집계 테이블 (category_file 파티션 디렉토리)
+PRODUCT_FACTS_PATH = "data/processed_data/product_facts/products"
+PRODUCT_MONTHLY_PATH = "data/processed_data/product_facts/monthly"
+
+# True면 상품별 집계(평균 평점, 평점 분포, 월별 추이)를 상품 집계 테이블에서 읽음
+# (테이블이 없으면 리뷰 데이터에서 직접 계산)
+USE_PRODUCT_FACTS = True
+use_facts = (
+    USE_PRODUCT_FACTS
+    and os.path.isdir(PRODUCT_FACTS_PATH)
+    and os.path.isdir(PRODUCT_MONTHLY_PATH)
+)
 
-# 1. Parquet에서 리뷰 데이터 로드 (텍스트, 토큰, 벡터 등)
-print("\n리뷰 데이터 로딩 중...")
-df_reviews = pd.read_parquet(PARQUET_PATH)
+# 1~2. 리뷰(Parquet, 벡터 제외) + 상품 정보(JSON) 로드
+# JSON은 한 번만 스캔하고, 결과는 입력 mtime 기준 Parquet 캐시로 재사용 (EDA/eda_data.py)
+print("\n데이터 로딩 중...")
+eda_data = load_eda_data(DATA_DIR, PARQUET_PATH)
+df_reviews = eda_data["text_reviews"]
+df_products = eda_data["products"]
+print(f"with_text 파일: {df_products.loc[df_products['file_type'] == 'with_text', 'source_file'].nunique()}개")
+print(f"without_text 파일: {df_products.loc[df_products['file_type'] == 'without_text', 'source_file'].nunique()}개")
 print(f"총 리뷰 수: {len(df_reviews)}")
 
-# 2. JSON에서 상품 정보 로드 (with_text + without_text)
-print("\n상품 정보 로딩 중...")
-product_rows = []
-
-for path in all_json_files:
-    with open(path, "r", encoding="utf-8") as f:
-        raw = json.load(f)
-
-    file_type = "with_text" if "with_text" in str(path) else "without_text"
-    print(f"불러오는 파일: {path.name} ({file_type})")
-
-    for product in raw.get("data", []):
-        p_info = product.get("product_info", {})
-
-        # without_text 파일의 경우 평점 분포 정보 추출
-        reviews_info = product.get("reviews", {})
-
-        product_rows.append(
-            {
-                "source_file": path.name,
-                "file_type": file_type,
-                "product_id": p_info.get("product_id"),
-                "product_name": p_info.get("product_name"),
-                "brand": p_info.get("brand"),
-                "category_path": p_info.get("category_path"),
-                "category_normal": p_info.get("category_normal"),
-                "price": pd.to_numeric(p_info.get("price"), errors="coerce"),
-                "total_reviews": p_info.get("total_reviews", 0),
-                "rating_distribution": p_info.get("rating_distribution", {}),
-                "skin_type": p_info.get("skin_type"),
-            }
-        )
-
-df_products = pd.DataFrame(product_rows)
-
 # 3. 리뷰 데이터와 상품 정보 병합
-print("\n데이터 병합 중...")
-df = df_reviews.merge(
-    df_products[["product_id", "product_name", "brand", "category_path", "price"]],
-    on="product_id",
-    how="left",
-)
+if use_facts:
+    # 상품별 집계는 집계 테이블 사용 → 리뷰 전체 merge 생략
+    print("\n상품 집계 테이블 로딩 중...")
+    product_names = df_products[["product_id", "product_name"]]
+    df_facts = (
+        pd.read_parquet(PRODUCT_FACTS_PATH)
+        .drop(columns=["product_name"], errors="ignore")
+        .merge(product_names, on="product_id", how="left")
+    )
+    df_monthly = pd.read_parquet(PRODUCT_MONTHLY_PATH)
+    print(f"집계 상품 수: {len(df_facts)}")
+    df = df_reviews
+else:
+    print("\n데이터 병합 중...")
+    df = df_reviews.merge(
+        df_products[["product_id", "product_name", "brand", "category_path", "price"]],
+        on="product_id",
+        how="left",
+    )
 
 print("\n===== 병합된 데이터프레임 =====")
 print(df.head())
@@ -110,13 +97,22 @@ print(f"총 리뷰 수 (텍스트 포함): {len(df)}")
 
 
 # 리뷰 많은 상품 TOP 5
-top_5_products = (
-    df.groupby(["product_id", "product_name"])
-    .size()
-    .reset_index(name="review_count")
-    .sort_values("review_count", ascending=False)
-    .head(5)
-)
+if use_facts:
+    top_5_products = (
+        df_facts.groupby(["product_id", "product_name"])["review_count"]
+        .sum()
+        .reset_index()
+        .sort_values("review_count", ascending=False)
+        .head(5)
+    )
+else:
+    top_5_products = (
+        df.groupby(["product_id", "product_name"])
+        .size()
+        .reset_index(name="review_count")
+        .sort_values("review_count", ascending=False)
+        .head(5)
+    )
 
 print("\n===== 리뷰 많은 상품 TOP 5 =====")
 print(top_5_products)
@@ -139,25 +135,49 @@ print(df["review_len"].describe())
 
 
 # 상품별 평균 평점
-product_score = (
-    df[df["product_name"].notna()]  # product_name이 있는 것만
-    .groupby("product_name")
-    .agg(
-        mean_score=("score", "mean"),
-        mean_helpful=("helpful_count", "mean"),
-        review_count=("score", "count"),
+if use_facts:
+    # 합계/개수로 다시 묶어 상품명 단위 평균 계산 (리뷰 단위 평균과 동일)
+    product_score = (
+        df_facts[df_facts["product_name"].notna()]
+        .groupby("product_name")[["score_sum", "helpful_sum", "review_count"]]
+        .sum()
+        .reset_index()
+    )
+    product_score["mean_score"] = product_score["score_sum"] / product_score["review_count"]
+    product_score["mean_helpful"] = (
+        product_score["helpful_sum"] / product_score["review_count"]
+    )
+    product_score = product_score[
+        ["product_name", "mean_score", "mean_helpful", "review_count"]
+    ]
+else:
+    product_score = (
+        df[df["product_name"].notna()]  # product_name이 있는 것만
+        .groupby("product_name")
+        .agg(
+            mean_score=("score", "mean"),
+            mean_helpful=("helpful_count", "mean"),
+            review_count=("score", "count"),
+        )
+        .reset_index()
     )
-    .reset_index()
-)
 
 print("\n===== 상품별 평균 평점 & 평균 helpful_count =====")
 print(f"상품 수: {len(product_score)}")
 print(product_score.head())
 
 # 리뷰 수 TOP 10 상품
-top_products = (
-    df[df["product_name"].notna()]["product_name"].value_counts().head(10).index
-)
+if use_facts:
+    top_products = (
+        product_score.set_index("product_name")["review_count"]
+        .sort_values(ascending=False)
+        .head(10)
+        .index
+    )
+else:
+    top_products = (
+        df[df["product_name"].notna()]["product_name"].value_counts().head(10).index
+    )
 print(f"\nTOP 10 상품 수: {len(top_products)}")
 
 
@@ -239,12 +259,19 @@ gs = gridspec.GridSpec(2, 3)
 ax1 = fig.add_subplot(gs[0, 0])
 # TOP 10 상품이 있을 때만 그리기
 if len(top_products) > 0:
-    top_product_scores = (
-        df[df["product_name"].isin(top_products)]
-        .groupby("product_name")["score"]
-        .mean()
-        .sort_values()
-    )
+    if use_facts:
+        top_product_scores = (
+            product_score[product_score["product_name"].isin(top_products)]
+            .set_index("product_name")["mean_score"]
+            .sort_values()
+        )
+    else:
+        top_product_scores = (
+            df[df["product_name"].isin(top_products)]
+            .groupby("product_name")["score"]
+            .mean()
+            .sort_values()
+        )
     if len(top_product_scores) > 0:
         top_product_scores.plot(kind="barh", ax=ax1)
         ax1.set_title("TOP 10 상품 평균 평점")
@@ -261,13 +288,24 @@ else:
 ax2 = fig.add_subplot(gs[0, 2])
 # pivot_table에서 review 대신 review_id 사용 (또는 full_text)
 if len(top_products) > 0:
-    pivot = df[df["product_name"].isin(top_products)].pivot_table(
-        index="product_name",
-        columns="score",
-        values="review_id",
-        aggfunc="count",
-        fill_value=0,
-    )
+    if use_facts:
+        score_columns = [f"score_{s}" for s in range(1, 6)]
+        pivot = (
+            df_facts[df_facts["product_name"].isin(top_products)]
+            .groupby("product_name")[score_columns]
+            .sum()
+        )
+        pivot.columns = range(1, 6)
+        pivot.columns.name = "score"
+        pivot = pivot.loc[:, pivot.sum() > 0]
+    else:
+        pivot = df[df["product_name"].isin(top_products)].pivot_table(
+            index="product_name",
+            columns="score",
+            values="review_id",
+            aggfunc="count",
+            fill_value=0,
+        )
     if not pivot.empty:
         sns.heatmap(pivot, annot=True, fmt=".0f", cmap="YlOrRd", ax=ax2)
         ax2.set_title("TOP 10 상품 평점 분포")
@@ -284,7 +322,16 @@ else:
 
 ax3 = fig.add_subplot(gs[1, :])
 # 날짜 데이터가 있을 때만 그리기
-if df["date"].notna().sum() > 0:
+if use_facts and len(df_monthly) > 0:
+    # 상품×월 합계를 월 단위로 합산 (빈 달은 resample과 같이 NaN)
+    monthly_sum = df_monthly.groupby("month")[["score_sum", "review_count"]].sum()
+    monthly_sum.index = pd.to_datetime(monthly_sum.index) + pd.offsets.MonthEnd(0)
+    time_score = (monthly_sum["score_sum"] / monthly_sum["review_count"]).reindex(
+        pd.date_range(monthly_sum.index.min(), monthly_sum.index.max(), freq="ME")
+    )
+    time_score.plot(ax=ax3, linewidth=2)
+    ax3.set_title("월별 평균 평점 추이")
+elif df["date"].notna().sum() > 0:
     time_score = (
         df.dropna(subset=["date"]).set_index("date").resample("ME")["score"].mean()
     )